@@ -29,7 +29,13 @@ from elastic_transport import __version__ as _elastic_transport_version
 from ._async.client import AsyncAppSearch as AsyncAppSearch
 from ._async.client import AsyncEnterpriseSearch as AsyncEnterpriseSearch
 from ._async.client import AsyncWorkplaceSearch as AsyncWorkplaceSearch
+from ._coalesce import RequestCoalescer
+from ._concurrency import AdaptiveConcurrencyLimiter
+from ._rate_limit import RateLimit, RateLimiter
+from ._response_cache import ResponseCache
+from ._search_batch import SearchBatcher
 from ._serializer import JsonSerializer
+from ._suggestion_cache import SuggestionCache
 from ._sync.client import AppSearch as AppSearch
 from ._sync.client import EnterpriseSearch as EnterpriseSearch
 from ._sync.client import WorkplaceSearch as WorkplaceSearch
@@ -69,6 +75,7 @@ if _version_groups < (8, 4, 0) or _version_groups > (9, 0, 0):
     )
 
 __all__ = [
+    "AdaptiveConcurrencyLimiter",
     "ApiError",
     "AppSearch",
     "AsyncAppSearch",
@@ -88,8 +95,14 @@ __all__ = [
     "NotFoundError",
     "PayloadTooLargeError",
     "PaymentRequiredError",
+    "RateLimit",
+    "RateLimiter",
+    "RequestCoalescer",
+    "ResponseCache",
+    "SearchBatcher",
     "SerializationError",
     "ServiceUnavailableError",
+    "SuggestionCache",
     "TransportError",
     "UnauthorizedError",
     "WorkplaceSearch",
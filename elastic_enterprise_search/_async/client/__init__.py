@@ -15,6 +15,7 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import os
 import typing as t
 from urllib.parse import urlencode
 
@@ -22,6 +23,38 @@ import jwt
 from elastic_transport import AsyncTransport, BaseNode
 from elastic_transport.client_utils import DEFAULT, DefaultType
 
+from ..._checkpoint import CheckpointStore
+from ..._coalesce import RequestCoalescer
+from ..._concurrency import AdaptiveConcurrencyLimiter
+from ..._content_hash import ContentHashStore
+from ..._helpers import (
+    _EXPORT_SORT,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EXPORT_PAGE_SIZE,
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_SCAN_PAGE_SIZE,
+    BulkChunkResult,
+    DeleteByFilterResult,
+    ReindexResult,
+    SearchManyResult,
+    UpdateByFilterResult,
+)
+from ..._rate_limit import RateLimiter
+from ..._response_cache import ResponseCache
+from ..._search_batch import SearchBatcher
+from ..._suggestion_cache import SuggestionCache
+from ..helpers import (
+    _TYPE_DOCUMENTS,
+    async_delete_by_filter,
+    async_export_engine,
+    async_paginate,
+    async_reindex,
+    async_scan_documents,
+    async_search_many,
+    async_streaming_bulk,
+    async_update_by_filter,
+)
 from ._base import _TYPE_HOSTS
 from .app_search import AsyncAppSearch as _AsyncAppSearch
 from .enterprise_search import AsyncEnterpriseSearch as _AsyncEnterpriseSearch
@@ -70,6 +103,480 @@ class AsyncAppSearch(_AsyncAppSearch):
         }
         return jwt.encode(payload=options, key=api_key, algorithm="HS256")
 
+    def bulk_index(
+        self,
+        *,
+        engine_name: str,
+        documents: _TYPE_DOCUMENTS,
+        max_concurrency: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        serializer_processes: int = 0,
+        checkpoint: t.Optional[CheckpointStore] = None,
+        hash_store: t.Optional[ContentHashStore] = None,
+    ) -> t.AsyncIterator[BulkChunkResult]:
+        """Streams documents into an engine with as many 'index_documents'
+        requests as needed, yielding the result of each chunk as it completes.
+        The documents are read lazily so inputs of any size can be indexed
+        with flat memory usage.
+
+        `<https://www.elastic.co/guide/en/app-search/current/documents.html#documents-create>`_
+
+        :arg engine_name: Name of the engine
+        :arg documents: Iterable or generator of documents to index
+        :arg max_concurrency: Maximum number of requests in flight at once
+        :arg chunk_size: Maximum number of documents per request, App Search
+            accepts up to 100 documents per request
+        :arg max_chunk_bytes: Maximum size of a request body in bytes
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :arg serializer_processes: Number of processes serializing documents
+            to JSON, by default documents are serialized in the calling thread
+        :arg checkpoint: Store recording how many documents were acknowledged
+            so an interrupted operation resumes after them, see 'CheckpointStore'
+        :arg hash_store: Store of the content hashes of indexed documents,
+            documents which didn't change since they were last indexed aren't sent
+        :returns: Iterator of 'BulkChunkResult' with the offset of each chunk,
+            the per-document results returned by App Search and the
+            documents which couldn't be indexed
+        """
+        return async_streaming_bulk(
+            self,
+            documents,
+            engine_name=engine_name,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            max_retries=max_retries,
+            serializer_processes=serializer_processes,
+            checkpoint=checkpoint,
+            hash_store=hash_store,
+        )
+
+    def bulk_delete(
+        self,
+        *,
+        engine_name: str,
+        document_ids: _TYPE_DOCUMENTS,
+        max_concurrency: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        checkpoint: t.Optional[CheckpointStore] = None,
+        hash_store: t.Optional[ContentHashStore] = None,
+    ) -> t.AsyncIterator[BulkChunkResult]:
+        """Streams document IDs to remove from an engine with as many
+        'delete_documents' requests as needed, yielding the result of each
+        chunk as it completes. IDs which App Search reports as not deleted
+        are listed in the 'errors' of their chunk's result.
+
+        `<https://www.elastic.co/guide/en/app-search/current/documents.html#documents-delete>`_
+
+        :arg engine_name: Name of the engine
+        :arg document_ids: Iterable or generator of document IDs to delete
+        :arg max_concurrency: Maximum number of requests in flight at once
+        :arg chunk_size: Maximum number of document IDs per request, App Search
+            accepts up to 100 document IDs per request
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :arg checkpoint: Store recording how many documents were acknowledged
+            so an interrupted operation resumes after them, see 'CheckpointStore'
+        :arg hash_store: Store of the content hashes of indexed documents,
+            the hashes of deleted documents are removed from it
+        :returns: Iterator of 'BulkChunkResult' with the offset of each chunk,
+            the per-ID results returned by App Search and the
+            documents which couldn't be deleted
+        """
+        return async_streaming_bulk(
+            self,
+            document_ids,
+            engine_name=engine_name,
+            op_type="delete",
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+            checkpoint=checkpoint,
+            hash_store=hash_store,
+        )
+
+    async def delete_by_filter(
+        self,
+        *,
+        engine_name: str,
+        filters: t.Mapping[str, t.Any],
+        max_concurrency: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> DeleteByFilterResult:
+        """Deletes every document in an engine matching the given filters.
+        Matching document IDs are found with 'search' and removed with
+        concurrent 'delete_documents' requests, round after round, until
+        no matching documents remain.
+
+        `<https://www.elastic.co/guide/en/app-search/current/filters.html>`_
+
+        :arg engine_name: Name of the engine
+        :arg filters: Search filters selecting the documents to delete
+        :arg max_concurrency: Maximum number of delete requests in flight at once
+        :arg chunk_size: Maximum number of document IDs per delete request
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :returns: 'DeleteByFilterResult' with the number of documents deleted,
+            the documents which couldn't be deleted, the time taken, the
+            throughput in documents per second and whether matching documents
+            remain out of reach of the search
+        """
+        return await async_delete_by_filter(
+            self,
+            engine_name,
+            filters,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+        )
+
+    async def update_by_filter(
+        self,
+        *,
+        engine_name: str,
+        filters: t.Mapping[str, t.Any],
+        patch: t.Mapping[str, t.Any],
+        max_concurrency: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> UpdateByFilterResult:
+        """Sets the fields of 'patch' on every document in an engine matching
+        the given filters. Matching document IDs are found with 'search' and
+        updated with concurrent 'put_documents' requests, round after round,
+        until every matching document holds the values of 'patch'.
+
+        `<https://www.elastic.co/guide/en/app-search/current/documents.html#documents-partial>`_
+
+        :arg engine_name: Name of the engine
+        :arg filters: Search filters selecting the documents to update
+        :arg patch: Fields to set on each document, values must be strings,
+            numbers or lists of strings or numbers. Updates setting lists
+            only reach the first 10,000 matching documents.
+        :arg max_concurrency: Maximum number of update requests in flight at once
+        :arg chunk_size: Maximum number of documents per update request
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :returns: 'UpdateByFilterResult' with the number of documents updated,
+            the documents which couldn't be updated, the time taken, the
+            throughput in documents per second and whether matching documents
+            remain out of reach of the search
+        """
+        return await async_update_by_filter(
+            self,
+            engine_name,
+            filters,
+            patch,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+        )
+
+    def iter_api_keys(
+        self,
+        *,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over all API keys one at a time,
+        fetching the pages with 'list_api_keys' lazily so only one is held in memory.
+
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_api_keys, page_size=page_size, prefetch=prefetch
+        )
+
+    def iter_crawler_crawl_requests(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the crawl requests of an engine one at a time,
+        fetching the pages with 'list_crawler_crawl_requests' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_crawler_crawl_requests,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def iter_crawler_domains(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the crawler domains of an engine one at a time,
+        fetching the pages with 'list_crawler_domains' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_crawler_domains,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def iter_crawler_process_crawls(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the process crawls of an engine one at a time,
+        fetching the pages with 'list_crawler_process_crawls' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_crawler_process_crawls,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def iter_curations(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the curations of an engine one at a time,
+        fetching the pages with 'list_curations' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_curations,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def iter_documents(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over all documents of an engine one at a time,
+        fetching the pages with 'list_documents' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_documents,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def iter_engines(
+        self,
+        *,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over all engines one at a time,
+        fetching the pages with 'list_engines' lazily so only one is held in memory.
+
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(self.list_engines, page_size=page_size, prefetch=prefetch)
+
+    def iter_synonym_sets(
+        self,
+        *,
+        engine_name: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the synonym sets of an engine one at a time,
+        fetching the pages with 'list_synonym_sets' lazily so only one is held in memory.
+
+        :arg engine_name: Name of the engine
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_synonym_sets,
+            page_size=page_size,
+            prefetch=prefetch,
+            engine_name=engine_name,
+        )
+
+    def export_engine(
+        self,
+        *,
+        engine_name: str,
+        query: t.Optional[t.Mapping[str, t.Any]] = None,
+        sort: t.Sequence[t.Any] = _EXPORT_SORT,
+        page_size: int = DEFAULT_EXPORT_PAGE_SIZE,
+        slices: int = 1,
+        sink: t.Union[None, str, "os.PathLike[str]", t.BinaryIO] = None,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over every document of an engine with 'search_es_search'
+        requests paginated with 'search_after', past the 10,000 documents
+        reachable with 'list_documents'. Memory usage is bounded by a few
+        pages per slice.
+
+        `<https://www.elastic.co/guide/en/app-search/current/elasticsearch-search-api-reference.html>`_
+
+        :arg engine_name: Name of the engine
+        :arg query: Elasticsearch query selecting the documents to export
+        :arg sort: Elasticsearch sort giving every document a unique position,
+            by default the documents' 'id'
+        :arg page_size: Number of documents fetched per request
+        :arg slices: Number of slices of the documents exported concurrently,
+            documents of different slices are interleaved
+        :arg sink: Path or binary file the documents are also written to
+            as JSON lines while they're iterated over
+        """
+        return async_export_engine(
+            self,
+            engine_name,
+            query=query,
+            sort=sort,
+            page_size=page_size,
+            slices=slices,
+            sink=sink,
+        )
+
+    async def reindex(
+        self,
+        *,
+        source_engine: str,
+        dest_engine: str,
+        dest_client: t.Optional["AsyncAppSearch"] = None,
+        query: t.Optional[t.Mapping[str, t.Any]] = None,
+        transform: t.Optional[t.Callable[[t.Any], t.Any]] = None,
+        page_size: int = DEFAULT_EXPORT_PAGE_SIZE,
+        slices: int = 1,
+        max_concurrency: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> ReindexResult:
+        """Copies the documents of an engine into another engine, possibly of
+        another deployment. Documents are read with 'search_es_search' requests
+        paginated with 'search_after' while the previous pages are indexed
+        with concurrent 'index_documents' requests.
+
+        `<https://www.elastic.co/guide/en/app-search/current/documents.html#documents-create>`_
+
+        :arg source_engine: Name of the engine to read documents from
+        :arg dest_engine: Name of the engine to index documents into
+        :arg dest_client: Client of the destination engine, by default this client
+        :arg query: Elasticsearch query selecting the documents to copy
+        :arg transform: Function called with each document returning the
+            document to index, or None to leave the document out
+        :arg page_size: Number of documents read per request
+        :arg slices: Number of slices of the source engine read concurrently
+        :arg max_concurrency: Maximum number of index requests in flight at once
+        :arg chunk_size: Maximum number of documents per index request
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :returns: 'ReindexResult' with the number of documents read and indexed,
+            the documents which couldn't be indexed, the time taken and
+            the throughput in documents per second
+        """
+        return await async_reindex(
+            self,
+            source_engine,
+            dest_engine,
+            dest_client=dest_client,
+            query=query,
+            transform=transform,
+            page_size=page_size,
+            slices=slices,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+        )
+
+    async def search_many(
+        self,
+        *,
+        engines: t.Sequence[str],
+        query: str,
+        current_page: int = 1,
+        page_size: int = 10,
+        timeout: t.Optional[float] = None,
+        max_concurrency: t.Optional[int] = None,
+        analytics: t.Optional[t.Mapping[str, t.Any]] = None,
+        boosts: t.Optional[t.Mapping[str, t.Any]] = None,
+        facets: t.Optional[t.Mapping[str, t.Any]] = None,
+        filters: t.Optional[t.Mapping[str, t.Any]] = None,
+        result_fields: t.Optional[t.Mapping[str, t.Any]] = None,
+        search_fields: t.Optional[t.Mapping[str, t.Any]] = None,
+    ) -> SearchManyResult:
+        """Searches several engines concurrently and merges their results by
+        score without a meta engine. Engines which fail or time out are left
+        out of the results and reported in 'errors'.
+
+        `<https://www.elastic.co/guide/en/app-search/current/search.html>`_
+
+        :arg engines: Names of the engines to search
+        :arg query: Query of the search
+        :arg current_page: Page of the merged results to return
+        :arg page_size: Number of merged results per page
+        :arg timeout: Number of seconds each engine has to respond
+        :arg max_concurrency: Maximum number of searches in flight at once
+        :arg analytics:
+        :arg boosts:
+        :arg facets: Facets to return, counts are summed across engines
+        :arg filters:
+        :arg result_fields:
+        :arg search_fields:
+        :returns: 'SearchManyResult' with the merged results and facets,
+            the total number of results and the errors of the engines
+            missing from the results
+        """
+        params = {
+            "analytics": analytics,
+            "boosts": boosts,
+            "facets": facets,
+            "filters": filters,
+            "result_fields": result_fields,
+            "search_fields": search_fields,
+        }
+        return await async_search_many(
+            self,
+            engines,
+            query,
+            current_page=current_page,
+            page_size=page_size,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            **{param: value for param, value in params.items() if value is not None},
+        )
+
 
 class AsyncWorkplaceSearch(_AsyncWorkplaceSearch):
     """Client for Workplace Search
@@ -171,6 +678,152 @@ class AsyncWorkplaceSearch(_AsyncWorkplaceSearch):
             params=params,
         )
 
+    def bulk_index(
+        self,
+        *,
+        content_source_id: str,
+        documents: _TYPE_DOCUMENTS,
+        max_concurrency: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        serializer_processes: int = 0,
+        checkpoint: t.Optional[CheckpointStore] = None,
+        hash_store: t.Optional[ContentHashStore] = None,
+    ) -> t.AsyncIterator[BulkChunkResult]:
+        """Streams documents into a custom content source with as many
+        'index_documents' requests as needed, yielding the result of each chunk
+        as it completes. Documents are sent as-is so any '_allow_permissions'
+        and '_deny_permissions' fields are kept.
+
+        `<https://www.elastic.co/guide/en/workplace-search/current/workplace-search-custom-sources-api.html#index-and-update>`_
+
+        :arg content_source_id: Unique ID for a Custom API source
+        :arg documents: Iterable or generator of documents to index
+        :arg max_concurrency: Maximum number of requests in flight at once
+        :arg chunk_size: Maximum number of documents per request, Workplace
+            Search accepts up to 100 documents per request
+        :arg max_chunk_bytes: Maximum size of a request body in bytes
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :arg serializer_processes: Number of processes serializing documents
+            to JSON, by default documents are serialized in the calling thread
+        :arg checkpoint: Store recording how many documents were acknowledged
+            so an interrupted operation resumes after them, see 'CheckpointStore'
+        :arg hash_store: Store of the content hashes of indexed documents,
+            documents which didn't change since they were last indexed aren't sent
+        :returns: Iterator of 'BulkChunkResult' with the offset of each chunk,
+            the per-document results returned by Workplace Search and the
+            documents which couldn't be indexed
+        """
+        return async_streaming_bulk(
+            self,
+            documents,
+            content_source_id=content_source_id,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            max_retries=max_retries,
+            serializer_processes=serializer_processes,
+            checkpoint=checkpoint,
+            hash_store=hash_store,
+        )
+
+    def bulk_delete(
+        self,
+        *,
+        content_source_id: str,
+        document_ids: _TYPE_DOCUMENTS,
+        max_concurrency: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        checkpoint: t.Optional[CheckpointStore] = None,
+        hash_store: t.Optional[ContentHashStore] = None,
+    ) -> t.AsyncIterator[BulkChunkResult]:
+        """Streams document IDs to remove from a custom content source with as
+        many 'delete_documents' requests as needed, yielding the result of each
+        chunk as it completes.
+
+        `<https://www.elastic.co/guide/en/workplace-search/current/workplace-search-custom-sources-api.html#delete-by-id>`_
+
+        :arg content_source_id: Unique ID for a Custom API source
+        :arg document_ids: Iterable or generator of document IDs to delete
+        :arg max_concurrency: Maximum number of requests in flight at once
+        :arg chunk_size: Maximum number of document IDs per request
+        :arg max_retries: Maximum number of times a document failing
+            with a transient error is re-sent on its own
+        :arg checkpoint: Store recording how many documents were acknowledged
+            so an interrupted operation resumes after them, see 'CheckpointStore'
+        :arg hash_store: Store of the content hashes of indexed documents,
+            the hashes of deleted documents are removed from it
+        :returns: Iterator of 'BulkChunkResult' with the offset of each chunk,
+            the per-document results returned by Workplace Search and the
+            documents which couldn't be deleted
+        """
+        return async_streaming_bulk(
+            self,
+            document_ids,
+            content_source_id=content_source_id,
+            op_type="delete",
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+            checkpoint=checkpoint,
+            hash_store=hash_store,
+        )
+
+    def iter_external_identities(
+        self,
+        *,
+        content_source_id: str,
+        page_size: t.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over the external identities of a content source one at a time,
+        fetching the pages with 'list_external_identities' lazily so only one is held in memory.
+
+        :arg content_source_id: Unique ID for a Custom API source
+        :arg page_size: The number of results per page
+        :arg prefetch: Number of upcoming pages fetched concurrently
+        """
+        return async_paginate(
+            self.list_external_identities,
+            page_size=page_size,
+            prefetch=prefetch,
+            content_source_id=content_source_id,
+        )
+
+    def scan_documents(
+        self,
+        *,
+        content_source_id: str,
+        filters: t.Optional[t.Mapping[str, t.Any]] = None,
+        sort: t.Optional[t.Any] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        sink: t.Union[None, str, "os.PathLike[str]", t.BinaryIO] = None,
+    ) -> t.AsyncIterator[t.Any]:
+        """Iterates over every document of a custom content source by following
+        the cursor of 'list_documents', past the 10,000 documents reachable
+        with page numbers. Only one page of documents is held in memory.
+
+        `<https://www.elastic.co/guide/en/workplace-search/current/workplace-search-custom-sources-api.html#list-documents>`_
+
+        :arg content_source_id: Unique ID for a Custom API source
+        :arg filters: Filters selecting the documents to return
+        :arg sort: Sort order of the documents
+        :arg page_size: Number of documents fetched per request
+        :arg sink: Path or binary file the documents are also written to
+            as JSON lines while they're iterated over
+        """
+        return async_scan_documents(
+            self,
+            content_source_id,
+            filters=filters,
+            sort=sort,
+            page_size=page_size,
+            sink=sink,
+        )
+
 
 class AsyncEnterpriseSearch(_AsyncEnterpriseSearch):
     def __init__(
@@ -203,6 +856,12 @@ class AsyncEnterpriseSearch(_AsyncEnterpriseSearch):
         retry_on_status: t.Union[DefaultType, int, t.Collection[int]] = DEFAULT,
         retry_on_timeout: t.Union[DefaultType, bool] = DEFAULT,
         meta_header: t.Union[DefaultType, bool] = DEFAULT,
+        concurrency_limiter: t.Optional[AdaptiveConcurrencyLimiter] = None,
+        rate_limiter: t.Optional[RateLimiter] = None,
+        response_cache: t.Optional[ResponseCache] = None,
+        request_coalescer: t.Optional[RequestCoalescer] = None,
+        search_batcher: t.Optional[SearchBatcher] = None,
+        suggestion_cache: t.Optional[SuggestionCache] = None,
         # Deprecated
         http_auth: t.Optional[t.Union[str, t.Tuple[str, str]]] = DEFAULT,
         # Internal
@@ -233,9 +892,31 @@ class AsyncEnterpriseSearch(_AsyncEnterpriseSearch):
             dead_node_backoff_factor=dead_node_backoff_factor,
             max_dead_node_backoff=max_dead_node_backoff,
             meta_header=meta_header,
+            concurrency_limiter=concurrency_limiter,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            request_coalescer=request_coalescer,
+            search_batcher=search_batcher,
+            suggestion_cache=suggestion_cache,
             http_auth=http_auth,
             _transport=_transport,
         )
 
-        self.app_search = AsyncAppSearch(_transport=self.transport)
-        self.workplace_search = AsyncWorkplaceSearch(_transport=self.transport)
+        self.app_search = AsyncAppSearch(
+            _transport=self.transport,
+            concurrency_limiter=concurrency_limiter,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            request_coalescer=request_coalescer,
+            search_batcher=search_batcher,
+            suggestion_cache=suggestion_cache,
+        )
+        self.workplace_search = AsyncWorkplaceSearch(
+            _transport=self.transport,
+            concurrency_limiter=concurrency_limiter,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            request_coalescer=request_coalescer,
+            search_batcher=search_batcher,
+            suggestion_cache=suggestion_cache,
+        )
@@ -30,6 +30,12 @@ from elastic_transport import (
 )
 from elastic_transport.client_utils import DEFAULT, DefaultType
 
+from ..._coalesce import RequestCoalescer
+from ..._concurrency import AdaptiveConcurrencyLimiter
+from ..._rate_limit import RateLimiter
+from ..._response_cache import ResponseCache
+from ..._search_batch import SearchBatcher
+from ..._suggestion_cache import SuggestionCache
 from ..._utils import (
     CLIENT_META_SERVICE,
     _quote_query,
@@ -73,19 +79,20 @@ class BaseClient:
         retry_on_status: t.Union[DefaultType, int, t.Collection[int]] = DEFAULT,
         retry_on_timeout: t.Union[DefaultType, bool] = DEFAULT,
         meta_header: t.Union[DefaultType, bool] = DEFAULT,
+        concurrency_limiter: t.Optional[AdaptiveConcurrencyLimiter] = None,
+        rate_limiter: t.Optional[RateLimiter] = None,
+        response_cache: t.Optional[ResponseCache] = None,
+        request_coalescer: t.Optional[RequestCoalescer] = None,
+        search_batcher: t.Optional[SearchBatcher] = None,
+        suggestion_cache: t.Optional[SuggestionCache] = None,
         # Deprecated
         http_auth: t.Optional[t.Union[str, t.Tuple[str, str]]] = DEFAULT,
         # Internal
         _transport: t.Optional[AsyncTransport] = None,
     ):
         if _transport is None:
+            # Connection options are part of the node configurations below.
             transport_kwargs = {}
-            if connections_per_node is not DEFAULT:
-                transport_kwargs["connections_per_node"] = connections_per_node
-            if http_compress is not DEFAULT:
-                transport_kwargs["http_compress"] = http_compress
-            if verify_certs is not DEFAULT:
-                transport_kwargs["verify_certs"] = verify_certs
             if node_class is not DEFAULT:
                 transport_kwargs["node_class"] = node_class
             if dead_node_backoff_factor is not DEFAULT:
@@ -138,6 +145,15 @@ class BaseClient:
         self._retry_on_timeout = retry_on_timeout
         self._client_meta = DEFAULT
         self._ignore_status = None
+        self._concurrency_limiter = concurrency_limiter
+        self._rate_limiter = rate_limiter
+        self._response_cache = response_cache
+        self._request_coalescer = request_coalescer
+        self._search_batcher = search_batcher
+        self._suggestion_cache = suggestion_cache
+        # Request body sizes learned from '413 Payload Too Large'
+        # responses by the bulk helpers, by engine or content source.
+        self._chunk_byte_limits: t.Dict[str, int] = {}
 
     async def __aenter__(self: _TYPE_SELF) -> _TYPE_SELF:
         return self
@@ -161,6 +177,14 @@ class BaseClient:
         max_retries: t.Union[DefaultType, int] = DEFAULT,
         retry_on_status: t.Union[DefaultType, int, t.Collection[int]] = DEFAULT,
         retry_on_timeout: t.Union[DefaultType, bool] = DEFAULT,
+        concurrency_limiter: t.Union[
+            DefaultType, None, AdaptiveConcurrencyLimiter
+        ] = DEFAULT,
+        rate_limiter: t.Union[DefaultType, None, RateLimiter] = DEFAULT,
+        response_cache: t.Union[DefaultType, None, ResponseCache] = DEFAULT,
+        request_coalescer: t.Union[DefaultType, None, RequestCoalescer] = DEFAULT,
+        search_batcher: t.Union[DefaultType, None, SearchBatcher] = DEFAULT,
+        suggestion_cache: t.Union[DefaultType, None, SuggestionCache] = DEFAULT,
     ) -> _TYPE_SELF:
         client = type(self)(_transport=self.transport)
 
@@ -209,6 +233,38 @@ class BaseClient:
                 raise TypeError("'retry_on_timeout' must be of type 'bool'")
             client._retry_on_timeout = retry_on_timeout
 
+        if concurrency_limiter is not DEFAULT:
+            client._concurrency_limiter = concurrency_limiter
+        else:
+            client._concurrency_limiter = self._concurrency_limiter
+
+        if rate_limiter is not DEFAULT:
+            client._rate_limiter = rate_limiter
+        else:
+            client._rate_limiter = self._rate_limiter
+
+        if response_cache is not DEFAULT:
+            client._response_cache = response_cache
+        else:
+            client._response_cache = self._response_cache
+
+        if request_coalescer is not DEFAULT:
+            client._request_coalescer = request_coalescer
+        else:
+            client._request_coalescer = self._request_coalescer
+
+        if search_batcher is not DEFAULT:
+            client._search_batcher = search_batcher
+        else:
+            client._search_batcher = self._search_batcher
+
+        if suggestion_cache is not DEFAULT:
+            client._suggestion_cache = suggestion_cache
+        else:
+            client._suggestion_cache = self._suggestion_cache
+
+        client._chunk_byte_limits = self._chunk_byte_limits
+
         return client
 
     async def perform_request(
@@ -225,10 +281,157 @@ class BaseClient:
         else:
             request_target = path
 
+        cache_key = None
+        # Responses of requests ignoring statuses may be errors,
+        # these requests neither use nor fill the cache.
+        if self._response_cache is not None and self._ignore_status is None:
+            cache_key = self._response_cache.key(
+                method, request_target, request_headers, body
+            )
+            if cache_key is not None:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    return cached  # type: ignore[no-any-return]
+
+        suggestion_key = None
+        if self._suggestion_cache is not None and self._ignore_status is None:
+            suggestion_key = self._suggestion_cache.key(
+                method, request_target, request_headers, body
+            )
+            if suggestion_key is not None:
+                cached = self._suggestion_cache.get(suggestion_key)
+                if cached is not None:
+                    return cached  # type: ignore[no-any-return]
+
+        batch_key = None
+        if self._search_batcher is not None and self._ignore_status is None:
+            batch_key = self._search_batcher.key(
+                method, request_target, request_headers, body
+            )
+            if batch_key is not None:
+                # Searches are only batched with ones sent with the same options.
+                batch_key += self._options_key()
+        if batch_key is not None:
+            async with self._search_batcher.batch(batch_key, body) as batch:  # type: ignore[union-attr]
+                if batch.leader:
+                    multi_resp = await self.perform_request(
+                        "POST",
+                        batch_key[0],
+                        headers=request_headers,
+                        body={"queries": batch.bodies},
+                    )
+                    batch.responses = [
+                        ObjectApiResponse(body=result, meta=multi_resp.meta)
+                        for result in multi_resp.body
+                    ]
+            # Without a response the search wasn't batched and is sent alone.
+            if batch.response is not None:
+                if cache_key is not None and 200 <= batch.response.meta.status < 300:
+                    self._response_cache.put(cache_key, batch.response)  # type: ignore[union-attr]
+                return batch.response  # type: ignore[no-any-return]
+
+        flight_key = None
+        # Requests ignoring statuses can't share responses with requests
+        # raising for them, nor the other way round.
+        if self._request_coalescer is not None and self._ignore_status is None:
+            flight_key = self._request_coalescer.key(
+                method, request_target, request_headers, body
+            )
+            if flight_key is not None:
+                # Only requests sent with the same options are identical.
+                flight_key += self._options_key()
+        if flight_key is not None:
+            # Identical requests in flight share the response of the first one.
+            async with self._request_coalescer.flight(flight_key) as flight:  # type: ignore[union-attr]
+                if flight.leader:
+                    flight.response = await self._throttled_request(
+                        method, path, request_target, request_headers, body
+                    )
+            resp = flight.response
+        else:
+            resp = await self._throttled_request(
+                method, path, request_target, request_headers, body
+            )
+
+        if method == "HEAD":
+            response = HeadApiResponse(meta=resp.meta)
+        elif isinstance(resp.body, dict):
+            response = ObjectApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
+        elif isinstance(resp.body, list):
+            response = ListApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
+        elif isinstance(resp.body, str):
+            response = TextApiResponse(  # type: ignore[assignment]
+                body=resp.body,
+                meta=resp.meta,
+            )
+        elif isinstance(resp.body, bytes):
+            response = BinaryApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
+        else:
+            response = ApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
+
+        if cache_key is not None and 200 <= response.meta.status < 300:
+            self._response_cache.put(cache_key, response)  # type: ignore[union-attr]
+        if suggestion_key is not None and 200 <= response.meta.status < 300:
+            self._suggestion_cache.put(suggestion_key, response)  # type: ignore[union-attr]
+        return response
+
+    def _options_key(self) -> t.Tuple[str, ...]:
+        """Returns the transport options requests are sent with as a key"""
+        return tuple(
+            repr(option)
+            for option in (
+                self._request_timeout,
+                self._max_retries,
+                self._retry_on_status,
+                self._retry_on_timeout,
+            )
+        )
+
+    async def _throttled_request(
+        self,
+        method: str,
+        path: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Any:
+        if self._rate_limiter is None:
+            return await self._send_request(method, target, headers, body)
+
+        size = 0
+        if body is not None and self._rate_limiter.limits_bytes(path):
+            # Serialize the body once here to know its size,
+            # the transport sends serialized bodies as-is.
+            body = self.transport.serializers.dumps(
+                body, mimetype=headers.get("content-type")
+            )
+            size = len(body)
+        async with self._rate_limiter.throttle(path, size):
+            return await self._send_request(method, target, headers, body)
+
+    async def _send_request(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Any:
+        if self._concurrency_limiter is not None:
+            async with self._concurrency_limiter.slot():
+                return await self._transport_request(method, target, headers, body)
+        return await self._transport_request(method, target, headers, body)
+
+    async def _transport_request(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Any:
         resp = await self.transport.perform_request(
             method,
-            request_target,
-            headers=request_headers,
+            target,
+            headers=headers,
             body=body,
             request_timeout=self._request_timeout,
             max_retries=self._max_retries,
@@ -249,21 +452,4 @@ class BaseClient:
             raise _HTTP_EXCEPTIONS.get(resp.meta.status, ApiError)(
                 message=message, meta=resp.meta, body=resp.body
             )
-
-        if method == "HEAD":
-            response = HeadApiResponse(meta=resp.meta)
-        elif isinstance(resp.body, dict):
-            response = ObjectApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
-        elif isinstance(resp.body, list):
-            response = ListApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
-        elif isinstance(resp.body, str):
-            response = TextApiResponse(  # type: ignore[assignment]
-                body=resp.body,
-                meta=resp.meta,
-            )
-        elif isinstance(resp.body, bytes):
-            response = BinaryApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
-        else:
-            response = ApiResponse(body=resp.body, meta=resp.meta)  # type: ignore[assignment]
-
-        return response
+        return resp
@@ -0,0 +1,151 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Checkpoint stores letting interrupted bulk helpers resume
+from the last document acknowledged by the server.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import typing as t
+
+
+class CheckpointStore:
+    """Base class for stores of the number of input documents
+    acknowledged by the server for each bulk operation target.
+    """
+
+    def get(self, key: str) -> t.Optional[int]:
+        """Returns the stored offset for a key or ``None``"""
+        raise NotImplementedError()
+
+    def set(self, key: str, offset: int) -> None:
+        """Stores the offset for a key"""
+        raise NotImplementedError()
+
+    def delete(self, key: str) -> None:
+        """Removes the offset stored for a key if any"""
+        raise NotImplementedError()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a small JSON file. The file is replaced
+    atomically on each update so it's never left partially written.
+
+    :param path: Path of the JSON file, created on the first update
+    """
+
+    def __init__(self, path: t.Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._offsets: t.Dict[str, int] = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._offsets = json.load(f)
+
+    def get(self, key: str) -> t.Optional[int]:
+        with self._lock:
+            return self._offsets.get(key)
+
+    def set(self, key: str, offset: int) -> None:
+        with self._lock:
+            self._offsets[key] = offset
+            self._write()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._offsets.pop(key, None) is not None:
+                self._write()
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._offsets, f)
+        os.replace(tmp_path, self.path)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a SQLite database which
+    can be shared by many ingestion jobs.
+
+    :param path: Path of the SQLite database, created if it doesn't exist
+    """
+
+    def __init__(self, path: t.Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        # Checkpoints are written from whichever thread consumes the results.
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints "
+                "(key TEXT PRIMARY KEY, offset INTEGER NOT NULL)"
+            )
+
+    def get(self, key: str) -> t.Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset FROM checkpoints WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else int(row[0])
+
+    def set(self, key: str, offset: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, offset) VALUES (?, ?)",
+                (key, offset),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _Checkpointer:
+    """Tracks which chunks of a bulk operation were acknowledged and stores the
+    offset up to which every document was acknowledged. Chunks sent concurrently
+    can complete in any order so the offset only advances over contiguous chunks.
+    """
+
+    def __init__(self, store: t.Optional[CheckpointStore], key: str) -> None:
+        self.store = store
+        self.key = key
+        self.offset = (store.get(key) or 0) if store is not None else 0
+        self._completed: t.Dict[int, int] = {}
+
+    def acknowledge(self, offset: int, count: int) -> None:
+        if self.store is None:
+            return
+        self._completed[offset] = offset + count
+        advanced = self.offset
+        while advanced in self._completed:
+            advanced = self._completed.pop(advanced)
+        if advanced != self.offset:
+            self.offset = advanced
+            self.store.set(self.key, advanced)
+
+    def finish(self) -> None:
+        """Clears the checkpoint once every document was acknowledged
+        so the next operation on the same target starts from the beginning.
+        """
+        if self.store is not None:
+            self.store.delete(self.key)
@@ -0,0 +1,182 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Coalescing of identical requests in flight at the same time"""
+
+import asyncio
+import re
+import threading
+import typing as t
+
+from ._utils import _request_key, _wake_waiter
+
+# Paths of the search APIs whose POST requests don't change anything.
+_SEARCH_PATHS = re.compile(
+    r"^(?:/api/as/v1/engines/[^/?]+/"
+    r"(?:search|multi_search|search_explain|query_suggestion)"
+    r"|/api/as/v0/engines/[^/?]+/elasticsearch/_search"
+    r"|/api/ws/v1/search)(?:\?|$)"
+)
+
+
+class _Call:
+    """A request in flight and the callers waiting for its response"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: t.Any = None
+        self.error: t.Optional[BaseException] = None
+        self.async_waiters: t.List[t.Tuple[t.Any, "asyncio.Future[None]"]] = []
+
+
+class RequestCoalescer:
+    """Shares a single request and its response between identical requests
+    sent at the same time by the clients it's passed to with
+    ``request_coalescer``.
+
+    GET requests and POST requests of the search APIs are coalesced when
+    they have the same method, path, query parameters, ``authorization``
+    header and body, ignoring the order of the body's keys. The first
+    request is sent and the identical requests made while it's in flight
+    wait for its response, or its error, instead of being sent. Responses
+    are shared between callers and must not be modified.
+    """
+
+    def __init__(self) -> None:
+        #: Number of requests which got the response of another request
+        self.coalesced = 0
+
+        self._calls: t.Dict[t.Tuple[str, ...], _Call] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct requests currently in flight"""
+        return len(self._calls)
+
+    def key(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Optional[t.Tuple[str, ...]]:
+        """Returns the key identical requests share or ``None``
+        if the request may change something and isn't coalesced.
+        """
+        if method != "GET" and not (method == "POST" and _SEARCH_PATHS.match(target)):
+            return None
+        return _request_key(method, target, headers, body)
+
+    def flight(self, key: t.Tuple[str, ...]) -> "_Flight":
+        """Context manager joining the request in flight with the same key,
+        usable with both ``with`` and ``async with``. On entering either
+        ``leader`` is true and the request must be sent and its response
+        assigned to ``response``, or the leader's ``response`` is set.
+        """
+        return _Flight(self, key)
+
+    def _join(self, key: t.Tuple[str, ...]) -> t.Tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                return call, True
+            return call, False
+
+    def _finish(
+        self,
+        key: t.Tuple[str, ...],
+        call: _Call,
+        response: t.Any,
+        error: t.Optional[BaseException],
+    ) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.response, call.error = response, error
+            call.done.set()
+            waiters, call.async_waiters = call.async_waiters, []
+        for loop, waiter in waiters:
+            _wake_waiter(loop, waiter)
+
+    def _shared_response(self, call: _Call) -> t.Tuple[bool, t.Any]:
+        """Returns whether the leader completed and if so its response,
+        a leader which was interrupted or cancelled leaves its followers
+        to send the request again.
+        """
+        if isinstance(call.error, asyncio.CancelledError) or (
+            call.error is not None and not isinstance(call.error, Exception)
+        ):
+            return False, None
+        with self._lock:
+            self.coalesced += 1
+        if call.error is not None:
+            raise call.error
+        return True, call.response
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} in_flight={self.in_flight} "
+            f"coalesced={self.coalesced}>"
+        )
+
+
+class _Flight:
+    def __init__(self, coalescer: RequestCoalescer, key: t.Tuple[str, ...]) -> None:
+        self._coalescer = coalescer
+        self._key = key
+        self._call: t.Optional[_Call] = None
+        self.leader = False
+        self.response: t.Any = None
+
+    def __enter__(self) -> "_Flight":
+        while True:
+            call, self.leader = self._coalescer._join(self._key)
+            if self.leader:
+                self._call = call
+                return self
+            call.done.wait()
+            done, self.response = self._coalescer._shared_response(call)
+            if done:
+                return self
+
+    def __exit__(self, _: t.Any, error: t.Optional[BaseException], __: t.Any) -> None:
+        if self.leader:
+            self._coalescer._finish(self._key, self._call, self.response, error)  # type: ignore[arg-type]
+
+    async def __aenter__(self) -> "_Flight":
+        loop = asyncio.get_event_loop()
+        while True:
+            call, self.leader = self._coalescer._join(self._key)
+            if self.leader:
+                self._call = call
+                return self
+            with self._coalescer._lock:
+                waiter = None
+                if not call.done.is_set():
+                    waiter = loop.create_future()
+                    call.async_waiters.append((loop, waiter))
+            if waiter is not None:
+                await waiter
+            done, self.response = self._coalescer._shared_response(call)
+            if done:
+                return self
+
+    async def __aexit__(
+        self, _: t.Any, error: t.Optional[BaseException], __: t.Any
+    ) -> None:
+        self.__exit__(None, error, None)
@@ -0,0 +1,190 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Adaptive limit of the number of requests a client sends concurrently"""
+
+import asyncio
+import threading
+import time
+import typing as t
+
+from elastic_transport import ConnectionTimeout
+
+from ._utils import _wake_waiter
+from .exceptions import ApiError
+
+# Statuses of responses telling that Enterprise Search is overloaded.
+_OVERLOAD_STATUSES = frozenset((429, 503, 504))
+
+
+def _is_overload(error: t.Optional[BaseException]) -> bool:
+    if isinstance(error, ConnectionTimeout):
+        return True
+    return isinstance(error, ApiError) and error.meta.status in _OVERLOAD_STATUSES
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits the number of requests in flight with an additive-increase /
+    multiplicative-decrease (AIMD) controller.
+
+    The limit grows by one for each round of ``limit`` responses while the
+    latency stays close to the lowest latency observed and is multiplied by
+    ``backoff_ratio`` when a response is slower than ``latency_tolerance``
+    times that latency or when Enterprise Search is overloaded (429, 503
+    and 504 responses or timeouts). The limit is decreased at most once per
+    round trip so a burst of slow responses counts as a single signal.
+
+    A limiter is shared by all the requests of the clients it's passed to
+    with ``concurrency_limiter``, requests wait for a free slot before being
+    sent. Helpers sending requests from several threads or tasks, like
+    ``parallel_bulk()``, adapt to the limit when given an upper bound of
+    workers with ``max_concurrency``.
+
+    :param initial_limit: Number of requests allowed in flight at first
+    :param min_limit: Lowest number of requests the limit decreases to
+    :param max_limit: Highest number of requests the limit increases to
+    :param latency_tolerance: Ratio of the lowest latency above which
+        responses are considered slow
+    :param backoff_ratio: Ratio the limit is multiplied with when decreasing
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.5,
+    ) -> None:
+        if not isinstance(min_limit, int) or min_limit < 1:
+            raise ValueError("'min_limit' must be a positive integer")
+        if not isinstance(max_limit, int) or max_limit < min_limit:
+            raise ValueError("'max_limit' must be an integer of at least 'min_limit'")
+        if not isinstance(initial_limit, int) or not (
+            min_limit <= initial_limit <= max_limit
+        ):
+            raise ValueError(
+                "'initial_limit' must be an integer between 'min_limit' and 'max_limit'"
+            )
+        if latency_tolerance <= 1:
+            raise ValueError("'latency_tolerance' must be greater than 1")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("'backoff_ratio' must be between 0 and 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._min_latency: t.Optional[float] = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters: t.List[t.Tuple[t.Any, "asyncio.Future[None]"]] = []
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight"""
+        return self._in_flight
+
+    def slot(self) -> "_Slot":
+        """Context manager holding a slot while a request is in flight,
+        usable with both ``with`` and ``async with``.
+        """
+        return _Slot(self)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def async_acquire(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Frees the slot of a completed request and adjusts the limit
+        with the request's latency in seconds.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            else:
+                # Let the lowest latency drift up slowly so a permanent
+                # change of the cluster's latency isn't seen as congestion.
+                self._min_latency += (latency - self._min_latency) * 0.01
+            slow = latency > self._min_latency * self.latency_tolerance
+            if overloaded or slow:
+                if now - self._last_decrease >= latency:
+                    self._last_decrease = now
+                    self._limit = max(
+                        float(self.min_limit), self._limit * self.backoff_ratio
+                    )
+            elif (self._in_flight + 1) * 2 >= self.limit:
+                # Only grow while at least half of the limit is used, an idle
+                # client would otherwise reach 'max_limit' regardless of the cluster.
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            _wake_waiter(loop, waiter)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} limit={self.limit} in_flight={self.in_flight}>"
+
+
+class _Slot:
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter) -> None:
+        self._limiter = limiter
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._limiter.acquire()
+        self._start = time.monotonic()
+
+    def __exit__(self, _: t.Any, error: t.Optional[BaseException], __: t.Any) -> None:
+        self._limiter.release(time.monotonic() - self._start, _is_overload(error))
+
+    async def __aenter__(self) -> None:
+        await self._limiter.async_acquire()
+        self._start = time.monotonic()
+
+    async def __aexit__(
+        self, _: t.Any, error: t.Optional[BaseException], __: t.Any
+    ) -> None:
+        self._limiter.release(time.monotonic() - self._start, _is_overload(error))
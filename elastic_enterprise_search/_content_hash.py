@@ -0,0 +1,90 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Stores of content hashes letting the bulk helpers
+skip documents which didn't change since they were indexed.
+"""
+
+import os
+import sqlite3
+import threading
+import typing as t
+
+
+class ContentHashStore:
+    """Base class for stores mapping the ID of each indexed document to a hash
+    of its serialized content. Hashes are grouped by ``scope``, the engine or
+    content source the documents were indexed into.
+    """
+
+    def get(self, scope: str, doc_id: str) -> t.Optional[str]:
+        """Returns the hash stored for a document or ``None``"""
+        raise NotImplementedError()
+
+    def update(self, scope: str, hashes: t.Iterable[t.Tuple[str, str]]) -> None:
+        """Stores the hashes of documents given as ``(doc_id, hash)`` pairs"""
+        raise NotImplementedError()
+
+    def delete(self, scope: str, doc_ids: t.Iterable[str]) -> None:
+        """Removes the hashes stored for documents"""
+        raise NotImplementedError()
+
+
+class SQLiteContentHashStore(ContentHashStore):
+    """Stores content hashes in a SQLite database
+
+    :param path: Path of the SQLite database, created if it doesn't exist
+    """
+
+    def __init__(self, path: t.Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        # Hashes are read and written from the threads sending chunks.
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS content_hashes "
+                "(scope TEXT, id TEXT, hash TEXT NOT NULL, PRIMARY KEY (scope, id)) "
+                "WITHOUT ROWID"
+            )
+
+    def get(self, scope: str, doc_id: str) -> t.Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM content_hashes WHERE scope = ? AND id = ?",
+                (scope, doc_id),
+            ).fetchone()
+        return None if row is None else str(row[0])
+
+    def update(self, scope: str, hashes: t.Iterable[t.Tuple[str, str]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO content_hashes (scope, id, hash) VALUES (?, ?, ?)",
+                ((scope, doc_id, digest) for doc_id, digest in hashes),
+            )
+
+    def delete(self, scope: str, doc_ids: t.Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM content_hashes WHERE scope = ? AND id = ?",
+                ((scope, doc_id) for doc_id in doc_ids),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
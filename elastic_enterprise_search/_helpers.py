@@ -0,0 +1,757 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Pieces of the bulk helpers which don't perform I/O and
+are shared between the sync and async implementations.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import typing as t
+from itertools import islice
+
+from ._checkpoint import CheckpointStore, _Checkpointer
+from ._content_hash import ContentHashStore
+from ._utils import SKIP_IN_PATH, _quote
+
+if t.TYPE_CHECKING:
+    from elastic_transport import Serializer
+
+# Enterprise Search rejects bulk document requests with more than 100 documents.
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+# App Search returns at most 1,000 results per page and
+# won't paginate beyond the first 10,000 results of a search.
+_MAX_SEARCH_PAGE_SIZE = 1000
+_MAX_SEARCH_RESULTS = 10000
+# Deleted documents are returned by searches until the engine refreshes.
+_REFRESH_INTERVAL = 1.0
+_MAX_REFRESH_WAITS = 10
+# Documents per request when scanning a Workplace Search content source.
+DEFAULT_SCAN_PAGE_SIZE = 100
+# Hits per 'search_es_search' request when exporting an App Search engine.
+DEFAULT_EXPORT_PAGE_SIZE = 1000
+# Sort giving every document of an engine a unique position for 'search_after'.
+_EXPORT_SORT = ({"id": "asc"},)
+
+_BULK_HEADERS = {"accept": "application/json", "content-type": "application/json"}
+# (product, op_type) -> (method, path) of the endpoints the bulk helpers send chunks to.
+_BULK_ENDPOINTS = {
+    ("app_search", "index"): ("POST", "/api/as/v1/engines/{}/documents"),
+    ("app_search", "update"): ("PATCH", "/api/as/v1/engines/{}/documents"),
+    ("app_search", "delete"): ("DELETE", "/api/as/v1/engines/{}/documents"),
+    ("workplace_search", "index"): (
+        "POST",
+        "/api/ws/v1/sources/{}/documents/bulk_create",
+    ),
+    ("workplace_search", "delete"): (
+        "POST",
+        "/api/ws/v1/sources/{}/documents/bulk_destroy",
+    ),
+}
+
+
+# Per-document errors caused by the state of the deployment rather than by
+# the document itself. Documents failing with these errors are sent again.
+_TRANSIENT_ITEM_ERRORS = (
+    "timed out",
+    "timeout",
+    "try again",
+    "temporarily",
+    "too many requests",
+    "rejected execution",
+    "unavailable",
+)
+
+
+class BulkItemError(t.NamedTuple):
+    """A document which a bulk helper couldn't index"""
+
+    #: Position of the document within the input iterable
+    position: int
+    #: ID of the document if known
+    id: t.Optional[str]
+    #: Error messages returned for the document
+    errors: t.List[str]
+
+
+class BulkChunkResult(t.NamedTuple):
+    """Result of sending one chunk of documents with a bulk helper"""
+
+    #: Position of the chunk's first document within the input iterable
+    offset: int
+    #: Per-document results returned by the server, in input order
+    items: t.List[t.Any]
+    #: Documents which failed permanently or ran out of retries
+    errors: t.List[BulkItemError]
+    #: Number of unchanged documents covered by the chunk which weren't sent
+    skipped: int = 0
+
+
+class DeleteByFilterResult(t.NamedTuple):
+    """Summary of deleting the documents matching a filter"""
+
+    #: Number of documents deleted
+    deleted: int
+    #: Documents which couldn't be deleted
+    errors: t.List[BulkItemError]
+    #: Number of seconds spent searching and deleting documents
+    duration: float
+    #: Whether documents matching the filter remain, when the documents
+    #: which couldn't be deleted fill the first 10,000 results of the search
+    #: or the filter matches more than 10,000 documents which can't be
+    #: excluded from the search once deleted
+    remaining: bool = False
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.deleted / self.duration if self.duration > 0 else 0.0
+
+
+class UpdateByFilterResult(t.NamedTuple):
+    """Summary of updating the documents matching a filter"""
+
+    #: Number of documents updated
+    updated: int
+    #: Documents which couldn't be updated
+    errors: t.List[BulkItemError]
+    #: Number of seconds spent searching and updating documents
+    duration: float
+    #: Whether documents matching the filter remain, when the documents
+    #: which couldn't be updated fill the first 10,000 results of the search
+    #: or the filter matches more than 10,000 documents which can't be
+    #: excluded from the search once updated
+    remaining: bool = False
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.updated / self.duration if self.duration > 0 else 0.0
+
+
+class ReindexResult(t.NamedTuple):
+    """Summary of copying the documents of an engine into another engine"""
+
+    #: Number of documents read from the source engine
+    exported: int
+    #: Number of documents indexed into the destination engine
+    indexed: int
+    #: Documents which couldn't be indexed
+    errors: t.List[BulkItemError]
+    #: Number of seconds spent reading and indexing documents
+    duration: float
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.indexed / self.duration if self.duration > 0 else 0.0
+
+
+class SearchManyResult(t.NamedTuple):
+    """Merged results of searching several App Search engines"""
+
+    #: Results of the requested page by descending '_meta.score' across engines
+    results: t.List[t.Any]
+    #: Facets of the engines, with the counts of the same value or range summed
+    facets: t.Dict[str, t.List[t.Any]]
+    #: Number of results matching the query in the engines which responded
+    total_results: int
+    #: Errors of the engines which failed or timed out, by engine name
+    errors: t.Dict[str, Exception]
+
+    @property
+    def partial(self) -> bool:
+        """Whether some engines are missing from the results"""
+        return bool(self.errors)
+
+
+class _Chunk(t.NamedTuple):
+    #: Position of the first input document covered by the chunk
+    offset: int
+    #: Number of input documents covered, including unchanged documents not sent
+    count: int
+    parts: t.List[bytes]
+    #: Position of each part within the input
+    positions: t.List[int]
+    #: ID and content hash of each part if tracked
+    keys: t.List[t.Optional[t.Tuple[str, str]]]
+
+
+def _encode_body(parts: t.Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(parts) + b"]"
+
+
+class _ChunkBuffer:
+    """Groups serialized documents into chunks bounded both
+    by the number of documents and by the size of the request body.
+    A single document larger than 'max_chunk_bytes' is sent on its own.
+    """
+
+    def __init__(self, chunk_size: int, max_chunk_bytes: int, offset: int = 0) -> None:
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("'chunk_size' must be a positive integer")
+        if not isinstance(max_chunk_bytes, int) or max_chunk_bytes < 1:
+            raise ValueError("'max_chunk_bytes' must be a positive integer")
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self._offset = offset
+        self._reset()
+
+    def _reset(self) -> None:
+        self._count = 0
+        self._parts: t.List[bytes] = []
+        self._positions: t.List[int] = []
+        self._keys: t.List[t.Optional[t.Tuple[str, str]]] = []
+        self._size = 2  # Surrounding '[' and ']'
+
+    def add(
+        self, part: bytes, key: t.Optional[t.Tuple[str, str]] = None
+    ) -> t.Optional[_Chunk]:
+        """Adds a serialized document to the buffer. Returns the
+        previously buffered chunk if adding the document would overflow it.
+        """
+        chunk = None
+        if self._parts and (
+            len(self._parts) >= self.chunk_size
+            or self._size + len(part) + 1 > self.max_chunk_bytes
+        ):
+            chunk = self.flush()
+        self._parts.append(part)
+        self._positions.append(self._offset + self._count)
+        self._keys.append(key)
+        self._count += 1
+        self._size += len(part) + 1
+        return chunk
+
+    def skip(self) -> t.Optional[_Chunk]:
+        """Covers an unchanged document which isn't sent. Returns the buffered
+        chunk once it covers 'chunk_size' unchanged documents and nothing to
+        send so long runs of unchanged documents are still reported.
+        """
+        self._count += 1
+        if not self._parts and self._count >= self.chunk_size:
+            return self.flush()
+        return None
+
+    def limit_max_chunk_bytes(self, max_chunk_bytes: int) -> None:
+        """Lowers the size of the following chunks after the
+        server rejected a request body as being too large.
+        """
+        self.max_chunk_bytes = max(1, min(self.max_chunk_bytes, max_chunk_bytes))
+
+    def flush(self) -> t.Optional[_Chunk]:
+        """Returns the buffered chunk if any documents are buffered"""
+        if not self._count:
+            return None
+        chunk = _Chunk(
+            offset=self._offset,
+            count=self._count,
+            parts=self._parts,
+            positions=self._positions,
+            keys=self._keys,
+        )
+        self._offset += self._count
+        self._reset()
+        return chunk
+
+
+class _BulkRequest(t.NamedTuple):
+    """Settings of a bulk helper call shared by the requests of all its chunks"""
+
+    method: str
+    path: str
+    op_type: str
+    buffer: _ChunkBuffer
+    max_retries: int
+    initial_backoff: float
+    max_backoff: float
+    hash_store: t.Optional[ContentHashStore]
+    #: Engine or content source the content hashes and
+    #: the learned chunk byte limits are stored for
+    scope: str
+    #: Client's learned chunk byte limits by scope
+    chunk_byte_limits: t.MutableMapping[str, int]
+
+
+def _bulk_request(
+    *,
+    op_type: str,
+    engine_name: t.Optional[str],
+    content_source_id: t.Optional[str],
+    chunk_size: int,
+    max_chunk_bytes: int,
+    max_retries: int,
+    initial_backoff: float,
+    max_backoff: float,
+    checkpoint: t.Optional[CheckpointStore],
+    hash_store: t.Optional[ContentHashStore],
+    chunk_byte_limits: t.MutableMapping[str, int],
+) -> t.Tuple[_BulkRequest, _Checkpointer]:
+    """Validates the parameters of a bulk helper call and
+    returns its settings along with its checkpoint tracker.
+    Chunks start at the byte limit learned by earlier calls
+    for the same engine or content source if it's lower.
+    """
+    method, path = _bulk_target(op_type, engine_name, content_source_id)
+    if not isinstance(max_retries, int) or max_retries < 0:
+        raise ValueError("'max_retries' must be a non-negative integer")
+    checkpointer = _Checkpointer(checkpoint, f"{method} {path}")
+    scope = (
+        f"engine:{engine_name}"
+        if engine_name is not None
+        else f"content_source:{content_source_id}"
+    )
+    buffer = _ChunkBuffer(
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        offset=checkpointer.offset,
+    )
+    if scope in chunk_byte_limits:
+        buffer.limit_max_chunk_bytes(chunk_byte_limits[scope])
+    request = _BulkRequest(
+        method=method,
+        path=path,
+        op_type=op_type,
+        buffer=buffer,
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+        max_backoff=max_backoff,
+        hash_store=hash_store,
+        scope=scope,
+        chunk_byte_limits=chunk_byte_limits,
+    )
+    return request, checkpointer
+
+
+def _limit_chunk_bytes(request: _BulkRequest, max_chunk_bytes: int) -> None:
+    """Lowers the size of the following chunks of a bulk helper call and of
+    later calls to the same engine or content source with the same client
+    after the server rejected a request body as being too large.
+    """
+    request.buffer.limit_max_chunk_bytes(max_chunk_bytes)
+    limits = request.chunk_byte_limits
+    limits[request.scope] = min(
+        limits.get(request.scope, request.buffer.max_chunk_bytes),
+        request.buffer.max_chunk_bytes,
+    )
+
+
+def _document_encoder(
+    serializer: "Serializer", op_type: str
+) -> t.Callable[[t.Any], bytes]:
+    """Returns the function used to serialize each document of a bulk operation.
+    Documents which are already ``str`` or ``bytes`` are assumed to be encoded
+    JSON and sent as-is, except for document IDs which always need to be encoded.
+    """
+    if op_type == "delete":
+        return getattr(serializer, "json_dumps", None) or _json_dumps
+    return serializer.dumps
+
+
+def _json_dumps(data: t.Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _encode_batch(
+    encode: t.Callable[[t.Any], bytes], documents: t.List[t.Any]
+) -> t.List[bytes]:
+    """Serializes a batch of documents within a worker process"""
+    return [encode(document) for document in documents]
+
+
+def _bulk_items(body: t.Any) -> t.List[t.Any]:
+    """App Search returns per-document results as a list while
+    Workplace Search wraps the same list in a 'results' object.
+    """
+    if isinstance(body, dict):
+        return body.get("results", [])
+    return list(body)
+
+
+# Error of an App Search document which couldn't be deleted as it doesn't exist.
+_NOT_FOUND_ERROR = "Document wasn't found"
+
+
+def _item_failed(item: t.Any) -> bool:
+    # Deletes report their outcome with 'deleted' (App Search)
+    # or 'success' (Workplace Search) instead of 'errors'.
+    return isinstance(item, dict) and (
+        bool(item.get("errors"))
+        or item.get("deleted") is False
+        or item.get("success") is False
+    )
+
+
+def _item_errors(item: t.Dict[str, t.Any]) -> t.List[str]:
+    if item.get("errors"):
+        return list(item["errors"])
+    if item.get("deleted") is False:
+        return [_NOT_FOUND_ERROR]
+    return ["Operation wasn't successful"]
+
+
+def _item_is_transient(item: t.Any) -> bool:
+    errors = item.get("errors") if isinstance(item, dict) else None
+    return bool(errors) and all(
+        any(pattern in str(error).lower() for pattern in _TRANSIENT_ITEM_ERRORS)
+        for error in errors
+    )
+
+
+def _merge_items(
+    items: t.List[t.Any], positions: t.Sequence[int], results: t.List[t.Any]
+) -> t.List[int]:
+    """Stores the results of a (re-)sent chunk at their positions
+    within 'items' and returns the positions which should be retried.
+    """
+    retry = []
+    for position, item in zip(positions, results):
+        items[position] = item
+        if _item_is_transient(item):
+            retry.append(position)
+    return retry
+
+
+def _chunk_result(chunk: _Chunk, items: t.List[t.Any]) -> BulkChunkResult:
+    errors = [
+        BulkItemError(
+            position=position,
+            id=item.get("id"),
+            errors=_item_errors(item),
+        )
+        for position, item in zip(chunk.positions, items)
+        if _item_failed(item)
+    ]
+    return BulkChunkResult(
+        offset=chunk.offset,
+        items=items,
+        errors=errors,
+        skipped=chunk.count - len(chunk.parts),
+    )
+
+
+def _content_key(
+    request: _BulkRequest, document: t.Any, part: bytes
+) -> t.Optional[t.Tuple[str, str]]:
+    """Returns the ID and content hash of a document if hashes are tracked.
+    Only indexed documents are hashed, deleted and partially updated
+    documents are keyed by their ID to remove their hashes.
+    """
+    if request.hash_store is None:
+        return None
+    if request.op_type == "delete":
+        return str(document), ""
+    if not isinstance(document, t.Mapping):
+        # Documents given already encoded, malformed ones
+        # are left for Enterprise Search to report.
+        try:
+            document = json.loads(part)
+        except ValueError:
+            return None
+    doc_id = document.get("id") if isinstance(document, t.Mapping) else None
+    if doc_id is None:
+        return None
+    if request.op_type != "index":
+        return str(doc_id), ""
+    return str(doc_id), hashlib.blake2b(part, digest_size=16).hexdigest()
+
+
+def _is_unchanged(request: _BulkRequest, key: t.Optional[t.Tuple[str, str]]) -> bool:
+    return (
+        key is not None
+        and request.hash_store is not None
+        and request.op_type == "index"
+        and request.hash_store.get(request.scope, key[0]) == key[1]
+    )
+
+
+def _record_hashes(request: _BulkRequest, chunk: _Chunk, items: t.List[t.Any]) -> None:
+    """Stores the content hashes of the documents acknowledged in a chunk.
+    Hashes of deleted and updated documents are removed even if the request
+    failed so they're never skipped when indexed again.
+    """
+    if request.hash_store is None:
+        return
+    if request.op_type != "index":
+        request.hash_store.delete(
+            request.scope, [key[0] for key in chunk.keys if key is not None]
+        )
+        return
+    request.hash_store.update(
+        request.scope,
+        [
+            key
+            for key, item in zip(chunk.keys, items)
+            if key is not None and not _item_failed(item)
+        ],
+    )
+
+
+def _payload_too_large_item(part: bytes) -> t.Dict[str, t.Any]:
+    """Result for a single document the server refused to accept as too large"""
+    document = json.loads(part)
+    return {
+        "id": document.get("id") if isinstance(document, dict) else document,
+        "errors": [f"Document of {len(part)} bytes exceeds the maximum request size"],
+    }
+
+
+def _retry_backoff(attempt: int, initial_backoff: float, max_backoff: float) -> float:
+    return min(max_backoff, initial_backoff * 2 ** (attempt - 1))
+
+
+def _bulk_target(
+    op_type: str, engine_name: t.Optional[str], content_source_id: t.Optional[str]
+) -> t.Tuple[str, str]:
+    """Returns the method and path of the endpoint for a bulk operation
+    on either an App Search engine or a Workplace Search content source.
+    """
+    if (engine_name is None) == (content_source_id is None):
+        raise ValueError(
+            "Exactly one of the 'engine_name' or 'content_source_id' parameters must be used"
+        )
+    if engine_name is not None:
+        product, param, value = "app_search", "engine_name", engine_name
+    else:
+        product, param, value = (
+            "workplace_search",
+            "content_source_id",
+            content_source_id,
+        )
+    if value in SKIP_IN_PATH:
+        raise ValueError(f"Empty value passed for parameter '{param}'")
+    try:
+        method, path = _BULK_ENDPOINTS[(product, op_type)]
+    except KeyError:
+        op_types = sorted(op for prod, op in _BULK_ENDPOINTS if prod == product)
+        raise ValueError(
+            f"'op_type' must be one of {op_types!r} when using '{param}'"
+        ) from None
+    return method, path.format(_quote(value))
+
+
+def _search_ids(body: t.Any) -> t.Tuple[t.List[str], int]:
+    """Returns the document IDs and the total number of pages of an App Search response"""
+    ids = [result["id"]["raw"] for result in body["results"]]
+    return ids, body["meta"]["page"]["total_pages"]
+
+
+def _page_results(body: t.Any) -> t.Tuple[t.List[t.Any], int]:
+    """Returns the results and the total number of pages of a paged list response"""
+    return body["results"], body["meta"]["page"]["total_pages"]
+
+
+def _search_many_params(
+    engines: t.Sequence[str],
+    current_page: int,
+    page_size: int,
+    params: t.Dict[str, t.Any],
+) -> t.Dict[str, t.Any]:
+    """Returns the search parameters sent to each engine, which must
+    return all the results up to the end of the requested page.
+    """
+    if not engines:
+        raise ValueError("'engines' must contain at least one engine name")
+    if not isinstance(current_page, int) or current_page < 1:
+        raise ValueError("'current_page' must be a positive integer")
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError("'page_size' must be a positive integer")
+    if current_page * page_size > _MAX_SEARCH_PAGE_SIZE:
+        raise ValueError(
+            f"'current_page' * 'page_size' must be at most {_MAX_SEARCH_PAGE_SIZE}"
+        )
+    for param in ("sort", "group"):
+        if param in params:
+            raise ValueError(
+                f"'{param}' isn't supported as results are merged by score"
+            )
+    return dict(params, current_page=1, page_size=current_page * page_size)
+
+
+def _result_score(result: t.Any) -> float:
+    return result.get("_meta", {}).get("score") or 0.0  # type: ignore[no-any-return]
+
+
+def _merge_search_results(
+    bodies: t.Sequence[t.Any],
+    current_page: int,
+    page_size: int,
+    errors: t.Dict[str, Exception],
+) -> SearchManyResult:
+    """Merges the score ordered results of the engines with a k-way heap
+    merge, only consuming the results up to the end of the requested page.
+    """
+    merged = heapq.merge(
+        *(body["results"] for body in bodies), key=_result_score, reverse=True
+    )
+    start = (current_page - 1) * page_size
+    return SearchManyResult(
+        results=list(islice(merged, start, start + page_size)),
+        facets=_merge_facets(bodies),
+        total_results=sum(body["meta"]["page"]["total_results"] for body in bodies),
+        errors=errors,
+    )
+
+
+def _merge_facets(bodies: t.Sequence[t.Any]) -> t.Dict[str, t.List[t.Any]]:
+    """Sums the counts of the same value or range of each facet across
+    engines. Value facets are sorted by count again and keep as many
+    values as the engine returning the most of them.
+    """
+    merged: t.Dict[str, t.List[t.Dict[str, t.Any]]] = {}
+    for body in bodies:
+        for field, facets in (body.get("facets") or {}).items():
+            field_facets = merged.setdefault(field, [])
+            for position, facet in enumerate(facets):
+                if position == len(field_facets):
+                    field_facets.append(
+                        {"facet": facet, "counts": {}, "size": 0, "data": {}}
+                    )
+                acc = field_facets[position]
+                acc["size"] = max(acc["size"], len(facet["data"]))
+                for item in facet["data"]:
+                    key = json.dumps(
+                        {k: v for k, v in item.items() if k != "count"},
+                        sort_keys=True,
+                    )
+                    acc["data"].setdefault(key, item)
+                    acc["counts"][key] = acc["counts"].get(key, 0) + item["count"]
+
+    facets = {}
+    for field, field_facets in merged.items():
+        facets[field] = []
+        for acc in field_facets:
+            data = [
+                dict(item, count=acc["counts"][key])
+                for key, item in acc["data"].items()
+            ]
+            if acc["facet"].get("type") == "value":
+                data.sort(key=lambda item: item["count"], reverse=True)
+                data = data[: acc["size"]]
+            facets[field].append(dict(acc["facet"], data=data))
+    return facets
+
+
+def _next_cursor(body: t.Any) -> t.Optional[str]:
+    """Returns the cursor of the next page of a Workplace Search document
+    list, found in 'meta.cursor.next' or 'meta.page.next_cursor'.
+    """
+    meta = body.get("meta") or {}
+    return (meta.get("cursor") or {}).get("next") or (meta.get("page") or {}).get(
+        "next_cursor"
+    )
+
+
+def _export_body(
+    query: t.Optional[t.Mapping[str, t.Any]],
+    sort: t.Sequence[t.Any],
+    page_size: int,
+    search_after: t.Optional[t.List[t.Any]],
+    slice_id: int = 0,
+    slices: int = 1,
+) -> t.Dict[str, t.Any]:
+    """Returns the Elasticsearch search body of the next page of an export.
+    Slices split the documents by the hash of the first sort field as the
+    Elasticsearch 'slice' option needs a scroll or point in time.
+    """
+    query = dict(query) if query else {"match_all": {}}
+    if slices > 1:
+        field = sort[0] if isinstance(sort[0], str) else next(iter(sort[0]))
+        query = {
+            "bool": {
+                "filter": [
+                    query,
+                    {
+                        "script": {
+                            "script": {
+                                "source": (
+                                    "Math.floorMod(doc[params.field].value.hashCode(), "
+                                    "params.slices) == params.slice"
+                                ),
+                                "params": {
+                                    "field": field,
+                                    "slices": slices,
+                                    "slice": slice_id,
+                                },
+                            }
+                        }
+                    },
+                ]
+            }
+        }
+    body = {
+        "query": query,
+        "sort": list(sort),
+        "size": page_size,
+        "track_total_hits": False,
+    }
+    if search_after is not None:
+        body["search_after"] = search_after
+    return body
+
+
+def _export_hits(body: t.Any) -> t.Tuple[t.List[t.Any], t.Optional[t.List[t.Any]]]:
+    """Returns the hits of an export page and the sort values to search after"""
+    hits = body["hits"]["hits"]
+    return hits, (hits[-1]["sort"] if hits else None)
+
+
+def _open_sink(
+    sink: t.Union[None, str, "os.PathLike[str]", t.BinaryIO]
+) -> t.Tuple[t.Optional[t.BinaryIO], bool]:
+    """Returns the binary file documents are written to as JSON lines
+    and whether it's opened here and has to be closed after writing.
+    """
+    if sink is None:
+        return None, False
+    if isinstance(sink, (str, os.PathLike)):
+        return open(sink, "wb"), True
+    return sink, False
+
+
+def _exclude_patched(
+    filters: t.Mapping[str, t.Any], patch: t.Mapping[str, t.Any]
+) -> t.Optional[t.Dict[str, t.Any]]:
+    """Extends search filters to exclude documents which already hold every
+    value of a partial update. Returns ``None`` when ``patch`` sets a list:
+    filters can't tell a list from a longer one holding the same values so
+    those documents can't be excluded.
+    """
+    if not patch:
+        raise ValueError("'patch' must contain at least one field")
+    if "id" in patch:
+        raise ValueError("'patch' can't change the 'id' of documents")
+    patched = []
+    for field, value in patch.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if not values or not all(
+            isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values
+        ):
+            raise ValueError(
+                f"Value for field '{field}' in 'patch' must be a string, "
+                "a number or a non-empty list of strings or numbers"
+            )
+        patched.append({field: value})
+    if any(isinstance(value, (list, tuple)) for value in patch.values()):
+        return None
+    combined: t.Dict[str, t.Any] = {"none": [{"all": patched}]}
+    if filters:
+        combined["all"] = [filters]
+    return combined
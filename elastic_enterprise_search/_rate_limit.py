@@ -0,0 +1,183 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Client-side rate limits of the requests sent to engines and API paths"""
+
+import asyncio
+import threading
+import time
+import typing as t
+
+from ._utils import _quote
+
+# App Search paths of an engine, '{}' is replaced by the quoted engine name.
+_ENGINE_PATHS = ("/api/as/v0/engines/{}", "/api/as/v1/engines/{}")
+
+
+class RateLimit(t.NamedTuple):
+    """Rates requests matching an engine or path prefix are smoothed to.
+    Traffic may exceed the rates for ``burst`` seconds worth of requests
+    or bytes after being idle.
+    """
+
+    requests_per_second: t.Optional[float] = None
+    bytes_per_second: t.Optional[float] = None
+    burst: float = 1.0
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.capacity = rate * burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes tokens from the bucket, going into debt if there aren't enough
+        and returns the number of seconds to wait until the debt is paid off.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        return max(0.0, -self.tokens / self.rate)
+
+
+class _Rule(t.NamedTuple):
+    prefixes: t.Tuple[str, ...]
+    requests: t.Optional[_TokenBucket]
+    bytes: t.Optional[_TokenBucket]
+
+
+class RateLimiter:
+    """Smooths the requests of the clients it's passed to with ``rate_limiter``
+    to token bucket rates before they're sent.
+
+    Limits are keyed by App Search engine name or by API path prefix like
+    ``/api/ws/v1/sources/``. A request is delayed until it fits in the limits
+    of every engine and path prefix its path belongs to, requests matching none
+    of them use the ``default`` limit if any. The bytes of a request are the
+    size of its serialized body.
+
+    :param engines: Limits of the requests to App Search engines by name
+    :param paths: Limits of the requests by API path prefix
+    :param default: Limit of the requests matching no engine or path prefix
+    """
+
+    def __init__(
+        self,
+        *,
+        engines: t.Optional[t.Mapping[str, RateLimit]] = None,
+        paths: t.Optional[t.Mapping[str, RateLimit]] = None,
+        default: t.Optional[RateLimit] = None,
+    ) -> None:
+        self._rules: t.List[_Rule] = []
+        for engine_name, limit in (engines or {}).items():
+            self._rules.append(
+                _rule(
+                    tuple(path.format(_quote(engine_name)) for path in _ENGINE_PATHS),
+                    limit,
+                )
+            )
+        for prefix, limit in (paths or {}).items():
+            if not prefix.startswith("/"):
+                raise ValueError(f"Path prefix {prefix!r} must start with '/'")
+            self._rules.append(_rule((prefix.rstrip("/"),), limit))
+        self._default = None if default is None else _rule((), default)
+        self._lock = threading.Lock()
+
+    def limits_bytes(self, path: str) -> bool:
+        """Whether the size of a request's body is limited"""
+        return any(rule.bytes is not None for rule in self._matching_rules(path))
+
+    def reserve(self, path: str, size: int = 0) -> float:
+        """Reserves a request of 'size' bytes to 'path' and returns
+        the number of seconds to wait before sending it.
+        """
+        delay = 0.0
+        with self._lock:
+            now = time.monotonic()
+            for rule in self._matching_rules(path):
+                if rule.requests is not None:
+                    delay = max(delay, rule.requests.reserve(1, now))
+                if rule.bytes is not None and size:
+                    delay = max(delay, rule.bytes.reserve(size, now))
+        return delay
+
+    def throttle(self, path: str, size: int = 0) -> "_Throttle":
+        """Context manager waiting until a request may be sent,
+        usable with both ``with`` and ``async with``.
+        """
+        return _Throttle(self, path, size)
+
+    def _matching_rules(self, path: str) -> t.List[_Rule]:
+        rules = [
+            rule
+            for rule in self._rules
+            if any(
+                path == prefix or path.startswith(prefix + "/")
+                for prefix in rule.prefixes
+            )
+        ]
+        if not rules and self._default is not None:
+            rules.append(self._default)
+        return rules
+
+
+def _rule(prefixes: t.Tuple[str, ...], limit: RateLimit) -> _Rule:
+    if limit.requests_per_second is None and limit.bytes_per_second is None:
+        raise ValueError(
+            "Rate limits must set 'requests_per_second' or 'bytes_per_second'"
+        )
+    for rate in (limit.requests_per_second, limit.bytes_per_second, limit.burst):
+        if rate is not None and rate <= 0:
+            raise ValueError("Rates and burst of rate limits must be positive")
+    return _Rule(
+        prefixes=prefixes,
+        requests=(
+            None
+            if limit.requests_per_second is None
+            else _TokenBucket(limit.requests_per_second, limit.burst)
+        ),
+        bytes=(
+            None
+            if limit.bytes_per_second is None
+            else _TokenBucket(limit.bytes_per_second, limit.burst)
+        ),
+    )
+
+
+class _Throttle:
+    def __init__(self, limiter: RateLimiter, path: str, size: int) -> None:
+        self._limiter = limiter
+        self._path = path
+        self._size = size
+
+    def __enter__(self) -> None:
+        delay = self._limiter.reserve(self._path, self._size)
+        if delay:
+            time.sleep(delay)
+
+    def __exit__(self, *_: t.Any) -> None:
+        pass
+
+    async def __aenter__(self) -> None:
+        delay = self._limiter.reserve(self._path, self._size)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *_: t.Any) -> None:
+        pass
@@ -0,0 +1,153 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Cache of the responses to repeated search requests"""
+
+import json
+import re
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from ._utils import _request_key
+
+# Paths of the search APIs whose responses are cached.
+_CACHED_PATHS = re.compile(
+    r"^(?:/api/as/v1/engines/[^/?]+/(?:multi_)?search|/api/ws/v1/search)(?:\?|$)"
+)
+
+
+class _Entry(t.NamedTuple):
+    response: t.Any
+    size: int
+    expires: float
+
+
+class ResponseCache:
+    """Least recently used cache of the responses to App Search ``search()``
+    and ``multi_search()`` and Workplace Search ``search()`` requests of the
+    clients it's passed to with ``response_cache``.
+
+    Responses are keyed by the request's method, path, query parameters,
+    ``authorization`` header and canonical JSON body, so the same query
+    sent to the same engine with its keys in a different order hits the
+    same entry while the results of different users are kept apart.
+    A cache hit returns the cached response without sending a request.
+    Only successful responses are cached and requests sent with
+    ``ignore_status`` bypass the cache.
+
+    Cached responses are shared between callers and must not be modified.
+
+    :param max_entries: Maximum number of responses kept in the cache
+    :param max_bytes: Maximum size of the serialized responses kept in the
+        cache, by default only ``max_entries`` bounds the cache
+    :param ttl: Number of seconds a response is served from the cache
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        max_bytes: t.Optional[int] = None,
+        ttl: float = 60.0,
+    ) -> None:
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("'max_entries' must be a positive integer")
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+            raise ValueError("'max_bytes' must be a positive integer")
+        if ttl <= 0:
+            raise ValueError("'ttl' must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        #: Number of requests answered from the cache
+        self.hits = 0
+        #: Number of cacheable requests sent to Enterprise Search
+        self.misses = 0
+
+        self._entries: "OrderedDict[t.Tuple[str, ...], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the cached responses, only tracked with ``max_bytes``"""
+        return self._bytes
+
+    def key(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Optional[t.Tuple[str, ...]]:
+        """Returns the cache key of a request or ``None`` if its response isn't cached"""
+        if not _CACHED_PATHS.match(target):
+            return None
+        return _request_key(method, target, headers, body)
+
+    def get(self, key: t.Tuple[str, ...]) -> t.Optional[t.Any]:
+        """Returns the cached response of a request, counting a hit or a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.response
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: t.Tuple[str, ...], response: t.Any) -> None:
+        """Caches the response of a request, evicting the least recently used
+        responses which no longer fit in the cache.
+        """
+        size = 0
+        if self.max_bytes is not None:
+            size = len(json.dumps(response.body, separators=(",", ":"), default=str))
+            if size > self.max_bytes:
+                return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(response, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Removes every response from the cache"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: t.Tuple[str, ...]) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} entries={len(self)} "
+            f"hits={self.hits} misses={self.misses}>"
+        )
@@ -0,0 +1,252 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Micro-batching of concurrent App Search searches into multi searches"""
+
+import asyncio
+import re
+import threading
+import typing as t
+
+from ._utils import _wake_waiter
+from .exceptions import BadRequestError
+
+# Path of App Search's search API, the group is the engine's path.
+_SEARCH_PATH = re.compile(r"^(/api/as/v1/engines/[^/?]+/)search$")
+
+
+class _Batch:
+    """Searches of an engine waiting to be sent together"""
+
+    def __init__(self) -> None:
+        self.bodies: t.List[t.Any] = []
+        self.closed = False
+        self.full = threading.Event()
+        self.full_waiter: t.Optional[t.Tuple[t.Any, "asyncio.Future[None]"]] = None
+        self.done = threading.Event()
+        self.responses: t.Optional[t.List[t.Any]] = None
+        self.error: t.Optional[BaseException] = None
+        self.async_waiters: t.List[t.Tuple[t.Any, "asyncio.Future[None]"]] = []
+
+
+class SearchBatcher:
+    """Merges the App Search ``search()`` requests to the same engine made
+    within ``max_delay`` seconds of each other by the clients it's passed to
+    with ``search_batcher`` into a single ``multi_search()`` request, and
+    hands each caller the results of its query.
+
+    The first search of a batch waits up to ``max_delay`` seconds for other
+    searches to join, a batch is sent as soon as it holds ``max_batch_size``
+    searches. A search which nothing joined is sent on its own. Searches are
+    only batched with searches using the same ``authorization`` header.
+    If Enterprise Search rejects a multi search, for instance because one
+    of the queries is invalid, each search of the batch is sent on its own.
+
+    :param max_batch_size: Maximum number of searches per multi search,
+        App Search accepts up to 10
+    :param max_delay: Number of seconds a search waits for others to join
+    """
+
+    def __init__(self, *, max_batch_size: int = 10, max_delay: float = 0.002) -> None:
+        if not isinstance(max_batch_size, int) or max_batch_size < 2:
+            raise ValueError("'max_batch_size' must be an integer of at least 2")
+        if max_delay <= 0:
+            raise ValueError("'max_delay' must be positive")
+
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        #: Number of multi search requests sent
+        self.batches = 0
+        #: Number of searches sent within multi search requests
+        self.searches = 0
+
+        self._open: t.Dict[t.Tuple[str, ...], _Batch] = {}
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Optional[t.Tuple[str, ...]]:
+        """Returns the key of the batches a request can join
+        or ``None`` if the request isn't a search
+        """
+        if method != "POST" or not isinstance(body, t.Mapping):
+            return None
+        match = _SEARCH_PATH.match(target)
+        if match is None:
+            return None
+        return (match.group(1) + "multi_search", headers.get("authorization", ""))
+
+    def batch(self, key: t.Tuple[str, ...], body: t.Any) -> "_Batched":
+        """Context manager adding a search to the open batch of ``key``,
+        usable with both ``with`` and ``async with``. On entering either
+        ``leader`` is true and the multi search of ``bodies`` must be sent
+        and its responses assigned to ``responses``, or ``response`` is the
+        response to the search, or neither and the search must be sent alone.
+        """
+        return _Batched(self, key, body)
+
+    def _join(self, key: t.Tuple[str, ...], body: t.Any) -> t.Tuple[_Batch, int]:
+        with self._lock:
+            batch = self._open.get(key)
+            if batch is None:
+                batch = self._open[key] = _Batch()
+            batch.bodies.append(body)
+            if len(batch.bodies) >= self.max_batch_size:
+                self._close(key, batch)
+                batch.full.set()
+                if batch.full_waiter is not None:
+                    loop, waiter = batch.full_waiter
+                    _wake_waiter(loop, waiter)
+            return batch, len(batch.bodies) - 1
+
+    def _close(self, key: t.Tuple[str, ...], batch: _Batch) -> None:
+        if not batch.closed:
+            batch.closed = True
+            if self._open.get(key) is batch:
+                del self._open[key]
+
+    def _finish(
+        self,
+        batch: _Batch,
+        responses: t.Optional[t.List[t.Any]],
+        error: t.Optional[BaseException],
+    ) -> None:
+        with self._lock:
+            batch.responses, batch.error = responses, error
+            batch.done.set()
+            waiters, batch.async_waiters = batch.async_waiters, []
+        for loop, waiter in waiters:
+            _wake_waiter(loop, waiter)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} batches={self.batches} searches={self.searches}>"
+        )
+
+
+class _Batched:
+    def __init__(
+        self, batcher: SearchBatcher, key: t.Tuple[str, ...], body: t.Any
+    ) -> None:
+        self._batcher = batcher
+        self._key = key
+        self._body = body
+        self._batch: t.Optional[_Batch] = None
+        self._index = 0
+        self.leader = False
+        self.bodies: t.List[t.Any] = []
+        self.responses: t.Optional[t.List[t.Any]] = None
+        self.response: t.Any = None
+
+    def __enter__(self) -> "_Batched":
+        batch, self._index = self._batcher._join(self._key, self._body)
+        self._batch = batch
+        if self._index == 0:
+            try:
+                batch.full.wait(self._batcher.max_delay)
+            except BaseException:
+                self._abandon(batch)
+                raise
+            self._lead(batch)
+        else:
+            batch.done.wait()
+            self._follow(batch)
+        return self
+
+    async def __aenter__(self) -> "_Batched":
+        batch, self._index = self._batcher._join(self._key, self._body)
+        self._batch = batch
+        loop = asyncio.get_event_loop()
+        if self._index == 0:
+            try:
+                with self._batcher._lock:
+                    waiter = None
+                    if not batch.full.is_set():
+                        waiter = loop.create_future()
+                        batch.full_waiter = (loop, waiter)
+                if waiter is not None:
+                    await asyncio.wait([waiter], timeout=self._batcher.max_delay)
+            except BaseException:
+                self._abandon(batch)
+                raise
+            self._lead(batch)
+        else:
+            with self._batcher._lock:
+                waiter = None
+                if not batch.done.is_set():
+                    waiter = loop.create_future()
+                    batch.async_waiters.append((loop, waiter))
+            if waiter is not None:
+                await waiter
+            self._follow(batch)
+        return self
+
+    def _lead(self, batch: _Batch) -> None:
+        with self._batcher._lock:
+            self._batcher._close(self._key, batch)
+            self.bodies = list(batch.bodies)
+        if len(self.bodies) > 1:
+            self.leader = True
+        else:
+            # Nothing joined, the search is sent on its own.
+            self._batcher._finish(batch, None, None)
+
+    def _abandon(self, batch: _Batch) -> None:
+        """Leaves the searches of a leader interrupted while waiting
+        for others to join to be sent on their own.
+        """
+        with self._batcher._lock:
+            self._batcher._close(self._key, batch)
+        self._batcher._finish(batch, None, None)
+
+    def _follow(self, batch: _Batch) -> None:
+        if batch.error is not None:
+            raise batch.error
+        if batch.responses is not None:
+            self.response = batch.responses[self._index]
+
+    def __exit__(self, _: t.Any, error: t.Optional[BaseException], __: t.Any) -> bool:
+        if not self.leader:
+            return False
+        batcher = self._batcher
+        if error is None:
+            with batcher._lock:
+                batcher.batches += 1
+                batcher.searches += len(self.bodies)
+            self.response = self.responses[0]  # type: ignore[index]
+            batcher._finish(self._batch, self.responses, None)  # type: ignore[arg-type]
+            return False
+        if isinstance(error, BadRequestError):
+            # Every search is sent on its own so only invalid ones fail.
+            batcher._finish(self._batch, None, None)  # type: ignore[arg-type]
+            return True
+        if isinstance(error, asyncio.CancelledError) or not isinstance(
+            error, Exception
+        ):
+            batcher._finish(self._batch, None, None)  # type: ignore[arg-type]
+        else:
+            batcher._finish(self._batch, None, error)  # type: ignore[arg-type]
+        return False
+
+    async def __aexit__(
+        self, _: t.Any, error: t.Optional[BaseException], __: t.Any
+    ) -> bool:
+        return self.__exit__(None, error, None)
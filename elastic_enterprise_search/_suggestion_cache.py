@@ -0,0 +1,244 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Prefix trie cache of App Search query suggestions for type-ahead"""
+
+import json
+import re
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from elastic_transport import ObjectApiResponse
+
+# Path of App Search's query suggestion API.
+_SUGGESTION_PATH = re.compile(r"^/api/as/v1/engines/[^/?]+/query_suggestion$")
+
+# Number of suggestions App Search returns per type when 'size' isn't given.
+_DEFAULT_SIZE = 5
+
+
+class _SuggestionKey(t.NamedTuple):
+    #: Target, authorization header and types of the request
+    namespace: t.Tuple[str, str, str]
+    #: Lowercased query of the request
+    query: str
+    size: int
+
+
+class _Entry(t.NamedTuple):
+    response: t.Any
+    size: int
+    #: Whether the response holds every suggestion for the query
+    complete: bool
+    expires: float
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self) -> None:
+        self.children: t.Dict[str, "_Node"] = {}
+        self.entry: t.Optional[_Entry] = None
+
+
+class SuggestionCache:
+    """Cache of the App Search ``query_suggestion()`` responses of the
+    clients it's passed to with ``suggestion_cache``, organized as a prefix
+    trie of the queries to answer type-ahead requests without sending them.
+
+    A response is kept under its query for ``ttl`` seconds. A request for
+    the same query and at most the same ``size`` is answered from the cache.
+    When Enterprise Search returned fewer suggestions than requested, the
+    response holds every suggestion for its query and requests for longer
+    queries are answered by filtering it locally, keeping the suggestions
+    starting with the longer query or having a word starting with it.
+    Queries are compared ignoring case, requests are only answered from
+    responses to the same engine, ``types`` and ``authorization`` header.
+    Only successful responses are cached and requests sent with
+    ``ignore_status`` bypass the cache.
+
+    Cached responses are shared between callers and must not be modified.
+
+    :param max_entries: Maximum number of responses kept in the cache,
+        the least recently used ones are evicted first
+    :param ttl: Number of seconds a response is used to answer requests
+    """
+
+    def __init__(self, *, max_entries: int = 10_000, ttl: float = 60.0) -> None:
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("'max_entries' must be a positive integer")
+        if ttl <= 0:
+            raise ValueError("'ttl' must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        #: Number of requests answered from the cache
+        self.hits = 0
+        #: Number of hits answered by filtering the response of a shorter query
+        self.prefix_hits = 0
+        #: Number of cacheable requests sent to Enterprise Search
+        self.misses = 0
+
+        self._tries: t.Dict[t.Tuple[str, str, str], _Node] = {}
+        self._recency: "OrderedDict[t.Tuple[t.Tuple[str, str, str], str], None]"
+        self._recency = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._recency)
+
+    def key(
+        self,
+        method: str,
+        target: str,
+        headers: t.Mapping[str, str],
+        body: t.Any,
+    ) -> t.Optional[_SuggestionKey]:
+        """Returns the cache key of a request or ``None`` if it isn't
+        a query suggestion request answered by the cache
+        """
+        if method != "POST" or not _SUGGESTION_PATH.match(target):
+            return None
+        if not isinstance(body, t.Mapping) or not set(body) <= {
+            "query",
+            "size",
+            "types",
+        }:
+            return None
+        query = body.get("query")
+        if not isinstance(query, str) or not query:
+            return None
+        namespace = (
+            target,
+            headers.get("authorization", ""),
+            json.dumps(body.get("types"), sort_keys=True),
+        )
+        return _SuggestionKey(
+            namespace, query.lower(), body.get("size") or _DEFAULT_SIZE
+        )
+
+    def get(self, key: _SuggestionKey) -> t.Optional[t.Any]:
+        """Returns the response to a request answered from the cache,
+        counting a hit or a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            node = self._tries.get(key.namespace)
+            prefix: t.Optional[t.Tuple[str, _Entry]] = None
+            depth = 0
+            while node is not None:
+                entry = node.entry
+                if entry is not None and entry.expires > now:
+                    if depth == len(key.query):
+                        if entry.complete or key.size <= entry.size:
+                            self._hit(key.namespace, key.query)
+                            return _truncate(entry, key.size)
+                    elif entry.complete:
+                        # The deepest complete prefix has the fewest suggestions to filter.
+                        prefix = (key.query[:depth], entry)
+                if depth == len(key.query):
+                    break
+                node = node.children.get(key.query[depth])
+                depth += 1
+            if prefix is None:
+                self.misses += 1
+                return None
+            self._hit(key.namespace, prefix[0])
+            self.prefix_hits += 1
+            return _filter(prefix[1], key.query, key.size)
+
+    def put(self, key: _SuggestionKey, response: t.Any) -> None:
+        """Caches the response to a request under its query"""
+        results = response.body.get("results")
+        if not isinstance(results, t.Mapping):
+            return
+        entry = _Entry(
+            response=response,
+            size=key.size,
+            complete=all(
+                len(suggestions) < key.size for suggestions in results.values()
+            ),
+            expires=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            node = self._tries.setdefault(key.namespace, _Node())
+            for char in key.query:
+                node = node.children.setdefault(char, _Node())
+            node.entry = entry
+            self._recency[(key.namespace, key.query)] = None
+            self._recency.move_to_end((key.namespace, key.query))
+            while len(self._recency) > self.max_entries:
+                namespace, query = self._recency.popitem(last=False)[0]
+                self._remove(namespace, query)
+
+    def clear(self) -> None:
+        """Removes every response from the cache"""
+        with self._lock:
+            self._tries.clear()
+            self._recency.clear()
+
+    def _hit(self, namespace: t.Tuple[str, str, str], query: str) -> None:
+        self.hits += 1
+        self._recency.move_to_end((namespace, query))
+
+    def _remove(self, namespace: t.Tuple[str, str, str], query: str) -> None:
+        """Removes the response of a query and the nodes left without
+        a response or children.
+        """
+        path = [self._tries[namespace]]
+        for char in query:
+            path.append(path[-1].children[char])
+        path[-1].entry = None
+        for depth in range(len(query), 0, -1):
+            node = path[depth]
+            if node.entry is not None or node.children:
+                break
+            del path[depth - 1].children[query[depth - 1]]
+        if path[0].entry is None and not path[0].children:
+            del self._tries[namespace]
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} entries={len(self)} "
+            f"hits={self.hits} misses={self.misses}>"
+        )
+
+
+def _truncate(entry: _Entry, size: int) -> t.Any:
+    if size >= entry.size:
+        return entry.response
+    body = dict(entry.response.body)
+    body["results"] = {
+        type_: suggestions[:size] for type_, suggestions in body["results"].items()
+    }
+    return ObjectApiResponse(body=body, meta=entry.response.meta)
+
+
+def _matches(suggestion: t.Any, query: str) -> bool:
+    text = str(suggestion.get("suggestion", "")).lower()
+    return text.startswith(query) or f" {query}" in text
+
+
+def _filter(entry: _Entry, query: str, size: int) -> t.Any:
+    body = dict(entry.response.body)
+    body["results"] = {
+        type_: [s for s in suggestions if _matches(s, query)][:size]
+        for type_, suggestions in body["results"].items()
+    }
+    return ObjectApiResponse(body=body, meta=entry.response.meta)
@@ -0,0 +1,1063 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import os
+import queue
+import threading
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from itertools import islice
+
+from elastic_transport import TransportError
+
+from .._checkpoint import CheckpointStore, _Checkpointer
+from .._content_hash import ContentHashStore
+from .._helpers import (
+    _BULK_HEADERS,
+    _EXPORT_SORT,
+    _MAX_REFRESH_WAITS,
+    _MAX_SEARCH_PAGE_SIZE,
+    _MAX_SEARCH_RESULTS,
+    _NOT_FOUND_ERROR,
+    _REFRESH_INTERVAL,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EXPORT_PAGE_SIZE,
+    DEFAULT_INITIAL_BACKOFF,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_SCAN_PAGE_SIZE,
+    BulkChunkResult,
+    BulkItemError,
+    DeleteByFilterResult,
+    ReindexResult,
+    SearchManyResult,
+    UpdateByFilterResult,
+    _bulk_items,
+    _bulk_request,
+    _BulkRequest,
+    _Chunk,
+    _chunk_result,
+    _content_key,
+    _document_encoder,
+    _encode_batch,
+    _encode_body,
+    _exclude_patched,
+    _export_body,
+    _export_hits,
+    _is_unchanged,
+    _json_dumps,
+    _limit_chunk_bytes,
+    _merge_items,
+    _merge_search_results,
+    _next_cursor,
+    _open_sink,
+    _page_results,
+    _payload_too_large_item,
+    _record_hashes,
+    _retry_backoff,
+    _search_ids,
+    _search_many_params,
+)
+from ..exceptions import ApiError, PayloadTooLargeError
+
+if t.TYPE_CHECKING:
+    from .client import AppSearch, WorkplaceSearch
+    from .client._base import BaseClient
+
+_TYPE_DOCUMENTS = t.Iterable[t.Any]
+
+
+def _chunk_documents(
+    documents: _TYPE_DOCUMENTS,
+    encode: t.Callable[[t.Any], bytes],
+    request: _BulkRequest,
+    serializer_processes: int = 0,
+) -> t.Iterator[_Chunk]:
+    if not isinstance(serializer_processes, int) or serializer_processes < 0:
+        raise ValueError("'serializer_processes' must be a non-negative integer")
+    buffer = request.buffer
+    if serializer_processes:
+        encoded = _encode_in_processes(
+            documents, encode, buffer.chunk_size, serializer_processes
+        )
+    else:
+        encoded = ((document, encode(document)) for document in documents)
+    for document, part in encoded:
+        key = _content_key(request, document, part)
+        if _is_unchanged(request, key):
+            chunk = buffer.skip()
+        else:
+            chunk = buffer.add(part, key)
+        if chunk is not None:
+            yield chunk
+    chunk = buffer.flush()
+    if chunk is not None:
+        yield chunk
+
+
+def _encode_in_processes(
+    documents: _TYPE_DOCUMENTS,
+    encode: t.Callable[[t.Any], bytes],
+    batch_size: int,
+    processes: int,
+) -> t.Iterator[t.Tuple[t.Any, bytes]]:
+    """Serializes batches of documents in a pool of processes, keeping two
+    batches per process in flight and yielding documents with their
+    serialized form in order.
+    """
+    pending: t.Deque[t.Tuple[t.List[t.Any], "Future[t.List[bytes]]"]] = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        try:
+            documents = iter(documents)
+            while True:
+                batch = list(islice(documents, batch_size))
+                if not batch:
+                    break
+                pending.append((batch, executor.submit(_encode_batch, encode, batch)))
+                if len(pending) >= processes * 2:
+                    batch, future = pending.popleft()
+                    yield from zip(batch, future.result())
+            while pending:
+                batch, future = pending.popleft()
+                yield from zip(batch, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _send_parts(
+    client: "BaseClient", request: _BulkRequest, parts: t.List[bytes]
+) -> t.List[t.Any]:
+    """Sends serialized documents in a single request. If the request body is
+    rejected as too large it's split in half and each half is sent on its own.
+    """
+    body = _encode_body(parts)
+    try:
+        resp = client.perform_request(
+            request.method, request.path, body=body, headers=_BULK_HEADERS
+        )
+    except PayloadTooLargeError:
+        if len(parts) == 1:
+            return [_payload_too_large_item(parts[0])]
+        # Size the following chunks so they won't be rejected as well.
+        _limit_chunk_bytes(request, len(body) // 2)
+        half = len(parts) // 2
+        return _send_parts(client, request, parts[:half]) + _send_parts(
+            client, request, parts[half:]
+        )
+    return _bulk_items(resp.body)
+
+
+def _send_chunk(
+    client: "BaseClient", request: _BulkRequest, chunk: _Chunk
+) -> BulkChunkResult:
+    """Sends a chunk and re-sends only the documents which failed
+    with a transient error until they succeed or run out of retries.
+    Request-level errors are retried by the transport itself.
+    """
+    items: t.List[t.Any] = [None] * len(chunk.parts)
+    positions: t.Sequence[int] = range(len(chunk.parts))
+    for attempt in range(request.max_retries + 1):
+        if not positions:
+            break
+        if attempt:
+            time.sleep(
+                _retry_backoff(attempt, request.initial_backoff, request.max_backoff)
+            )
+        results = _send_parts(client, request, [chunk.parts[i] for i in positions])
+        positions = _merge_items(items, positions, results)
+    _record_hashes(request, chunk, items)
+    return _chunk_result(chunk, items)
+
+
+def streaming_bulk(
+    client: "BaseClient",
+    documents: _TYPE_DOCUMENTS,
+    *,
+    engine_name: t.Optional[str] = None,
+    content_source_id: t.Optional[str] = None,
+    op_type: str = "index",
+    max_concurrency: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+    max_backoff: float = DEFAULT_MAX_BACKOFF,
+    serializer_processes: int = 0,
+    checkpoint: t.Optional[CheckpointStore] = None,
+    hash_store: t.Optional[ContentHashStore] = None,
+) -> t.Iterator[BulkChunkResult]:
+    """Indexes documents from any iterable into an App Search engine or a
+    Workplace Search custom content source in chunks, yielding the result of
+    each chunk as it completes.
+    Documents are consumed lazily so only the chunks being sent are held in memory.
+
+    Documents which fail with a transient error are re-sent on their own
+    with exponential backoff, documents which still fail are reported in
+    the ``errors`` of the chunk's result.
+
+    :param client: App Search or Workplace Search client to use
+    :param documents: Iterable or generator of documents or document IDs
+    :param engine_name: Name of the App Search engine
+    :param content_source_id: ID of the Workplace Search custom content source,
+        mutually exclusive with ``engine_name``
+    :param op_type: Either ``index`` to index documents or ``delete`` to delete
+        documents by ID
+    :param max_concurrency: Maximum number of chunk requests in flight at once.
+        Values above one send chunks from a pool of threads, see :func:`parallel_bulk`.
+    :param chunk_size: Maximum number of documents to send per request
+    :param max_chunk_bytes: Maximum size in bytes of a request body
+    :param max_retries: Maximum number of times a document failing
+        with a transient error is re-sent
+    :param initial_backoff: Number of seconds to wait before the first retry,
+        each following retry waits twice as long
+    :param max_backoff: Maximum number of seconds to wait between retries
+    :param serializer_processes: Number of processes serializing documents
+        to JSON. By default documents are serialized in the calling thread,
+        use a process pool when serialization rather than the network is the
+        bottleneck. The documents and the client's serializer must be picklable.
+    :param checkpoint: Store recording how many documents of ``documents`` were
+        acknowledged. An interrupted operation on the same target resumes after
+        the acknowledged documents instead of re-sending them. The checkpoint is
+        cleared once all documents were acknowledged.
+    :param hash_store: Store of the content hashes of indexed documents.
+        Documents with an ``id`` whose serialized content didn't change since
+        they were last indexed into the same engine or content source aren't
+        sent again and are counted in the ``skipped`` of the chunk's result.
+        Deleting or updating documents removes their hashes.
+    """
+    if not isinstance(max_concurrency, int) or max_concurrency < 1:
+        raise ValueError("'max_concurrency' must be a positive integer")
+    if max_concurrency > 1:
+        yield from parallel_bulk(
+            client,
+            documents,
+            engine_name=engine_name,
+            content_source_id=content_source_id,
+            op_type=op_type,
+            thread_count=max_concurrency,
+            queue_size=0,
+            ordered=False,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            max_retries=max_retries,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+            serializer_processes=serializer_processes,
+            checkpoint=checkpoint,
+            hash_store=hash_store,
+        )
+        return
+
+    request, checkpointer = _bulk_request(
+        op_type=op_type,
+        engine_name=engine_name,
+        content_source_id=content_source_id,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+        max_backoff=max_backoff,
+        checkpoint=checkpoint,
+        hash_store=hash_store,
+        chunk_byte_limits=client._chunk_byte_limits,
+    )
+    encode = _document_encoder(
+        client.transport.serializers.get_serializer("application/json"), op_type
+    )
+
+    documents = islice(documents, checkpointer.offset, None)
+    for chunk in _chunk_documents(documents, encode, request, serializer_processes):
+        result = _send_chunk(client, request, chunk)
+        checkpointer.acknowledge(result.offset, len(result.items) + result.skipped)
+        yield result
+    checkpointer.finish()
+
+
+def bulk(
+    client: "BaseClient",
+    documents: _TYPE_DOCUMENTS,
+    *,
+    return_skipped: bool = False,
+    **kwargs: t.Any,
+) -> t.Union[
+    t.Tuple[int, t.List[BulkItemError]], t.Tuple[int, t.List[BulkItemError], int]
+]:
+    """Helper for the :func:`streaming_bulk` helper which collects the
+    results instead of yielding them. Returns a tuple of the number of
+    documents indexed successfully and the list of documents which failed.
+
+    Accepts the same parameters as :func:`streaming_bulk`.
+
+    :param return_skipped: If ``True`` the number of unchanged documents
+        which weren't sent because of the ``hash_store`` is returned as
+        a third element of the tuple
+    """
+    success, errors, skipped = 0, [], 0
+    for result in streaming_bulk(client, documents, **kwargs):
+        success += len(result.items) - len(result.errors)
+        errors.extend(result.errors)
+        skipped += result.skipped
+    if return_skipped:
+        return success, errors, skipped
+    return success, errors
+
+
+def parallel_bulk(
+    client: "BaseClient",
+    documents: _TYPE_DOCUMENTS,
+    *,
+    engine_name: t.Optional[str] = None,
+    content_source_id: t.Optional[str] = None,
+    op_type: str = "index",
+    thread_count: int = 4,
+    queue_size: int = 4,
+    ordered: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+    max_backoff: float = DEFAULT_MAX_BACKOFF,
+    serializer_processes: int = 0,
+    checkpoint: t.Optional[CheckpointStore] = None,
+    hash_store: t.Optional[ContentHashStore] = None,
+) -> t.Iterator[BulkChunkResult]:
+    """Same as :func:`streaming_bulk` except chunks are sent concurrently
+    from a pool of threads. The threads share the client's connection pool
+    so ``connections_per_node`` should be at least ``thread_count``.
+
+    :param client: App Search or Workplace Search client to use
+    :param documents: Iterable or generator of documents or document IDs
+    :param engine_name: Name of the App Search engine
+    :param content_source_id: ID of the Workplace Search custom content source,
+        mutually exclusive with ``engine_name``
+    :param op_type: Either ``index`` to index documents or ``delete`` to delete
+        documents by ID
+    :param thread_count: Number of threads sending chunks
+    :param queue_size: Number of chunks to prepare ahead of the threads. At most
+        ``thread_count + queue_size`` chunks are held in memory at once.
+    :param ordered: If ``True`` results are yielded in the order of the input,
+        otherwise results are yielded as soon as each chunk completes.
+    :param chunk_size: Maximum number of documents to send per request
+    :param max_chunk_bytes: Maximum size in bytes of a request body
+    :param max_retries: Maximum number of times a document failing
+        with a transient error is re-sent
+    :param initial_backoff: Number of seconds to wait before the first retry,
+        each following retry waits twice as long
+    :param max_backoff: Maximum number of seconds to wait between retries
+    :param serializer_processes: Number of processes serializing documents
+        to JSON. By default documents are serialized in the calling thread,
+        use a process pool when serialization rather than the network is the
+        bottleneck. The documents and the client's serializer must be picklable.
+    :param checkpoint: Store recording how many documents of ``documents`` were
+        acknowledged. An interrupted operation on the same target resumes after
+        the acknowledged documents instead of re-sending them. The checkpoint is
+        cleared once all documents were acknowledged.
+    :param hash_store: Store of the content hashes of indexed documents.
+        Documents with an ``id`` whose serialized content didn't change since
+        they were last indexed into the same engine or content source aren't
+        sent again and are counted in the ``skipped`` of the chunk's result.
+        Deleting or updating documents removes their hashes.
+    """
+    if not isinstance(thread_count, int) or thread_count < 1:
+        raise ValueError("'thread_count' must be a positive integer")
+    if not isinstance(queue_size, int) or queue_size < 0:
+        raise ValueError("'queue_size' must be a non-negative integer")
+    request, checkpointer = _bulk_request(
+        op_type=op_type,
+        engine_name=engine_name,
+        content_source_id=content_source_id,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+        max_backoff=max_backoff,
+        checkpoint=checkpoint,
+        hash_store=hash_store,
+        chunk_byte_limits=client._chunk_byte_limits,
+    )
+    encode = _document_encoder(
+        client.transport.serializers.get_serializer("application/json"), op_type
+    )
+
+    documents = islice(documents, checkpointer.offset, None)
+    pending: t.Deque["Future[BulkChunkResult]"] = deque()
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        try:
+            for chunk in _chunk_documents(
+                documents, encode, request, serializer_processes
+            ):
+                pending.append(executor.submit(_send_chunk, client, request, chunk))
+                if len(pending) >= thread_count + queue_size:
+                    yield from _pop_completed(pending, ordered, checkpointer)
+            while pending:
+                yield from _pop_completed(pending, ordered, checkpointer)
+            checkpointer.finish()
+        finally:
+            # Don't start any more requests if the caller stopped
+            # iterating or a chunk failed with an error.
+            for future in pending:
+                future.cancel()
+
+
+def _pop_completed(
+    pending: t.Deque["Future[BulkChunkResult]"],
+    ordered: bool,
+    checkpointer: _Checkpointer,
+) -> t.Iterator[BulkChunkResult]:
+    """Waits for the oldest pending chunk if ordered,
+    otherwise for whichever pending chunks complete first.
+    """
+    if ordered:
+        # Errors are raised while the chunk is still pending to be cancelled.
+        pending[0].result()
+        done = [pending.popleft()]
+    else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+    for future in done:
+        result = future.result()
+        checkpointer.acknowledge(result.offset, len(result.items) + result.skipped)
+        yield result
+
+
+def delete_by_filter(
+    client: "AppSearch",
+    engine_name: str,
+    filters: t.Mapping[str, t.Any],
+    *,
+    max_concurrency: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> DeleteByFilterResult:
+    """Deletes every document of an App Search engine matching ``filters``.
+
+    App Search has no delete-by-query API so matching document IDs are read
+    with ``search()`` in rounds of up to 1,000 and each round is deleted with
+    concurrent ``delete_documents()`` requests before searching again. Each
+    search starts over from the first page as deleting documents shifts the
+    following pages of results.
+
+    :param client: App Search client to use
+    :param engine_name: Name of the engine
+    :param filters: Search filters selecting the documents to delete
+    :param max_concurrency: Maximum number of delete requests in flight at once
+    :param chunk_size: Maximum number of document IDs per delete request
+    :param max_retries: Maximum number of times a document failing
+        with a transient error is re-sent
+    :returns: The number of documents deleted, the documents which couldn't
+        be deleted, the time taken to delete them and whether matching documents
+        remain out of reach of the search
+    """
+    start = time.monotonic()
+    deleted, errors, remaining = _by_filter(
+        client,
+        engine_name,
+        filters,
+        op_type="delete",
+        to_document=lambda id_: id_,
+        refreshes=True,
+        max_concurrency=max_concurrency,
+        chunk_size=chunk_size,
+        max_retries=max_retries,
+    )
+    return DeleteByFilterResult(
+        deleted=deleted,
+        errors=errors,
+        duration=time.monotonic() - start,
+        remaining=remaining,
+    )
+
+
+def update_by_filter(
+    client: "AppSearch",
+    engine_name: str,
+    filters: t.Mapping[str, t.Any],
+    patch: t.Mapping[str, t.Any],
+    *,
+    max_concurrency: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> UpdateByFilterResult:
+    """Applies a partial update to every document of an App Search engine
+    matching ``filters``.
+
+    Matching document IDs are read with ``search()`` in rounds of up to 1,000
+    and each round is updated with concurrent ``put_documents()`` requests.
+    When every value of ``patch`` is a string or a number, documents which
+    already hold them are excluded from the searches so each round finds the
+    documents which still need updating, this also lets updates go beyond the
+    first 10,000 results of a search. Documents can't be excluded by list
+    values, updates setting lists only reach the first 10,000 results.
+
+    :param client: App Search client to use
+    :param engine_name: Name of the engine
+    :param filters: Search filters selecting the documents to update
+    :param patch: Fields to set on each document. Values must be strings,
+        numbers or lists of strings or numbers.
+    :param max_concurrency: Maximum number of update requests in flight at once
+    :param chunk_size: Maximum number of documents per update request
+    :param max_retries: Maximum number of times a document failing
+        with a transient error is re-sent
+    :returns: The number of documents updated, the documents which couldn't
+        be updated, the time taken to update them and whether matching documents
+        remain out of reach of the search
+    """
+    start = time.monotonic()
+    excluded = _exclude_patched(filters, patch)
+    updated, errors, remaining = _by_filter(
+        client,
+        engine_name,
+        filters if excluded is None else excluded,
+        op_type="update",
+        to_document=lambda id_: dict(patch, id=id_),
+        refreshes=excluded is not None,
+        max_concurrency=max_concurrency,
+        chunk_size=chunk_size,
+        max_retries=max_retries,
+    )
+    return UpdateByFilterResult(
+        updated=updated,
+        errors=errors,
+        duration=time.monotonic() - start,
+        remaining=remaining,
+    )
+
+
+def _by_filter(
+    client: "AppSearch",
+    engine_name: str,
+    filters: t.Mapping[str, t.Any],
+    *,
+    op_type: str,
+    to_document: t.Callable[[str], t.Any],
+    refreshes: bool,
+    max_concurrency: int,
+    chunk_size: int,
+    max_retries: int,
+) -> t.Tuple[int, t.List[BulkItemError], bool]:
+    """Sends a bulk operation for the documents matching ``filters`` round
+    after round until the search returns no more documents to send. Each
+    search starts over from the first page as the operation removes the
+    documents of the previous rounds from the results. Unless ``refreshes``
+    is set the documents sent stay in the results and the rounds stop
+    once the search only returns those. Returns the number of documents
+    sent successfully, the documents which failed and whether matching
+    documents remain out of reach of the search.
+    """
+    success, errors, processed = 0, [], 0
+    failed: t.Set[str] = set()
+    # Documents sent and still returned by the search as the engine
+    # may take several rounds to refresh.
+    sent: t.Set[str] = set()
+    while True:
+        ids, remaining = _next_search_ids(
+            client, engine_name, filters, failed, sent, refreshes
+        )
+        if not ids:
+            break
+        for result in streaming_bulk(
+            client,
+            (to_document(id_) for id_ in ids),
+            engine_name=engine_name,
+            op_type=op_type,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+        ):
+            success += len(result.items) - len(result.errors)
+            for error in result.errors:
+                if op_type == "delete" and error.errors == [_NOT_FOUND_ERROR]:
+                    # The document is already gone, it was deleted concurrently
+                    # or by an earlier round which the search didn't reflect yet.
+                    continue
+                errors.append(error._replace(position=processed + error.position))
+                failed.add(error.id)
+        processed += len(ids)
+        sent.update(id_ for id_ in ids if id_ not in failed)
+    return success, errors, remaining
+
+
+def _next_search_ids(
+    client: "AppSearch",
+    engine_name: str,
+    filters: t.Mapping[str, t.Any],
+    failed: t.Set[str],
+    sent: t.Set[str],
+    refreshes: bool,
+) -> t.Tuple[t.List[str], bool]:
+    """Returns the IDs of matching documents which haven't been sent yet and
+    whether the search stopped at the last result it can reach while more
+    documents match. Documents which failed stay in the results so pages
+    with only those are skipped over. With ``refreshes`` documents already
+    sent are still returned until the engine refreshes, if the results only
+    contain those the search is started over once the engine had time to
+    refresh and the sent documents it didn't return are forgotten.
+    """
+    truncated = False
+    for _ in range(_MAX_REFRESH_WAITS + 1):
+        page, stale, truncated = 1, False, False
+        seen: t.Set[str] = set()
+        while True:
+            if page * _MAX_SEARCH_PAGE_SIZE > _MAX_SEARCH_RESULTS:
+                truncated = True
+                break
+            resp = client.search(
+                engine_name=engine_name,
+                query="",
+                filters=filters,
+                current_page=page,
+                page_size=_MAX_SEARCH_PAGE_SIZE,
+                result_fields={"id": {"raw": {}}},
+            )
+            ids, total_pages = _search_ids(resp.body)
+            new_ids = [id_ for id_ in ids if id_ not in failed and id_ not in sent]
+            if new_ids:
+                return new_ids, False
+            stale = stale or any(id_ in sent for id_ in ids)
+            seen.update(ids)
+            if page >= total_pages:
+                break
+            page += 1
+        if not stale or not refreshes:
+            break
+        sent.intersection_update(seen)
+        time.sleep(_REFRESH_INTERVAL)
+    return [], truncated
+
+
+def paginate(
+    list_page: t.Callable[..., t.Any],
+    *,
+    page_size: t.Optional[int] = None,
+    prefetch: int = 0,
+    **params: t.Any,
+) -> t.Iterator[t.Any]:
+    """Yields the results of a paged list API one at a time. By default the
+    next page is fetched only once the results of the previous one were
+    consumed so only one page is held in memory.
+
+    .. code-block:: python
+
+        for engine in paginate(client.list_engines, page_size=100):
+            print(engine["name"])
+
+    :param list_page: Client method of a paged list API, like
+        ``client.list_documents``, called with ``current_page``
+    :param page_size: Number of results per page, the API's default if not set
+    :param prefetch: Number of upcoming pages fetched concurrently in threads
+        once the first page tells the total number of pages. Results are
+        still yielded in order and up to ``prefetch + 1`` pages are held
+        in memory
+    :param params: Other parameters of the list API, like ``engine_name``
+    """
+    if not isinstance(prefetch, int) or prefetch < 0:
+        raise ValueError("'prefetch' must be a non-negative integer")
+
+    def fetch(page: int) -> t.Tuple[t.List[t.Any], int]:
+        return _page_results(
+            list_page(current_page=page, page_size=page_size, **params).body
+        )
+
+    results, total_pages = fetch(1)
+    if prefetch and total_pages > 1:
+        pending: t.Deque["Future[t.Tuple[t.List[t.Any], int]]"] = deque()
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            try:
+                while True:
+                    while len(pending) < prefetch and next_page <= total_pages:
+                        pending.append(executor.submit(fetch, next_page))
+                        next_page += 1
+                    yield from results
+                    if not pending:
+                        break
+                    del results
+                    results, _ = pending.popleft().result()
+                    # Pages run out early when documents were removed meanwhile.
+                    if not results:
+                        break
+            finally:
+                for future in pending:
+                    future.cancel()
+        return
+
+    current_page = 1
+    while True:
+        yield from results
+        if not results or current_page >= total_pages:
+            break
+        del results
+        current_page += 1
+        results, total_pages = fetch(current_page)
+
+
+def scan_documents(
+    client: "WorkplaceSearch",
+    content_source_id: str,
+    *,
+    filters: t.Optional[t.Mapping[str, t.Any]] = None,
+    sort: t.Optional[t.Any] = None,
+    page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+    sink: t.Union[None, str, "os.PathLike[str]", t.BinaryIO] = None,
+) -> t.Iterator[t.Any]:
+    """Yields every document of a Workplace Search custom content source
+    by following the cursor of 'list_documents', which unlike page numbers
+    isn't limited to the first 10,000 documents. Only one page of documents
+    is held in memory at a time.
+
+    .. code-block:: python
+
+        for document in scan_documents(client, "<CONTENT_SOURCE_ID>"):
+            print(document["id"])
+
+    :param client: Workplace Search client
+    :param content_source_id: ID of the custom content source
+    :param filters: Filters selecting the documents to yield
+    :param sort: Sort order of the documents
+    :param page_size: Number of documents fetched per request
+    :param sink: Path or binary file the documents are also written to
+        as JSON lines while they're yielded. A path is overwritten
+    """
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError("'page_size' must be a positive integer")
+    file, close = _open_sink(sink)
+    try:
+        cursor = None
+        while True:
+            body = client.list_documents(
+                content_source_id=content_source_id,
+                filters=filters,
+                sort=sort,
+                page_size=page_size,
+                cursor=cursor,
+            ).body
+            results, next_cursor = body["results"], _next_cursor(body)
+            del body
+            for document in results:
+                if file is not None:
+                    file.write(_json_dumps(document) + b"\n")
+                yield document
+            if not results or not next_cursor or next_cursor == cursor:
+                break
+            cursor = next_cursor
+    finally:
+        if close:
+            file.close()  # type: ignore[union-attr]
+
+
+def export_engine(
+    client: "AppSearch",
+    engine_name: str,
+    *,
+    query: t.Optional[t.Mapping[str, t.Any]] = None,
+    sort: t.Sequence[t.Any] = _EXPORT_SORT,
+    page_size: int = DEFAULT_EXPORT_PAGE_SIZE,
+    slices: int = 1,
+    sink: t.Union[None, str, "os.PathLike[str]", t.BinaryIO] = None,
+) -> t.Iterator[t.Any]:
+    """Yields the source of every document of an App Search engine with
+    'search_es_search' requests paginated with ``search_after``, which unlike
+    'list_documents' isn't limited to the first 10,000 documents. At most
+    ``slices * 2`` pages are held in memory at a time.
+
+    .. code-block:: python
+
+        for document in export_engine(client, "national-parks", slices=4):
+            print(document["id"])
+
+    :param client: App Search client
+    :param engine_name: Name of the engine
+    :param query: Elasticsearch query selecting the documents to export
+    :param sort: Elasticsearch sort giving every document a unique position,
+        by default the documents' ``id``
+    :param page_size: Number of documents fetched per request
+    :param slices: Number of slices of the documents exported concurrently
+        in threads, split by the hash of the first sort field. The documents
+        of different slices are yielded interleaved
+    :param sink: Path or binary file the documents are also written to
+        as JSON lines while they're yielded. A path is overwritten
+    """
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError("'page_size' must be a positive integer")
+    if not isinstance(slices, int) or slices < 1:
+        raise ValueError("'slices' must be a positive integer")
+    if not sort:
+        raise ValueError("'sort' must contain at least one field")
+    if slices == 1:
+        pages = _export_slice(client, engine_name, query, sort, page_size)
+    else:
+        pages = _export_slices(client, engine_name, query, sort, page_size, slices)
+    file, close = _open_sink(sink)
+    try:
+        for hits in pages:
+            for hit in hits:
+                document = hit["_source"]
+                if file is not None:
+                    file.write(_json_dumps(document) + b"\n")
+                yield document
+    finally:
+        # Stops the requests of the slices when exiting early.
+        pages.close()
+        if close:
+            file.close()  # type: ignore[union-attr]
+
+
+def _export_slice(
+    client: "AppSearch",
+    engine_name: str,
+    query: t.Optional[t.Mapping[str, t.Any]],
+    sort: t.Sequence[t.Any],
+    page_size: int,
+    slice_id: int = 0,
+    slices: int = 1,
+) -> t.Iterator[t.List[t.Any]]:
+    search_after = None
+    while True:
+        resp = client.search_es_search(
+            engine_name=engine_name,
+            body=_export_body(query, sort, page_size, search_after, slice_id, slices),
+        )
+        hits, search_after = _export_hits(resp.body)
+        del resp
+        if hits:
+            yield hits
+        if len(hits) < page_size:
+            break
+
+
+def _export_slices(
+    client: "AppSearch",
+    engine_name: str,
+    query: t.Optional[t.Mapping[str, t.Any]],
+    sort: t.Sequence[t.Any],
+    page_size: int,
+    slices: int,
+) -> t.Iterator[t.List[t.Any]]:
+    """Exports each slice in its own thread, handing the pages over through
+    a bounded queue. A page of ``None`` tells a slice is done.
+    """
+    pages: "queue.Queue[t.Tuple[t.Optional[t.List[t.Any]], t.Optional[BaseException]]]"
+    pages = queue.Queue(maxsize=slices)
+    stop = threading.Event()
+
+    def put(
+        item: t.Tuple[t.Optional[t.List[t.Any]], t.Optional[BaseException]]
+    ) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def export(slice_id: int) -> None:
+        try:
+            for hits in _export_slice(
+                client, engine_name, query, sort, page_size, slice_id, slices
+            ):
+                put((hits, None))
+                if stop.is_set():
+                    return
+        except BaseException as e:
+            put((None, e))
+        else:
+            put((None, None))
+
+    with ThreadPoolExecutor(max_workers=slices) as executor:
+        try:
+            for slice_id in range(slices):
+                executor.submit(export, slice_id)
+            remaining = slices
+            while remaining:
+                hits, error = pages.get()
+                if error is not None:
+                    raise error
+                if hits is None:
+                    remaining -= 1
+                else:
+                    yield hits
+        finally:
+            stop.set()
+
+
+def reindex(
+    client: "AppSearch",
+    source_engine: str,
+    dest_engine: str,
+    *,
+    dest_client: t.Optional["AppSearch"] = None,
+    query: t.Optional[t.Mapping[str, t.Any]] = None,
+    transform: t.Optional[t.Callable[[t.Any], t.Any]] = None,
+    page_size: int = DEFAULT_EXPORT_PAGE_SIZE,
+    slices: int = 1,
+    max_concurrency: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> ReindexResult:
+    """Copies the documents of an App Search engine into another engine,
+    possibly of another deployment.
+
+    Documents are exported from the source engine like with
+    :func:`export_engine` in background threads while the previous pages are
+    indexed into the destination engine with concurrent chunked requests,
+    so reading and writing overlap. At most ``slices * 2`` pages and
+    ``max_concurrency`` chunks are held in memory at a time.
+
+    .. code-block:: python
+
+        result = reindex(source, "parks", "parks-v2", dest_client=dest)
+        print(f"{result.docs_per_second:,.0f} docs/s")
+
+    :param client: App Search client of the source engine
+    :param source_engine: Name of the engine to read documents from
+    :param dest_engine: Name of the engine to index documents into
+    :param dest_client: App Search client of the destination engine,
+        by default ``client``
+    :param query: Elasticsearch query selecting the documents to copy
+    :param transform: Function called with each document returning the
+        document to index, or ``None`` to leave the document out
+    :param page_size: Number of documents read per request
+    :param slices: Number of slices of the source engine read concurrently
+    :param max_concurrency: Maximum number of index requests in flight at once
+    :param chunk_size: Maximum number of documents per index request
+    :param max_retries: Maximum number of times a document failing
+        with a transient error is re-sent
+    :returns: The number of documents read and indexed, the documents which
+        couldn't be indexed and the time taken to copy them
+    """
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError("'page_size' must be a positive integer")
+    if not isinstance(slices, int) or slices < 1:
+        raise ValueError("'slices' must be a positive integer")
+    start = time.monotonic()
+    exported = indexed = 0
+    errors: t.List[BulkItemError] = []
+    # Even a single slice is read in the background so the next
+    # page is fetched while the documents of the previous one are sent.
+    pages = _export_slices(
+        client, source_engine, query, _EXPORT_SORT, page_size, slices
+    )
+
+    def documents() -> t.Iterator[t.Any]:
+        nonlocal exported
+        for hits in pages:
+            exported += len(hits)
+            for hit in hits:
+                document = hit["_source"]
+                if transform is not None:
+                    document = transform(document)
+                    if document is None:
+                        continue
+                yield document
+
+    try:
+        for result in streaming_bulk(
+            dest_client or client,
+            documents(),
+            engine_name=dest_engine,
+            max_concurrency=max_concurrency,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+        ):
+            indexed += len(result.items) - len(result.errors)
+            errors.extend(result.errors)
+    finally:
+        pages.close()
+    return ReindexResult(
+        exported=exported,
+        indexed=indexed,
+        errors=errors,
+        duration=time.monotonic() - start,
+    )
+
+
+def search_many(
+    client: "AppSearch",
+    engines: t.Sequence[str],
+    query: str,
+    *,
+    current_page: int = 1,
+    page_size: int = 10,
+    timeout: t.Optional[float] = None,
+    max_concurrency: t.Optional[int] = None,
+    **params: t.Any,
+) -> SearchManyResult:
+    """Searches several App Search engines concurrently and merges their
+    results by ``_meta.score``, like a meta engine would without having
+    to create one.
+
+    Each engine returns its results up to the end of the requested page
+    and the page is taken from a heap merge of the engines' results. Facets
+    are combined by summing the counts of the same values and ranges.
+    Engines which fail or don't respond within ``timeout`` are left out
+    and reported in the ``errors`` of the result, the search only fails if
+    every engine does.
+
+    .. code-block:: python
+
+        result = search_many(
+            client, ["parks-us", "parks-ca"], "lake", timeout=0.5
+        )
+        for document in result.results:
+            print(document["_meta"]["engine"], document["_meta"]["score"])
+
+    :param client: App Search client to use
+    :param engines: Names of the engines to search
+    :param query: Query of the search
+    :param current_page: Page of the merged results to return
+    :param page_size: Number of merged results per page, the engines return
+        up to ``current_page * page_size`` results each which must be
+        at most 1,000
+    :param timeout: Number of seconds each engine has to respond, with a
+        single attempt. By default the client's timeout and retries apply
+    :param max_concurrency: Maximum number of searches in flight at once
+        in threads, by default all engines are searched at once
+    :param params: Other parameters of ``search()`` like ``filters`` or
+        ``facets``. ``sort`` and ``group`` aren't supported
+    """
+    params = _search_many_params(engines, current_page, page_size, params)
+    searcher = client
+    if timeout is not None:
+        searcher = client.options(request_timeout=timeout, max_retries=0)
+
+    def search(engine_name: str) -> t.Any:
+        return searcher.search(engine_name=engine_name, query=query, **params).body
+
+    with ThreadPoolExecutor(max_workers=max_concurrency or len(engines)) as executor:
+        futures = [executor.submit(search, engine_name) for engine_name in engines]
+        bodies: t.List[t.Any] = []
+        errors: t.Dict[str, Exception] = {}
+        for engine_name, future in zip(engines, futures):
+            try:
+                bodies.append(future.result())
+            except (ApiError, TransportError) as e:
+                errors[engine_name] = e
+
+    if not bodies:
+        raise errors[engines[0]]
+    return _merge_search_results(bodies, current_page, page_size, errors)
@@ -15,8 +15,10 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import asyncio
 import base64
 import inspect
+import json
 import re
 import sys
 import typing as t
@@ -308,6 +310,34 @@ def _quote_query_form(key: str, value: t.Union[t.List[str], t.Tuple[str, ...]])
     return ",".join(map(str, value))
 
 
+def _request_key(
+    method: str, target: str, headers: t.Mapping[str, str], body: t.Any
+) -> t.Tuple[str, str, str, str]:
+    """Identifies a request by its method, target, credentials and body
+    serialized with sorted keys so equivalent bodies are the same request.
+    """
+    if body is None or isinstance(body, (bytes, str)):
+        canonical_body = _escape(body) if body is not None else ""
+    else:
+        canonical_body = json.dumps(
+            body, sort_keys=True, separators=(",", ":"), default=_escape
+        )
+    return (method, target, headers.get("authorization", ""), canonical_body)
+
+
+def _wake_waiter(loop: t.Any, waiter: "asyncio.Future[None]") -> None:
+    """Resolves a future waited on in ``loop`` from any thread"""
+    try:
+        loop.call_soon_threadsafe(_set_waiter, waiter)
+    except RuntimeError:  # The event loop is closed.
+        pass
+
+
+def _set_waiter(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
 def _merge_kwargs_no_duplicates(
     kwargs: t.Dict[str, t.Any], values: t.Dict[str, t.Any]
 ) -> None:
@@ -0,0 +1,89 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Helpers for streaming large numbers of documents to and from Enterprise Search"""
+
+from ._async.helpers import (
+    async_bulk,
+    async_delete_by_filter,
+    async_export_engine,
+    async_paginate,
+    async_reindex,
+    async_scan_documents,
+    async_search_many,
+    async_streaming_bulk,
+    async_update_by_filter,
+)
+from ._checkpoint import (
+    CheckpointStore,
+    FileCheckpointStore,
+    SQLiteCheckpointStore,
+)
+from ._content_hash import ContentHashStore, SQLiteContentHashStore
+from ._helpers import (
+    BulkChunkResult,
+    BulkItemError,
+    DeleteByFilterResult,
+    ReindexResult,
+    SearchManyResult,
+    UpdateByFilterResult,
+)
+from ._sync.helpers import (
+    bulk,
+    delete_by_filter,
+    export_engine,
+    paginate,
+    parallel_bulk,
+    reindex,
+    scan_documents,
+    search_many,
+    streaming_bulk,
+    update_by_filter,
+)
+
+__all__ = [
+    "BulkChunkResult",
+    "BulkItemError",
+    "CheckpointStore",
+    "ContentHashStore",
+    "DeleteByFilterResult",
+    "FileCheckpointStore",
+    "ReindexResult",
+    "SQLiteCheckpointStore",
+    "SQLiteContentHashStore",
+    "SearchManyResult",
+    "UpdateByFilterResult",
+    "async_bulk",
+    "async_delete_by_filter",
+    "async_export_engine",
+    "async_paginate",
+    "async_reindex",
+    "async_scan_documents",
+    "async_search_many",
+    "async_streaming_bulk",
+    "async_update_by_filter",
+    "bulk",
+    "delete_by_filter",
+    "export_engine",
+    "paginate",
+    "parallel_bulk",
+    "reindex",
+    "scan_documents",
+    "search_many",
+    "streaming_bulk",
+    "update_by_filter",
+]
@@ -0,0 +1,349 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Command-line tool for streaming JSONL / NDJSON files into an App Search
+engine or a Workplace Search custom content source::
+
+    $ python -m elastic_enterprise_search.ingest parks.jsonl \
+        --url https://localhost:3002 --engine national-parks --concurrency 8
+
+Each non-empty line of the file is sent as one document. Lines are read
+from a memory-mapped file and passed to the bulk helpers as-is once checked
+to hold a JSON object so files of any size are ingested with flat memory
+usage. Lines which don't hold a JSON object are reported as failed documents
+instead of failing the request of their whole chunk.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+import typing as t
+
+from ._checkpoint import CheckpointStore, FileCheckpointStore, SQLiteCheckpointStore
+from ._concurrency import AdaptiveConcurrencyLimiter
+from ._content_hash import SQLiteContentHashStore
+from ._helpers import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_CHUNK_BYTES, DEFAULT_MAX_RETRIES
+from ._sync.client import AppSearch, WorkplaceSearch
+from ._sync.helpers import parallel_bulk
+
+
+class _LineReader:
+    """Iterates over the non-empty lines of a file using a memory map.
+    The byte offset following the last line read is kept in ``offset``
+    and its 1-based number in ``line_number``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.offset = 0
+        self.line_number = 0
+
+    def __iter__(self) -> t.Iterator[bytes]:
+        # Empty files can't be memory-mapped.
+        if not self.size:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            mm.seek(self.offset)
+            while True:
+                line = mm.readline()
+                if not line:
+                    break
+                self.offset = mm.tell()
+                self.line_number += 1
+                line = line.strip()
+                if line:
+                    yield line
+
+
+class _Progress:
+    """Reports the number of documents sent and the throughput"""
+
+    def __init__(
+        self,
+        reader: _LineReader,
+        interval: float,
+        out: t.TextIO,
+        limiter: t.Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        self.reader = reader
+        self.interval = interval
+        self.out = out
+        self.limiter = limiter
+        self.start = self._last_report = time.monotonic()
+        self.indexed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def update(self, indexed: int, failed: int, skipped: int = 0) -> None:
+        self.indexed += indexed
+        self.failed += failed
+        self.skipped += skipped
+        now = time.monotonic()
+        if self.interval and now - self._last_report >= self.interval:
+            self._last_report = now
+            print(self._status(now), file=self.out, flush=True)
+
+    def summary(self) -> str:
+        return self._status(time.monotonic())
+
+    def _status(self, now: float) -> str:
+        elapsed = max(now - self.start, 1e-9)
+        done = self.indexed + self.failed + self.skipped
+        percent = (
+            100.0 * self.reader.offset / self.reader.size if self.reader.size else 100.0
+        )
+        status = (
+            f"{self.indexed:,} documents indexed, {self.failed:,} failed, "
+            f"{self.skipped:,} unchanged, "
+            f"{percent:.1f}% of {self.reader.size / 1e6:,.1f} MB read in {elapsed:.1f}s "
+            f"({done / elapsed:,.0f} docs/s, {self.reader.offset / 1e6 / elapsed:,.2f} MB/s"
+        )
+        if self.limiter is not None:
+            status += f", concurrency {self.limiter.limit}"
+        return status + ")"
+
+
+def _json_objects(reader: _LineReader, progress: _Progress) -> t.Iterator[bytes]:
+    """Yields the lines of ``reader`` holding a JSON object, the other lines
+    are reported with their line number and counted as failed documents.
+    """
+    for line in reader:
+        try:
+            error = None if isinstance(json.loads(line), dict) else "not a JSON object"
+        except ValueError as e:
+            error = f"invalid JSON: {e}"
+        if error is None:
+            yield line
+        else:
+            print(f"Line {reader.line_number} failed: {error}", file=sys.stderr)
+            progress.update(0, 1)
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, got {value}")
+    return number
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m elastic_enterprise_search.ingest",
+        description=(
+            "Streams a JSONL / NDJSON file with one document per line into an "
+            "App Search engine or a Workplace Search custom content source."
+        ),
+    )
+    parser.add_argument("path", help="Path of the JSONL / NDJSON file to ingest")
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("ENTERPRISE_SEARCH_URL", "http://localhost:3002"),
+        help="URL of Enterprise Search, defaults to $ENTERPRISE_SEARCH_URL",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--engine", help="Name of the App Search engine")
+    target.add_argument(
+        "--content-source", help="ID of the Workplace Search custom content source"
+    )
+    parser.add_argument(
+        "--bearer-auth",
+        default=os.environ.get("ENTERPRISE_SEARCH_BEARER_AUTH"),
+        help=(
+            "App Search private API key or content source access token, "
+            "defaults to $ENTERPRISE_SEARCH_BEARER_AUTH"
+        ),
+    )
+    parser.add_argument(
+        "--basic-auth",
+        default=os.environ.get("ENTERPRISE_SEARCH_BASIC_AUTH"),
+        metavar="USERNAME:PASSWORD",
+        help="Username and password, defaults to $ENTERPRISE_SEARCH_BASIC_AUTH",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=4,
+        help="Number of requests in flight at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help=(
+            "Adapt the number of requests in flight to the latency and "
+            "overload errors of Enterprise Search, up to --concurrency"
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Maximum number of documents per request (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-chunk-bytes",
+        type=_positive_int,
+        default=DEFAULT_MAX_CHUNK_BYTES,
+        help="Maximum size of a request body in bytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=_non_negative_int,
+        default=DEFAULT_MAX_RETRIES,
+        help=(
+            "Maximum number of times a document failing with "
+            "a transient error is re-sent (default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=60.0,
+        help="Timeout of each request in seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help=(
+            "File recording the number of documents acknowledged so an "
+            "interrupted ingestion resumes where it stopped when run again. "
+            "Paths ending with .db, .sqlite or .sqlite3 use a SQLite database, "
+            "otherwise a JSON file"
+        ),
+    )
+    parser.add_argument(
+        "--hash-store",
+        metavar="PATH",
+        help=(
+            "SQLite database recording the content hash of indexed documents. "
+            "Documents with an id that didn't change since they were last "
+            "indexed into the same target aren't sent again"
+        ),
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between progress reports, 0 disables them (default: %(default)s)",
+    )
+    return parser
+
+
+def _client(
+    args: argparse.Namespace, limiter: t.Optional[AdaptiveConcurrencyLimiter]
+) -> t.Union[AppSearch, WorkplaceSearch]:
+    kwargs: t.Dict[str, t.Any] = {
+        "connections_per_node": max(10, args.concurrency),
+        "request_timeout": args.request_timeout,
+        "concurrency_limiter": limiter,
+    }
+    if args.bearer_auth:
+        kwargs["bearer_auth"] = args.bearer_auth
+    if args.basic_auth:
+        username, _, password = args.basic_auth.partition(":")
+        kwargs["basic_auth"] = (username, password)
+    client_class = AppSearch if args.engine else WorkplaceSearch
+    return client_class(args.url, **kwargs)
+
+
+def _checkpoint_store(path: t.Optional[str]) -> t.Optional[CheckpointStore]:
+    if path is None:
+        return None
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteCheckpointStore(path)
+    return FileCheckpointStore(path)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.path):
+        parser.error(f"file not found: {args.path}")
+
+    reader = _LineReader(args.path)
+    limiter = (
+        AdaptiveConcurrencyLimiter(
+            initial_limit=min(4, args.concurrency), max_limit=args.concurrency
+        )
+        if args.adaptive_concurrency
+        else None
+    )
+    progress = _Progress(reader, args.progress_interval, sys.stderr, limiter)
+    checkpoint = _checkpoint_store(args.checkpoint)
+    hash_store = SQLiteContentHashStore(args.hash_store) if args.hash_store else None
+    started = False
+    try:
+        with _client(args, limiter) as client:
+            for result in parallel_bulk(
+                client,
+                _json_objects(reader, progress),
+                engine_name=args.engine,
+                content_source_id=args.content_source,
+                thread_count=args.concurrency,
+                queue_size=args.concurrency,
+                chunk_size=args.chunk_size,
+                max_chunk_bytes=args.max_chunk_bytes,
+                max_retries=args.max_retries,
+                checkpoint=checkpoint,
+                hash_store=hash_store,
+            ):
+                if result.offset and not started:
+                    print(
+                        f"Resuming after {result.offset:,} acknowledged documents",
+                        file=sys.stderr,
+                    )
+                started = True
+                for error in result.errors:
+                    print(
+                        f"Document #{error.position} (id={error.id!r}) failed: "
+                        + "; ".join(map(str, error.errors)),
+                        file=sys.stderr,
+                    )
+                progress.update(
+                    len(result.items) - len(result.errors),
+                    len(result.errors),
+                    result.skipped,
+                )
+    except KeyboardInterrupt:
+        print(f"Interrupted: {progress.summary()}", file=sys.stderr)
+        return 130
+    finally:
+        if isinstance(checkpoint, SQLiteCheckpointStore):
+            checkpoint.close()
+        if hash_store is not None:
+            hash_store.close()
+
+    print(progress.summary())
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,6 +59,11 @@ setup(
         "Issue Tracker": "https://github.com/elastic/enterprise-search-python/issues",
     },
     packages=packages,
+    entry_points={
+        "console_scripts": [
+            "enterprise-search-ingest=elastic_enterprise_search.ingest:main",
+        ],
+    },
     install_requires=[
         "elastic-transport>=8.4,<9",
         "PyJWT>=1,<3",
@@ -0,0 +1,468 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import datetime
+import json
+
+import pytest
+from dateutil import tz
+from elastic_transport import ApiResponseMeta, HttpHeaders
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch
+from elastic_enterprise_search.helpers import (
+    BulkItemError,
+    async_bulk,
+    async_streaming_bulk,
+    bulk,
+)
+from tests.conftest import AsyncBulkDummyNode, BulkDummyNode
+
+
+def test_bulk_index_chunks_by_count():
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    documents = ({"id": str(i)} for i in range(250))
+
+    results = list(client.bulk_index(engine_name="test", documents=documents))
+
+    assert [(r.offset, len(r.items)) for r in results] == [
+        (0, 100),
+        (100, 100),
+        (200, 50),
+    ]
+    assert results[1].items[0] == {"id": "100", "errors": []}
+
+    calls = client.transport.node_pool.get().calls
+    assert len(calls) == 3
+    assert calls[0][0] == ("POST", "/api/as/v1/engines/test/documents")
+    assert calls[0][1]["headers"]["content-type"] == "application/json"
+    assert json.loads(calls[2][1]["body"]) == [{"id": str(i)} for i in range(200, 250)]
+
+
+def test_bulk_index_chunks_by_bytes():
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    documents = [{"id": str(i), "body": "x" * 100} for i in range(10)]
+
+    results = list(
+        client.bulk_index(engine_name="test", documents=documents, max_chunk_bytes=500)
+    )
+
+    assert [len(r.items) for r in results] == [4, 4, 2]
+    for args, kwargs in client.transport.node_pool.get().calls:
+        assert len(kwargs["body"]) <= 500
+
+
+def test_bulk_index_oversized_document_sent_alone():
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    documents = [{"id": "1"}, {"id": "2", "body": "x" * 100}, {"id": "3"}]
+
+    results = list(
+        client.bulk_index(engine_name="test", documents=documents, max_chunk_bytes=50)
+    )
+
+    assert [[item["id"] for item in r.items] for r in results] == [["1"], ["2"], ["3"]]
+
+
+def test_bulk_index_is_lazy():
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    consumed = []
+
+    def documents():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"id": str(i)}
+
+    results = client.bulk_index(
+        engine_name="test", documents=documents(), chunk_size=10
+    )
+    next(results)
+
+    # Only the first chunk and the document that overflowed it were read.
+    assert len(consumed) == 11
+
+
+def test_bulk_index_serializer_processes():
+    documents = [
+        {"id": str(i), "created_at": datetime.datetime(2020, 1, 1, tzinfo=tz.UTC)}
+        for i in range(250)
+    ]
+    bodies = []
+    for serializer_processes in (0, 2):
+        client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+        results = list(
+            client.bulk_index(
+                engine_name="test",
+                documents=iter(documents),
+                chunk_size=30,
+                serializer_processes=serializer_processes,
+            )
+        )
+        assert [r.offset for r in results] == list(range(0, 250, 30))
+        bodies.append([kw["body"] for _, kw in client.transport.node_pool.get().calls])
+
+    assert bodies[0] == bodies[1]
+    assert json.loads(bodies[1][0])[0] == {
+        "id": "0",
+        "created_at": "2020-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_index_serializer_processes():
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    async def documents():
+        for i in range(250):
+            yield {"id": str(i)}
+
+    results = [
+        result
+        async for result in client.bulk_index(
+            engine_name="test", documents=documents(), serializer_processes=2
+        )
+    ]
+
+    assert [r.offset for r in results] == [0, 100, 200]
+    calls = client.transport.node_pool.get().calls
+    assert json.loads(calls[2][1]["body"]) == [{"id": str(i)} for i in range(200, 250)]
+
+
+def test_bulk_index_invalid_serializer_processes():
+    client = AppSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        list(
+            client.bulk_index(
+                engine_name="test", documents=[{"id": "1"}], serializer_processes=-1
+            )
+        )
+    assert str(e.value) == "'serializer_processes' must be a non-negative integer"
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1, None])
+def test_bulk_index_invalid_chunk_size(chunk_size):
+    client = AppSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        list(client.bulk_index(engine_name="test", documents=[], chunk_size=chunk_size))
+    assert str(e.value) == "'chunk_size' must be a positive integer"
+
+
+@pytest.mark.parametrize("max_retries", [-1, None])
+def test_bulk_index_invalid_max_retries(max_retries):
+    client = AppSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        list(
+            client.bulk_index(
+                engine_name="test", documents=[{"id": "1"}], max_retries=max_retries
+            )
+        )
+    assert str(e.value) == "'max_retries' must be a non-negative integer"
+    assert client.transport.node_pool.get().calls == []
+
+
+def test_bulk_index_empty_engine_name():
+    client = AppSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        list(client.bulk_index(engine_name="", documents=[{"id": "1"}]))
+    assert str(e.value) == "Empty value passed for parameter 'engine_name'"
+
+
+def test_bulk_delete():
+    class MissingNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            items = json.loads(data)
+            for item in items:
+                item["deleted"] = int(item["id"]) % 50 != 0
+            return meta, json.dumps(items).encode()
+
+    client = AppSearch(node_class=MissingNode, meta_header=False)
+
+    results = list(
+        client.bulk_delete(
+            engine_name="test",
+            document_ids=(str(i) for i in range(250)),
+            max_concurrency=2,
+        )
+    )
+
+    assert sorted(r.offset for r in results) == [0, 100, 200]
+    assert sorted(error.id for r in results for error in r.errors) == [
+        "0",
+        "100",
+        "150",
+        "200",
+        "50",
+    ]
+    assert results[0].errors[0].errors == ["Document wasn't found"]
+    calls = client.transport.node_pool.get().calls
+    assert {call[0] for call in calls} == {
+        ("DELETE", "/api/as/v1/engines/test/documents")
+    }
+    assert json.loads(calls[0][1]["body"])[:2] in (["0", "1"], ["100", "101"])
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_index():
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    async def documents():
+        for i in range(250):
+            yield {"id": str(i)}
+
+    results = [
+        result
+        async for result in client.bulk_index(engine_name="test", documents=documents())
+    ]
+
+    assert [(r.offset, len(r.items)) for r in results] == [
+        (0, 100),
+        (100, 100),
+        (200, 50),
+    ]
+    calls = client.transport.node_pool.get().calls
+    assert calls[0][0] == ("POST", "/api/as/v1/engines/test/documents")
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_index_max_concurrency():
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    node.delay = 0.01
+    in_flight, max_in_flight = 0, 0
+    original_perform_request = node.perform_request
+
+    async def perform_request(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(in_flight, max_in_flight)
+        try:
+            return await original_perform_request(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    node.perform_request = perform_request
+    documents = [{"id": str(i)} for i in range(100)]
+
+    results = [
+        result
+        async for result in client.bulk_index(
+            engine_name="test", documents=documents, chunk_size=5, max_concurrency=3
+        )
+    ]
+
+    assert max_in_flight == 3
+    assert sorted(r.offset for r in results) == list(range(0, 100, 5))
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_backpressure():
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+    client.transport.node_pool.get().delay = 0.01
+    consumed = []
+
+    async def documents():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"id": str(i)}
+
+    results = async_streaming_bulk(
+        client, documents(), engine_name="test", chunk_size=10, max_concurrency=2
+    )
+    await results.__anext__()
+    await results.aclose()
+
+    # Two chunks in flight and the document which overflowed the second chunk.
+    assert len(consumed) == 21
+
+
+@pytest.mark.asyncio
+async def test_async_bulk():
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    success, errors = await async_bulk(
+        client, [{"id": str(i)} for i in range(150)], engine_name="test"
+    )
+    assert success == 150
+    assert errors == []
+
+
+def test_bulk_collects_errors():
+    class ErrorNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            items = json.loads(data)
+            items[0]["errors"] = ["Invalid field"]
+            return meta, json.dumps(items).encode()
+
+    client = AppSearch(node_class=ErrorNode, meta_header=False)
+
+    success, errors = bulk(
+        client, [{"id": str(i)} for i in range(150)], engine_name="test"
+    )
+    assert success == 148
+    assert errors == [
+        BulkItemError(position=0, id="0", errors=["Invalid field"]),
+        BulkItemError(position=100, id="100", errors=["Invalid field"]),
+    ]
+
+
+def test_bulk_index_retries_only_transient_errors(mocker):
+    mocker.patch("time.sleep")
+
+    class FlakyNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            items = json.loads(data)
+            for item in items:
+                if item["id"] == "bad":
+                    item["errors"] = ["Invalid field value"]
+                elif item["id"] == "flaky" and len(self.calls) < 3:
+                    item["errors"] = ["Request timed out, please try again"]
+            return meta, json.dumps(items).encode()
+
+    client = AppSearch(node_class=FlakyNode, meta_header=False)
+    documents = [{"id": "1"}, {"id": "flaky"}, {"id": "bad"}, {"id": "2"}]
+
+    (result,) = client.bulk_index(
+        engine_name="test", documents=documents, max_retries=3
+    )
+
+    calls = client.transport.node_pool.get().calls
+    assert [json.loads(kwargs["body"]) for _, kwargs in calls] == [
+        documents,
+        [{"id": "flaky"}],
+        [{"id": "flaky"}],
+    ]
+    assert [item["id"] for item in result.items] == ["1", "flaky", "bad", "2"]
+    assert result.errors == [
+        BulkItemError(position=2, id="bad", errors=["Invalid field value"])
+    ]
+
+
+def test_bulk_index_transient_errors_run_out_of_retries(mocker):
+    sleep = mocker.patch("time.sleep")
+
+    class TimeoutNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            items = json.loads(data)
+            items[0]["errors"] = ["Timeout"]
+            return meta, json.dumps(items).encode()
+
+    client = AppSearch(node_class=TimeoutNode, meta_header=False)
+
+    (result,) = client.bulk_index(
+        engine_name="test", documents=[{"id": "1"}, {"id": "2"}], max_retries=2
+    )
+
+    assert len(client.transport.node_pool.get().calls) == 3
+    assert [call[0] for call in sleep.call_args_list] == [(1.0,), (2.0,)]
+    assert result.errors == [BulkItemError(position=0, id="1", errors=["Timeout"])]
+
+
+class PayloadLimitNode(BulkDummyNode):
+    max_body_bytes = 300
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        if len(body) <= self.max_body_bytes:
+            return super().perform_request(method, target, body=body, **kwargs)
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        meta = ApiResponseMeta(
+            status=413,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, b'{"error":"Request Entity Too Large"}'
+
+
+def test_bulk_index_splits_chunk_on_payload_too_large():
+    client = AppSearch(node_class=PayloadLimitNode, meta_header=False)
+    documents = [{"id": str(i), "body": "x" * 50} for i in range(16)]
+
+    results = list(client.bulk_index(engine_name="test", documents=documents))
+
+    (result,) = results
+    assert [item["id"] for item in result.items] == [str(i) for i in range(16)]
+    assert result.errors == []
+
+    bodies = [kwargs["body"] for _, kwargs in client.transport.node_pool.get().calls]
+    # 16 -> 8 + 8 -> 4 + 4 + 4 + 4 documents per request.
+    assert [len(json.loads(body)) for body in bodies] == [16, 8, 4, 4, 8, 4, 4]
+
+
+def test_bulk_index_remembers_payload_ceiling():
+    client = AppSearch(node_class=PayloadLimitNode, meta_header=False)
+    documents = [{"id": str(i), "body": "x" * 50} for i in range(40)]
+
+    results = list(
+        client.bulk_index(engine_name="test", documents=documents, chunk_size=10)
+    )
+
+    assert sum(len(result.items) for result in results) == 40
+    bodies = [kwargs["body"] for _, kwargs in client.transport.node_pool.get().calls]
+    rejected = [body for body in bodies if len(body) > PayloadLimitNode.max_body_bytes]
+    # Only the first chunk is rejected, the following chunks are sized up front.
+    assert len(rejected) == 3
+    assert all(int(doc["id"]) < 10 for body in rejected for doc in json.loads(body))
+
+
+def test_bulk_index_remembers_payload_ceiling_across_calls():
+    client = AppSearch(node_class=PayloadLimitNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    documents = [{"id": str(i), "body": "x" * 50} for i in range(16)]
+
+    list(client.bulk_index(engine_name="test", documents=documents))
+    assert list(client._chunk_byte_limits) == ["engine:test"]
+    assert client._chunk_byte_limits["engine:test"] <= PayloadLimitNode.max_body_bytes
+
+    # Later calls to the same engine start from the learned ceiling,
+    # also with clients derived with options().
+    node.calls.clear()
+    list(
+        client.options(request_timeout=30).bulk_delete(
+            engine_name="test", document_ids=[str(i) for i in range(100)]
+        )
+    )
+    list(client.bulk_index(engine_name="test", documents=documents))
+    bodies = [kwargs["body"] for _, kwargs in node.calls]
+    assert all(len(body) <= PayloadLimitNode.max_body_bytes for body in bodies)
+
+    # Other engines aren't limited.
+    node.calls.clear()
+    list(client.bulk_index(engine_name="other", documents=documents[:4]))
+    assert len(node.calls) == 1
+
+
+def test_bulk_index_single_document_too_large():
+    client = AppSearch(node_class=PayloadLimitNode, meta_header=False)
+    documents = [{"id": "1"}, {"id": "big", "body": "x" * 500}, {"id": "2"}]
+
+    (result,) = client.bulk_index(engine_name="test", documents=documents)
+
+    assert [item["id"] for item in result.items] == ["1", "big", "2"]
+    assert result.errors == [
+        BulkItemError(
+            position=1,
+            id="big",
+            errors=["Document of 522 bytes exceeds the maximum request size"],
+        )
+    ]
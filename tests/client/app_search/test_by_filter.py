@@ -0,0 +1,280 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch
+from elastic_enterprise_search.helpers import BulkItemError
+from tests.conftest import AsyncEngineDummyNode, EngineDummyNode
+
+
+@pytest.fixture(autouse=True)
+def no_refresh_interval(mocker):
+    mocker.patch("elastic_enterprise_search._sync.helpers._REFRESH_INTERVAL", 0)
+    mocker.patch("elastic_enterprise_search._async.helpers._REFRESH_INTERVAL", 0)
+
+
+def engine_node(client, count=2500):
+    node = client.transport.node_pool.get()
+    node.documents = {
+        f"{i:04}": {"id": f"{i:04}", "state": "expired" if i % 2 else "active"}
+        for i in range(count)
+    }
+    return node
+
+
+def test_delete_by_filter():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client)
+
+    result = client.delete_by_filter(
+        engine_name="parks", filters={"state": "expired"}, max_concurrency=2
+    )
+
+    assert result.deleted == 1250
+    assert result.errors == []
+    assert result.duration > 0
+    assert result.docs_per_second > 0
+    assert len(node.documents) == 1250
+    assert all(doc["state"] == "active" for doc in node.documents.values())
+
+    searches = [call for call in node.calls if call[0][1].endswith("/search")]
+    assert searches[0][0] == ("POST", "/api/as/v1/engines/parks/search")
+    # Deleted documents are still visible to the search following each round
+    # so the search is started over instead of deleting them again.
+    assert [json.loads(call[1]["body"])["page"]["current"] for call in searches] == [
+        1,
+        1,
+        2,
+        1,
+        1,
+        1,
+    ]
+
+
+def test_delete_by_filter_failed_documents_are_not_retried_forever():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=10)
+    node.undeletable = {"0001", "0005"}
+
+    result = client.delete_by_filter(engine_name="parks", filters={"state": "expired"})
+
+    assert result.deleted == 3
+    assert sorted(result.errors) == [
+        BulkItemError(position=0, id="0001", errors=["Internal error"]),
+        BulkItemError(position=2, id="0005", errors=["Internal error"]),
+    ]
+    assert sorted(node.documents) == [
+        "0000",
+        "0001",
+        "0002",
+        "0004",
+        "0005",
+        "0006",
+        "0008",
+    ]
+
+
+def test_delete_by_filter_slow_refresh():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=2500)
+    # Deleted documents stay visible for several rounds.
+    node.stale_searches = 3
+
+    result = client.delete_by_filter(engine_name="parks", filters={"state": "expired"})
+
+    # Documents sent again once forgotten aren't counted twice.
+    assert result.deleted == 1250
+    assert result.errors == []
+    assert not result.remaining
+    assert all(doc["state"] == "active" for doc in node.documents.values())
+
+
+def test_delete_by_filter_already_deleted_documents():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=10)
+    # Documents deleted by another client are still returned by the search.
+    for doc_id in ("0001", "0003"):
+        node._delete(doc_id)
+
+    result = client.delete_by_filter(engine_name="parks", filters={"state": "expired"})
+
+    # Documents which were already deleted aren't errors.
+    assert result.deleted == 3
+    assert result.errors == []
+    assert all(doc["state"] == "active" for doc in node.documents.values())
+
+
+def test_delete_by_filter_failed_documents_fill_search_results():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=10100)
+    node.undeletable = set(sorted(node.documents)[:10000])
+
+    result = client.delete_by_filter(engine_name="parks", filters={})
+
+    # The documents after the first 10,000 results can't be reached.
+    assert result.remaining
+    assert result.deleted == 0
+    assert len(result.errors) == 10000
+    assert len(node.documents) == 10100
+
+
+def test_delete_by_filter_no_matches():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client)
+
+    result = client.delete_by_filter(engine_name="parks", filters={"state": "unknown"})
+
+    assert result.deleted == 0
+    assert len(node.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_delete_by_filter():
+    client = AsyncAppSearch(node_class=AsyncEngineDummyNode, meta_header=False)
+    node = engine_node(client)
+
+    result = await client.delete_by_filter(
+        engine_name="parks", filters={"state": "expired"}, max_concurrency=4
+    )
+
+    assert result.deleted == 1250
+    assert result.errors == []
+    assert all(doc["state"] == "active" for doc in node.documents.values())
+
+
+def test_update_by_filter():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=15000)
+    node.documents["0001"]["status"] = "archived"
+
+    result = client.update_by_filter(
+        engine_name="parks",
+        filters={"state": "expired"},
+        patch={"status": "archived"},
+        max_concurrency=4,
+    )
+
+    # More documents than App Search paginates over are updated.
+    assert result.updated == 7499
+    assert result.errors == []
+    assert result.docs_per_second > 0
+    assert all(
+        doc.get("status") == ("archived" if doc["state"] == "expired" else None)
+        for doc in node.documents.values()
+    )
+    calls = node.calls
+    assert json.loads(calls[0][1]["body"])["filters"] == {
+        "all": [{"state": "expired"}],
+        "none": [{"all": [{"status": "archived"}]}],
+    }
+    updates = [call for call in calls if call[0][0] == "PATCH"]
+    assert updates[0][0] == ("PATCH", "/api/as/v1/engines/parks/documents")
+    assert json.loads(updates[0][1]["body"])[0] == {"id": "0003", "status": "archived"}
+
+
+def test_update_by_filter_list_values():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=10)
+    # Documents holding more values than the patch are updated too.
+    node.documents["0001"]["tags"] = ["arctic", "coastal", "remote"]
+    node.documents["0003"]["tags"] = ["arctic"]
+
+    result = client.update_by_filter(
+        engine_name="parks",
+        filters={"state": "expired"},
+        patch={"tags": ["arctic", "coastal"]},
+    )
+
+    assert result.updated == 5
+    assert result.errors == []
+    assert all(
+        doc.get("tags")
+        == (["arctic", "coastal"] if doc["state"] == "expired" else None)
+        for doc in node.documents.values()
+    )
+    searches = [call for call in node.calls if call[0][1].endswith("/search")]
+    assert json.loads(searches[0][1]["body"])["filters"] == {"state": "expired"}
+    assert len(searches) == 2
+
+
+def test_update_by_filter_slow_refresh():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    node = engine_node(client, count=2500)
+    node.stale_searches = 3
+
+    result = client.update_by_filter(
+        engine_name="parks", filters={"state": "expired"}, patch={"tags": ["archived"]}
+    )
+
+    # Updated documents still returned by searches aren't updated twice.
+    assert result.updated == 1250
+    assert result.errors == []
+    updates = [call for call in node.calls if call[0][0] == "PATCH"]
+    assert sum(len(json.loads(call[1]["body"])) for call in updates) == 1250
+
+
+def test_update_by_filter_list_values_beyond_search_results():
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+    engine_node(client, count=10500)
+
+    result = client.update_by_filter(
+        engine_name="parks", filters={}, patch={"tags": ["archived"]}
+    )
+
+    assert result.updated == 10000
+    assert result.remaining
+
+
+@pytest.mark.parametrize(
+    ["patch", "message"],
+    [
+        ({}, "'patch' must contain at least one field"),
+        ({"id": "1"}, "'patch' can't change the 'id' of documents"),
+        (
+            {"location": {"lat": 1}},
+            "Value for field 'location' in 'patch' must be a string, "
+            "a number or a non-empty list of strings or numbers",
+        ),
+        (
+            {"tags": []},
+            "Value for field 'tags' in 'patch' must be a string, "
+            "a number or a non-empty list of strings or numbers",
+        ),
+    ],
+)
+def test_update_by_filter_invalid_patch(patch, message):
+    client = AppSearch(node_class=EngineDummyNode, meta_header=False)
+
+    with pytest.raises(ValueError) as e:
+        client.update_by_filter(engine_name="parks", filters={}, patch=patch)
+    assert str(e.value) == message
+
+
+@pytest.mark.asyncio
+async def test_async_update_by_filter():
+    client = AsyncAppSearch(node_class=AsyncEngineDummyNode, meta_header=False)
+    node = engine_node(client)
+
+    result = await client.update_by_filter(
+        engine_name="parks", filters={}, patch={"visits": 0}, max_concurrency=4
+    )
+
+    assert result.updated == 2500
+    assert all(doc["visits"] == 0 for doc in node.documents.values())
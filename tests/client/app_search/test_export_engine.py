@@ -0,0 +1,152 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import io
+import json
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch, BadRequestError
+from tests.conftest import AsyncSearchAfterDummyNode, SearchAfterDummyNode
+
+
+def export_client(client_class=AppSearch, node_class=SearchAfterDummyNode, count=2500):
+    client = client_class(node_class=node_class, meta_header=False, max_retries=0)
+    client.transport.node_pool.get().documents = [
+        {"id": f"park-{i:05}", "visitors": i} for i in range(count)
+    ]
+    return client
+
+
+def request_bodies(client):
+    return [
+        json.loads(call[1]["body"]) for call in client.transport.node_pool.get().calls
+    ]
+
+
+def test_export_follows_search_after():
+    client = export_client()
+
+    ids = [doc["id"] for doc in client.export_engine(engine_name="parks")]
+
+    assert ids == [f"park-{i:05}" for i in range(2500)]
+    bodies = request_bodies(client)
+    assert [body.get("search_after") for body in bodies] == [
+        None,
+        ["park-00999"],
+        ["park-01999"],
+    ]
+    assert bodies[0]["query"] == {"match_all": {}}
+    assert {call[0][1] for call in client.transport.node_pool.get().calls} == {
+        "/api/as/v0/engines/parks/elasticsearch/_search"
+    }
+
+
+def test_export_full_last_page():
+    client = export_client(count=2000)
+
+    assert len(list(client.export_engine(engine_name="parks"))) == 2000
+    assert len(request_bodies(client)) == 3
+
+
+def test_export_slices():
+    client = export_client()
+    query = {"range": {"visitors": {"gte": 0}}}
+
+    ids = [
+        doc["id"]
+        for doc in client.export_engine(
+            engine_name="parks", query=query, slices=4, page_size=100
+        )
+    ]
+
+    assert sorted(ids) == [f"park-{i:05}" for i in range(2500)]
+    bodies = request_bodies(client)
+    assert {body["query"]["bool"]["filter"][0] == query for body in bodies} == {True}
+    slices = {
+        body["query"]["bool"]["filter"][1]["script"]["script"]["params"]["slice"]
+        for body in bodies
+    }
+    assert slices == {0, 1, 2, 3}
+
+
+def test_export_slice_error():
+    client = export_client()
+    client.transport.node_pool.get().fail_slice = 2
+
+    with pytest.raises(BadRequestError):
+        list(client.export_engine(engine_name="parks", slices=3))
+
+
+def test_export_stops_slices_when_closed():
+    client = export_client(count=10_000)
+
+    documents = client.export_engine(engine_name="parks", slices=2, page_size=10)
+    next(documents)
+    documents.close()
+
+    # Each slice stops after handing over at most a few pages.
+    assert len(request_bodies(client)) < 10
+
+
+def test_export_sink(tmp_path):
+    client = export_client(count=30)
+    sink = io.BytesIO()
+
+    documents = list(client.export_engine(engine_name="parks", sink=sink))
+
+    assert [json.loads(line) for line in sink.getvalue().splitlines()] == documents
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"page_size": 0}, "'page_size' must be a positive integer"),
+        ({"slices": 0}, "'slices' must be a positive integer"),
+        ({"sort": []}, "'sort' must contain at least one field"),
+    ],
+)
+def test_export_invalid_parameters(kwargs, message):
+    client = export_client()
+    with pytest.raises(ValueError) as e:
+        list(client.export_engine(engine_name="parks", **kwargs))
+    assert str(e.value) == message
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("slices", [1, 3])
+async def test_async_export(slices):
+    client = export_client(AsyncAppSearch, AsyncSearchAfterDummyNode)
+
+    ids = [
+        doc["id"]
+        async for doc in client.export_engine(
+            engine_name="parks", slices=slices, page_size=500
+        )
+    ]
+
+    assert sorted(ids) == [f"park-{i:05}" for i in range(2500)]
+
+
+@pytest.mark.asyncio
+async def test_async_export_slice_error():
+    client = export_client(AsyncAppSearch, AsyncSearchAfterDummyNode)
+    client.transport.node_pool.get().fail_slice = 0
+
+    with pytest.raises(BadRequestError):
+        async for _ in client.export_engine(engine_name="parks", slices=2):
+            pass
@@ -0,0 +1,174 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import time
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch
+from elastic_enterprise_search.helpers import paginate
+from tests.conftest import AsyncPagedDummyNode, PagedDummyNode
+
+
+def paged_client(client_class=AppSearch, node_class=PagedDummyNode, count=55):
+    client = client_class(node_class=node_class, meta_header=False)
+    client.transport.node_pool.get().items = [{"id": str(i)} for i in range(count)]
+    return client
+
+
+def targets(client):
+    return [call[0][1] for call in client.transport.node_pool.get().calls]
+
+
+def test_iter_documents_fetches_pages_lazily():
+    client = paged_client()
+
+    documents = client.iter_documents(engine_name="parks", page_size=20)
+    assert targets(client) == []
+
+    assert [next(documents) for _ in range(20)] == [{"id": str(i)} for i in range(20)]
+    assert len(targets(client)) == 1
+    next(documents)
+    assert len(targets(client)) == 2
+
+    assert [doc["id"] for doc in documents] == [str(i) for i in range(21, 55)]
+    assert targets(client) == [
+        f"/api/as/v1/engines/parks/documents/list?page[current]={page}&page[size]=20"
+        for page in (1, 2, 3)
+    ]
+
+
+@pytest.mark.parametrize(
+    ["method", "kwargs", "path"],
+    [
+        ("iter_engines", {}, "/api/as/v1/engines"),
+        ("iter_api_keys", {}, "/api/as/v1/credentials"),
+        (
+            "iter_curations",
+            {"engine_name": "parks"},
+            "/api/as/v1/engines/parks/curations",
+        ),
+        (
+            "iter_synonym_sets",
+            {"engine_name": "parks"},
+            "/api/as/v1/engines/parks/synonyms",
+        ),
+        (
+            "iter_crawler_domains",
+            {"engine_name": "parks"},
+            "/api/as/v1/engines/parks/crawler/domains",
+        ),
+        (
+            "iter_crawler_crawl_requests",
+            {"engine_name": "parks"},
+            "/api/as/v1/engines/parks/crawler/crawl_requests",
+        ),
+        (
+            "iter_crawler_process_crawls",
+            {"engine_name": "parks"},
+            "/api/as/v1/engines/parks/crawler/process_crawls",
+        ),
+    ],
+)
+def test_app_search_iterators(method, kwargs, path):
+    client = paged_client()
+
+    assert len(list(getattr(client, method)(**kwargs))) == 55
+    assert [target.partition("?")[0] for target in targets(client)] == [path] * 3
+
+
+def test_empty_list():
+    client = paged_client(count=0)
+
+    assert list(paginate(client.list_engines)) == []
+    assert len(targets(client)) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_iter_documents():
+    client = paged_client(AsyncAppSearch, AsyncPagedDummyNode)
+
+    ids = [
+        doc["id"]
+        async for doc in client.iter_documents(engine_name="parks", page_size=25)
+    ]
+
+    assert ids == [str(i) for i in range(55)]
+    assert len(targets(client)) == 3
+
+
+class SlowPagedNode(PagedDummyNode):
+    delay = 0.05
+
+    def perform_request(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().perform_request(*args, **kwargs)
+
+
+def test_prefetch_fetches_pages_concurrently():
+    client = paged_client(node_class=SlowPagedNode, count=1000)
+
+    start = time.monotonic()
+    ids = [doc["id"] for doc in client.iter_documents(engine_name="parks", prefetch=8)]
+
+    assert ids == [str(i) for i in range(1000)]
+    assert len(targets(client)) == 40
+    # 39 pages after the first one, 8 at a time.
+    assert time.monotonic() - start < 20 * SlowPagedNode.delay
+
+
+def test_prefetch_stops_when_closed():
+    client = paged_client(count=1000)
+
+    documents = client.iter_documents(engine_name="parks", page_size=100, prefetch=3)
+    assert next(documents) == {"id": "0"}
+    documents.close()
+
+    # The first page and at most three prefetched ones were requested.
+    assert len(targets(client)) <= 4
+
+
+def test_prefetch_single_page():
+    client = paged_client(count=10)
+
+    assert len(list(paginate(client.list_engines, prefetch=4))) == 10
+    assert len(targets(client)) == 1
+
+
+def test_invalid_prefetch():
+    client = paged_client()
+    with pytest.raises(ValueError) as e:
+        list(client.iter_engines(prefetch=-1))
+    assert str(e.value) == "'prefetch' must be a non-negative integer"
+
+
+@pytest.mark.asyncio
+async def test_async_prefetch():
+    client = paged_client(AsyncAppSearch, AsyncPagedDummyNode, count=1000)
+
+    ids = [
+        doc["id"]
+        async for doc in client.iter_documents(
+            engine_name="parks", page_size=100, prefetch=4
+        )
+    ]
+
+    assert ids == [str(i) for i in range(1000)]
+    assert sorted(targets(client)) == sorted(
+        f"/api/as/v1/engines/parks/documents/list?page[current]={page}&page[size]=100"
+        for page in range(1, 11)
+    )
@@ -0,0 +1,138 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch
+from elastic_enterprise_search.helpers import reindex
+from tests.conftest import (
+    AsyncBulkDummyNode,
+    AsyncSearchAfterDummyNode,
+    BulkDummyNode,
+    SearchAfterDummyNode,
+)
+
+
+class ReindexNode(SearchAfterDummyNode):
+    """Serves searches of the source engine and indexes into any engine"""
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        if target.endswith("/documents"):
+            return BulkDummyNode.perform_request(self, method, target, body, **kwargs)
+        return super().perform_request(method, target, body, **kwargs)
+
+
+def source_client(client_class=AppSearch, node_class=SearchAfterDummyNode):
+    client = client_class(node_class=node_class, meta_header=False)
+    client.transport.node_pool.get().documents = [
+        {"id": f"park-{i:04}", "visitors": i} for i in range(1200)
+    ]
+    return client
+
+
+def indexed_documents(client):
+    return [
+        doc
+        for (_, target), kwargs in client.transport.node_pool.get().calls
+        if target == "/api/as/v1/engines/parks-v2/documents"
+        for doc in json.loads(kwargs["body"])
+    ]
+
+
+@pytest.mark.parametrize("slices", [1, 3])
+def test_reindex_across_clients(slices):
+    source = source_client()
+    dest = AppSearch(node_class=BulkDummyNode, meta_header=False)
+
+    result = reindex(
+        source,
+        "parks",
+        "parks-v2",
+        dest_client=dest,
+        slices=slices,
+        page_size=250,
+    )
+
+    assert (result.exported, result.indexed, result.errors) == (1200, 1200, [])
+    assert result.docs_per_second > 0
+    documents = indexed_documents(dest)
+    assert sorted(doc["id"] for doc in documents) == [
+        f"park-{i:04}" for i in range(1200)
+    ]
+    assert {
+        len(json.loads(call[1]["body"]))
+        for call in dest.transport.node_pool.get().calls
+    } == {100}
+
+
+def test_reindex_transform():
+    client = source_client(node_class=ReindexNode)
+
+    def transform(document):
+        if document["visitors"] % 2:
+            return None
+        return dict(document, visitors=str(document["visitors"]))
+
+    result = client.reindex(
+        source_engine="parks", dest_engine="parks-v2", transform=transform
+    )
+
+    assert (result.exported, result.indexed) == (1200, 600)
+    documents = indexed_documents(client)
+    assert documents[:2] == [
+        {"id": "park-0000", "visitors": "0"},
+        {"id": "park-0002", "visitors": "2"},
+    ]
+
+
+def test_reindex_errors_stop_the_export():
+    source = source_client()
+    dest = AppSearch(node_class=BulkDummyNode, meta_header=False, max_retries=0)
+    dest.transport.node_pool.get().exception = ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        reindex(source, "parks", "parks-v2", dest_client=dest, page_size=10)
+
+    # The export stops after reading the pages of the chunks in flight.
+    assert len(source.transport.node_pool.get().calls) < 60
+
+
+def test_reindex_invalid_parameters():
+    with pytest.raises(ValueError) as e:
+        reindex(source_client(), "parks", "parks-v2", slices=0)
+    assert str(e.value) == "'slices' must be a positive integer"
+
+
+@pytest.mark.asyncio
+async def test_async_reindex():
+    source = source_client(AsyncAppSearch, AsyncSearchAfterDummyNode)
+    dest = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    result = await source.reindex(
+        source_engine="parks",
+        dest_engine="parks-v2",
+        dest_client=dest,
+        slices=2,
+        transform=lambda doc: dict(doc, copied=True),
+    )
+
+    assert (result.exported, result.indexed, result.errors) == (1200, 1200, [])
+    documents = indexed_documents(dest)
+    assert len(documents) == 1200
+    assert all(doc["copied"] for doc in documents)
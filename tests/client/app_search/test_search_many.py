@@ -0,0 +1,248 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import json
+import threading
+
+import pytest
+from elastic_transport import ApiResponseMeta, ConnectionTimeout, HttpHeaders
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch, NotFoundError
+from elastic_enterprise_search.helpers import search_many
+from tests.conftest import DummyNode, NodeResponse
+
+SCORES = {
+    "parks-us": [9.0, 7.0, 4.0, 1.0],
+    "parks-ca": [8.0, 7.5, 2.0],
+    "parks-mx": [5.0, 3.0],
+}
+FACETS = {
+    "parks-us": {
+        "states": [
+            {
+                "type": "value",
+                "data": [
+                    {"value": "Utah", "count": 5},
+                    {"value": "Alaska", "count": 2},
+                ],
+            }
+        ],
+        "visitors": [
+            {
+                "type": "range",
+                "data": [
+                    {"to": 1000, "count": 3},
+                    {"from": 1000, "count": 1},
+                ],
+            }
+        ],
+    },
+    "parks-ca": {
+        "states": [
+            {
+                "type": "value",
+                "data": [
+                    {"value": "Yukon", "count": 4},
+                    {"value": "Alaska", "count": 4},
+                ],
+            }
+        ],
+        "visitors": [
+            {
+                "type": "range",
+                "data": [
+                    {"to": 1000, "count": 2},
+                    {"from": 1000, "count": 2},
+                ],
+            }
+        ],
+    },
+}
+
+
+class EnginesNode(DummyNode):
+    """Responds to searches of the engines of 'SCORES' with their results"""
+
+    failing = {}
+    lock = threading.Lock()
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        with self.lock:
+            self.calls.append(((method, target), dict(body=body, **kwargs)))
+        engine = target.split("/")[5]
+        if engine in self.failing:
+            raise self.failing[engine]
+        request = json.loads(body)
+        scores = SCORES.get(engine, [])[: request["page"]["size"]]
+        data = {
+            "meta": {"page": {"total_results": len(SCORES.get(engine, []))}},
+            "results": [
+                {"_meta": {"engine": engine, "id": f"{engine}-{i}", "score": score}}
+                for i, score in enumerate(scores)
+            ],
+        }
+        if "facets" in request and engine in FACETS:
+            data["facets"] = FACETS[engine]
+        meta = ApiResponseMeta(
+            status=404 if engine == "missing" else 200,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, json.dumps(data).encode()
+
+
+class AsyncEnginesNode(EnginesNode):
+    async def perform_request(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+def ids(result):
+    return [doc["_meta"]["id"] for doc in result.results]
+
+
+@pytest.fixture
+def client():
+    client = AppSearch(node_class=EnginesNode, meta_header=False)
+    client.transport.node_pool.get().failing = {}
+    return client
+
+
+def test_results_are_merged_by_score(client):
+    result = search_many(client, list(SCORES), "lake", page_size=4)
+
+    assert ids(result) == ["parks-us-0", "parks-ca-0", "parks-ca-1", "parks-us-1"]
+    assert result.total_results == 9
+    assert not result.partial
+    # Each engine returns the results up to the end of the page.
+    bodies = [
+        json.loads(kwargs["body"])
+        for _, kwargs in client.transport.node_pool.get().calls
+    ]
+    assert {json.dumps(body["page"]) for body in bodies} == {
+        '{"current": 1, "size": 4}'
+    }
+
+
+def test_following_pages(client):
+    result = client.search_many(
+        engines=list(SCORES), query="lake", current_page=2, page_size=4
+    )
+
+    assert ids(result) == ["parks-mx-0", "parks-us-2", "parks-mx-1", "parks-ca-2"]
+    result = client.search_many(
+        engines=list(SCORES), query="lake", current_page=3, page_size=4
+    )
+    assert ids(result) == ["parks-us-3"]
+
+
+def test_facets_are_combined(client):
+    result = client.search_many(
+        engines=list(SCORES),
+        query="lake",
+        facets={"states": {"type": "value"}, "visitors": {"type": "range"}},
+    )
+
+    assert result.facets == {
+        "states": [
+            {
+                "type": "value",
+                "data": [
+                    {"value": "Alaska", "count": 6},
+                    {"value": "Utah", "count": 5},
+                ],
+            }
+        ],
+        "visitors": [
+            {
+                "type": "range",
+                "data": [{"to": 1000, "count": 5}, {"from": 1000, "count": 3}],
+            }
+        ],
+    }
+
+
+def test_failing_engines_give_partial_results(client):
+    timeout = ConnectionTimeout("timed out")
+    client.transport.node_pool.get().failing = {"parks-us": timeout}
+
+    result = search_many(
+        client, ["parks-us", "missing", "parks-ca"], "lake", timeout=0.5
+    )
+
+    assert ids(result) == ["parks-ca-0", "parks-ca-1", "parks-ca-2"]
+    assert result.partial
+    assert result.errors["parks-us"] is timeout
+    assert isinstance(result.errors["missing"], NotFoundError)
+    # Engines get a single attempt within the timeout.
+    calls = client.transport.node_pool.get().calls
+    assert len(calls) == 3
+    assert {kwargs["request_timeout"] for _, kwargs in calls} == {0.5}
+
+
+def test_search_fails_if_every_engine_fails(client):
+    client.transport.node_pool.get().failing = {
+        "parks-us": ConnectionTimeout("timed out")
+    }
+
+    with pytest.raises(ConnectionTimeout):
+        search_many(client, ["parks-us"], "lake", timeout=0.5)
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"engines": []}, "'engines' must contain at least one engine name"),
+        ({"current_page": 0}, "'current_page' must be a positive integer"),
+        ({"page_size": 0}, "'page_size' must be a positive integer"),
+        (
+            {"current_page": 11, "page_size": 100},
+            "'current_page' * 'page_size' must be at most 1000",
+        ),
+        (
+            {"sort": [{"visitors": "desc"}]},
+            "'sort' isn't supported as results are merged by score",
+        ),
+    ],
+)
+def test_invalid_parameters(client, kwargs, message):
+    kwargs.setdefault("engines", list(SCORES))
+    with pytest.raises(ValueError) as e:
+        search_many(client, query="lake", **kwargs)
+    assert str(e.value) == message
+
+
+@pytest.mark.asyncio
+async def test_async_search_many():
+    client = AsyncAppSearch(node_class=AsyncEnginesNode, meta_header=False)
+    client.transport.node_pool.get().failing = {
+        "parks-mx": ConnectionTimeout("timed out")
+    }
+
+    result = await client.search_many(
+        engines=list(SCORES), query="lake", page_size=3, max_concurrency=2
+    )
+
+    assert ids(result) == ["parks-us-0", "parks-ca-0", "parks-ca-1"]
+    assert list(result.errors) == ["parks-mx"]
+    assert result.total_results == 7
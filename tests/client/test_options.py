@@ -52,6 +52,7 @@ def test_client_class_init_parameters(client_cls):
         "ca_certs",
         "client_cert",
         "client_key",
+        "concurrency_limiter",
         "connections_per_node",
         "dead_node_backoff_factor",
         "headers",
@@ -62,14 +63,36 @@ def test_client_class_init_parameters(client_cls):
         "max_retries",
         "meta_header",
         "node_class",
+        "rate_limiter",
+        "request_coalescer",
         "request_timeout",
+        "response_cache",
         "retry_on_status",
         "retry_on_timeout",
+        "search_batcher",
         "ssl_assert_fingerprint",
         "ssl_assert_hostname",
         "ssl_context",
         "ssl_show_warn",
         "ssl_version",
+        "suggestion_cache",
         "transport_class",
         "verify_certs",
     }
+
+
+@pytest.mark.parametrize("client_cls", [EnterpriseSearch, AppSearch, WorkplaceSearch])
+def test_client_connection_options(client_cls):
+    client = client_cls(
+        "https://localhost:3002",
+        connections_per_node=16,
+        http_compress=True,
+        verify_certs=False,
+        ssl_show_warn=False,
+        node_class=DummyNode,
+    )
+
+    node_config = client.transport.node_pool.get().config
+    assert node_config.connections_per_node == 16
+    assert node_config.http_compress is True
+    assert node_config.verify_certs is False
@@ -0,0 +1,132 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+
+from elastic_enterprise_search import AsyncWorkplaceSearch, WorkplaceSearch
+from elastic_enterprise_search.helpers import BulkItemError, bulk
+from tests.conftest import AsyncBulkDummyNode, BulkDummyNode
+
+
+def test_bulk_index_keeps_permissions():
+    client = WorkplaceSearch(node_class=BulkDummyNode, meta_header=False)
+    documents = [
+        {
+            "id": str(i),
+            "title": "Intranet page",
+            "_allow_permissions": ["staff"],
+            "_deny_permissions": ["contractors"],
+        }
+        for i in range(150)
+    ]
+
+    results = list(client.bulk_index(content_source_id="source", documents=documents))
+
+    assert [(r.offset, len(r.items), r.errors) for r in results] == [
+        (0, 100, []),
+        (100, 50, []),
+    ]
+    calls = client.transport.node_pool.get().calls
+    assert calls[0][0] == ("POST", "/api/ws/v1/sources/source/documents/bulk_create")
+    assert json.loads(calls[1][1]["body"]) == documents[100:]
+
+
+def test_bulk_delete():
+    client = WorkplaceSearch(node_class=BulkDummyNode, meta_header=False)
+
+    results = list(
+        client.bulk_delete(
+            content_source_id="source",
+            document_ids=(str(i) for i in range(250)),
+            max_concurrency=2,
+        )
+    )
+
+    assert sorted(r.offset for r in results) == [0, 100, 200]
+    assert all(item["success"] for r in results for item in r.items)
+    calls = client.transport.node_pool.get().calls
+    assert {call[0] for call in calls} == {
+        ("POST", "/api/ws/v1/sources/source/documents/bulk_destroy")
+    }
+
+
+def test_bulk_delete_unsuccessful():
+    class UnsuccessfulNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            data = json.loads(data)
+            data["results"][1]["success"] = False
+            return meta, json.dumps(data).encode()
+
+    client = WorkplaceSearch(node_class=UnsuccessfulNode, meta_header=False)
+
+    success, errors = bulk(
+        client, ["1", "2", "3"], content_source_id="source", op_type="delete"
+    )
+
+    assert success == 2
+    assert errors == [
+        BulkItemError(position=1, id="2", errors=["Operation wasn't successful"])
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_index():
+    client = AsyncWorkplaceSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    results = [
+        result
+        async for result in client.bulk_index(
+            content_source_id="source",
+            documents=[{"id": str(i)} for i in range(150)],
+            max_concurrency=2,
+        )
+    ]
+
+    assert sorted(r.offset for r in results) == [0, 100]
+    assert sum(len(r.items) for r in results) == 150
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        (
+            {},
+            "Exactly one of the 'engine_name' or 'content_source_id' parameters must be used",
+        ),
+        (
+            {"engine_name": "engine", "content_source_id": "source"},
+            "Exactly one of the 'engine_name' or 'content_source_id' parameters must be used",
+        ),
+        (
+            {"content_source_id": ""},
+            "Empty value passed for parameter 'content_source_id'",
+        ),
+        (
+            {"content_source_id": "source", "op_type": "update"},
+            "'op_type' must be one of ['delete', 'index'] when using 'content_source_id'",
+        ),
+    ],
+)
+def test_bulk_invalid_target(kwargs, message):
+    client = WorkplaceSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        bulk(client, [{"id": "1"}], **kwargs)
+    assert str(e.value) == message
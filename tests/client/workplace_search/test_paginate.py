@@ -0,0 +1,32 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+from elastic_enterprise_search import WorkplaceSearch
+from tests.conftest import PagedDummyNode
+
+
+def test_iter_external_identities():
+    client = WorkplaceSearch(node_class=PagedDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    node.items = [{"user": str(i)} for i in range(55)]
+
+    results = list(client.iter_external_identities(content_source_id="source"))
+
+    assert len(results) == 55
+    assert node.calls[-1][0][1] == (
+        "/api/ws/v1/sources/source/external_identities?page[current]=3"
+    )
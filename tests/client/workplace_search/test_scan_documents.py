@@ -0,0 +1,150 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import io
+import json
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders
+
+from elastic_enterprise_search import AsyncWorkplaceSearch, WorkplaceSearch
+from tests.conftest import DummyNode, NodeResponse
+
+
+class CursorNode(DummyNode):
+    """Lists 'documents' with the cursor of the next page in 'meta.cursor.next'"""
+
+    documents = ()
+    page_cursor = False
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        request = json.loads(body)
+        start = int(request.get("cursor") or 0)
+        end = start + request["page"]["size"]
+        next_cursor = str(end) if end < len(self.documents) else None
+        meta = {"page": {"size": request["page"]["size"]}, "warnings": []}
+        if self.page_cursor:
+            meta["page"]["next_cursor"] = next_cursor
+        else:
+            meta["cursor"] = {"current": request.get("cursor"), "next": next_cursor}
+        resp_meta = ApiResponseMeta(
+            status=200,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        data = {"meta": meta, "results": list(self.documents[start:end])}
+        return resp_meta, json.dumps(data).encode()
+
+
+class AsyncCursorNode(CursorNode):
+    async def perform_request(self, *args, **kwargs):
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+def cursor_client(client_class=WorkplaceSearch, node_class=CursorNode, count=25_000):
+    client = client_class(node_class=node_class, meta_header=False)
+    client.transport.node_pool.get().documents = [
+        {"id": f"doc-{i}", "title": f"Park {i}"} for i in range(count)
+    ]
+    return client
+
+
+def request_bodies(client):
+    return [
+        json.loads(call[1]["body"]) for call in client.transport.node_pool.get().calls
+    ]
+
+
+@pytest.mark.parametrize("page_cursor", [False, True])
+def test_scan_follows_cursor_past_offset_limit(page_cursor):
+    client = cursor_client()
+    client.transport.node_pool.get().page_cursor = page_cursor
+
+    ids = [
+        document["id"]
+        for document in client.scan_documents(
+            content_source_id="source", filters={"title": "Park"}, page_size=1000
+        )
+    ]
+
+    assert ids == [f"doc-{i}" for i in range(25_000)]
+    bodies = request_bodies(client)
+    assert len(bodies) == 25
+    assert bodies[0] == {"filters": {"title": "Park"}, "page": {"size": 1000}}
+    assert bodies[-1]["cursor"] == "24000"
+
+
+def test_scan_is_lazy():
+    client = cursor_client()
+
+    documents = client.scan_documents(content_source_id="source")
+    assert request_bodies(client) == []
+    for _ in range(101):
+        next(documents)
+    assert len(request_bodies(client)) == 2
+
+
+def test_scan_empty_source():
+    client = cursor_client(count=0)
+
+    assert list(client.scan_documents(content_source_id="source")) == []
+    assert len(request_bodies(client)) == 1
+
+
+def test_scan_writes_jsonl_sink(tmp_path):
+    client = cursor_client(count=250)
+    path = tmp_path / "export.jsonl"
+    path.write_text("previous export\n")
+
+    documents = list(client.scan_documents(content_source_id="source", sink=path))
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == documents
+
+    # File objects are written to but left open.
+    sink = io.BytesIO()
+    list(client.scan_documents(content_source_id="source", sink=sink))
+    assert sink.getvalue() == path.read_bytes()
+
+
+def test_scan_invalid_page_size():
+    client = cursor_client()
+    with pytest.raises(ValueError) as e:
+        list(client.scan_documents(content_source_id="source", page_size=0))
+    assert str(e.value) == "'page_size' must be a positive integer"
+
+
+@pytest.mark.asyncio
+async def test_async_scan_documents(tmp_path):
+    client = cursor_client(AsyncWorkplaceSearch, AsyncCursorNode, count=350)
+    path = tmp_path / "export.jsonl"
+
+    ids = [
+        document["id"]
+        async for document in client.scan_documents(
+            content_source_id="source", sink=str(path)
+        )
+    ]
+
+    assert ids == [f"doc-{i}" for i in range(350)]
+    assert len(request_bodies(client)) == 4
+    assert len(path.read_text().splitlines()) == 350
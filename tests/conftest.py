@@ -15,8 +15,13 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import asyncio
+import json
 import os
+import threading
+from collections import namedtuple
 from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
 import urllib3
@@ -98,3 +103,249 @@ class DummyNode(BaseNode):
             node=self.config,
         )
         return meta, self.resp_data
+
+
+class BulkDummyNode(DummyNode):
+    """Responds to bulk document requests with one result per document
+    in the same format as the App Search and Workplace Search APIs.
+    """
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        if self.exception:
+            raise self.exception
+        meta = ApiResponseMeta(
+            status=200,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        items = []
+        for doc in json.loads(body):
+            doc_id = doc["id"] if isinstance(doc, dict) else doc
+            if target.endswith("/bulk_destroy"):
+                items.append({"id": doc_id, "success": True})
+            elif method == "DELETE":
+                items.append({"id": doc_id, "deleted": True})
+            else:
+                items.append({"id": doc_id, "errors": []})
+        if target.startswith("/api/ws/"):
+            items = {"results": items}
+        return meta, json.dumps(items).encode()
+
+
+# Async nodes return the (meta, body) pair as a named tuple
+NodeResponse = namedtuple("NodeResponse", ["meta", "body"])
+
+
+class AsyncBulkDummyNode(BulkDummyNode):
+    delay = 0.0
+
+    async def perform_request(self, *args, **kwargs):
+        await asyncio.sleep(self.delay)
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+class EngineDummyNode(DummyNode):
+    """In-memory App Search engine supporting searches filtered by
+    field values, deleting and updating documents. Deleted and updated documents
+    are returned unchanged by the following 'stale_searches' searches to mimic
+    the engine's refresh interval.
+    """
+
+    stale_searches = 1
+
+    def __init__(self, node_config, **kwargs):
+        super().__init__(node_config, **kwargs)
+        self.documents = {}
+        self.undeletable = set()
+        self._stale = {}
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        meta = ApiResponseMeta(
+            status=200,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        body = json.loads(body)
+        if target.endswith("/search"):
+            data = self._search(body)
+        elif method == "DELETE":
+            data = [self._delete(doc_id) for doc_id in body]
+        else:
+            data = [self._update(doc) for doc in body]
+        return meta, json.dumps(data).encode()
+
+    def _search(self, body):
+        filters = body.get("filters", {})
+        visible = dict(self.documents, **{k: v[0] for k, v in self._stale.items()})
+        self._stale = {k: (v[0], v[1] - 1) for k, v in self._stale.items() if v[1] > 1}
+        matches = [
+            doc_id
+            for doc_id, doc in sorted(visible.items())
+            if self._matches(doc, filters)
+        ]
+        size, current = body["page"]["size"], body["page"]["current"]
+        page = matches[(current - 1) * size : current * size]
+        return {
+            "meta": {
+                "page": {
+                    "current": current,
+                    "size": size,
+                    "total_results": len(matches),
+                    "total_pages": -(-len(matches) // size),
+                }
+            },
+            "results": [{"id": {"raw": doc_id}} for doc_id in page],
+        }
+
+    def _matches(self, doc, filters):
+        def as_list(value):
+            return value if isinstance(value, list) else [value]
+
+        for key, value in filters.items():
+            if key == "all":
+                matched = all(self._matches(doc, f) for f in as_list(value))
+            elif key == "any":
+                matched = any(self._matches(doc, f) for f in as_list(value))
+            elif key == "none":
+                matched = not any(self._matches(doc, f) for f in as_list(value))
+            else:
+                matched = any(v in as_list(doc.get(key)) for v in as_list(value))
+            if not matched:
+                return False
+        return True
+
+    def _delete(self, doc_id):
+        if doc_id in self.undeletable:
+            return {"id": doc_id, "errors": ["Internal error"]}
+        doc = self.documents.pop(doc_id, None)
+        if doc is not None:
+            self._stale[doc_id] = (doc, self.stale_searches)
+        return {"id": doc_id, "deleted": doc is not None}
+
+    def _update(self, patch):
+        doc = self.documents.get(patch["id"])
+        if doc is None:
+            return {"id": patch["id"], "errors": ["Document not found"]}
+        self._stale.setdefault(patch["id"], (dict(doc), self.stale_searches))
+        doc.update(patch)
+        return {"id": patch["id"], "errors": []}
+
+
+class AsyncEngineDummyNode(EngineDummyNode):
+    async def perform_request(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+class PagedDummyNode(DummyNode):
+    """Responds to paged list requests with the page of 'items'
+    selected by the 'page[current]' and 'page[size]' parameters.
+    """
+
+    items = ()
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        query = parse_qs(urlsplit(target).query)
+        current = int(query.get("page[current]", ["1"])[0])
+        size = int(query.get("page[size]", ["25"])[0])
+        page = {
+            "current": current,
+            "size": size,
+            "total_pages": max(1, -(-len(self.items) // size)),
+            "total_results": len(self.items),
+        }
+        body = {
+            "meta": {"page": page},
+            "results": list(self.items[(current - 1) * size : current * size]),
+        }
+        meta = ApiResponseMeta(
+            status=200,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, json.dumps(body).encode()
+
+
+class AsyncPagedDummyNode(PagedDummyNode):
+    async def perform_request(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+def java_hash(value):
+    """String.hashCode() as computed by the Painless slicing script"""
+    h = 0
+    for c in value:
+        h = (31 * h + ord(c)) & 0xFFFFFFFF
+    return h - (1 << 32) if h >= 1 << 31 else h
+
+
+class SearchAfterDummyNode(DummyNode):
+    """Responds to Elasticsearch search requests with the page of 'documents'
+    sorted by ID after 'search_after', within the slice of the script filter.
+    """
+
+    documents = ()
+    fail_slice = None
+    lock = threading.Lock()
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        with self.lock:
+            self.calls.append(((method, target), dict(body=body, **kwargs)))
+        request = json.loads(body)
+        assert request["sort"] == [{"id": "asc"}]
+        assert request["track_total_hits"] is False
+        documents = sorted(self.documents, key=lambda doc: doc["id"])
+        status, data = 200, None
+        query = request["query"]
+        if "bool" in query:
+            params = query["bool"]["filter"][1]["script"]["script"]["params"]
+            if params["slice"] == self.fail_slice:
+                status, data = 400, {"errors": ["Invalid query"]}
+            documents = [
+                doc
+                for doc in documents
+                if java_hash(doc[params["field"]]) % params["slices"] == params["slice"]
+            ]
+        if "search_after" in request:
+            documents = [
+                doc for doc in documents if doc["id"] > request["search_after"][0]
+            ]
+        hits = [
+            {"_id": doc["id"], "_source": doc, "sort": [doc["id"]]}
+            for doc in documents[: request["size"]]
+        ]
+        meta = ApiResponseMeta(
+            status=status,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, json.dumps(data or {"hits": {"hits": hits}}).encode()
+
+
+class AsyncSearchAfterDummyNode(SearchAfterDummyNode):
+    async def perform_request(self, *args, **kwargs):
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
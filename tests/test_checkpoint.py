@@ -0,0 +1,163 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+from elastic_transport import ConnectionError
+
+from elastic_enterprise_search import AppSearch, AsyncAppSearch, WorkplaceSearch
+from elastic_enterprise_search._checkpoint import _Checkpointer
+from elastic_enterprise_search._helpers import _bulk_target
+from elastic_enterprise_search.helpers import (
+    FileCheckpointStore,
+    SQLiteCheckpointStore,
+    async_streaming_bulk,
+    parallel_bulk,
+    streaming_bulk,
+)
+from tests.conftest import AsyncBulkDummyNode, BulkDummyNode
+
+KEY = "POST /api/as/v1/engines/parks/documents"
+
+
+@pytest.fixture(params=["checkpoints.json", "checkpoints.db"])
+def store(request, tmp_path):
+    path = tmp_path / request.param
+    if request.param.endswith(".db"):
+        return lambda: SQLiteCheckpointStore(path)
+    return lambda: FileCheckpointStore(path)
+
+
+def test_store(store):
+    checkpoints = store()
+    assert checkpoints.get(KEY) is None
+
+    checkpoints.set(KEY, 100)
+    checkpoints.set("other", 5)
+    checkpoints.set(KEY, 200)
+
+    # Checkpoints survive the process which stored them.
+    checkpoints = store()
+    assert checkpoints.get(KEY) == 200
+    checkpoints.delete(KEY)
+    checkpoints.delete(KEY)
+    assert store().get(KEY) is None
+    assert store().get("other") == 5
+
+
+def test_checkpointer_advances_over_contiguous_chunks(tmp_path):
+    checkpoints = FileCheckpointStore(tmp_path / "checkpoints.json")
+    checkpointer = _Checkpointer(checkpoints, KEY)
+
+    checkpointer.acknowledge(100, 100)
+    assert checkpoints.get(KEY) is None
+    checkpointer.acknowledge(300, 50)
+    checkpointer.acknowledge(0, 100)
+    assert checkpoints.get(KEY) == 200
+    checkpointer.acknowledge(200, 100)
+    assert checkpoints.get(KEY) == 350
+
+    checkpointer.finish()
+    assert checkpoints.get(KEY) is None
+
+
+class FailingNode(BulkDummyNode):
+    """Fails every request after the first 'fail_after' requests"""
+
+    fail_after = None
+
+    def perform_request(self, *args, **kwargs):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise ConnectionError("Connection refused")
+        return super().perform_request(*args, **kwargs)
+
+
+def sent_ids(calls):
+    return [doc["id"] for call in calls for doc in json.loads(call[1]["body"])]
+
+
+@pytest.mark.parametrize("helper", [streaming_bulk, parallel_bulk])
+def test_resume_after_interruption(helper, store):
+    documents = [{"id": str(i)} for i in range(500)]
+    client = AppSearch(node_class=FailingNode, meta_header=False, max_retries=0)
+    node = client.transport.node_pool.get()
+    node.fail_after = 2
+
+    with pytest.raises(ConnectionError):
+        list(helper(client, documents, engine_name="parks", checkpoint=store()))
+    assert store().get(KEY) == 200
+
+    node.fail_after = None
+    node.calls.clear()
+    results = list(helper(client, documents, engine_name="parks", checkpoint=store()))
+
+    assert [r.offset for r in results] == [200, 300, 400]
+    assert sent_ids(node.calls) == [str(i) for i in range(200, 500)]
+    # The checkpoint is cleared once every document was acknowledged.
+    assert store().get(KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_async_resume_after_interruption(tmp_path):
+    checkpoints = SQLiteCheckpointStore(tmp_path / "checkpoints.db")
+    checkpoints.set(KEY, 300)
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+
+    results = [
+        result
+        async for result in async_streaming_bulk(
+            client,
+            [{"id": str(i)} for i in range(500)],
+            engine_name="parks",
+            max_concurrency=2,
+            checkpoint=checkpoints,
+        )
+    ]
+
+    assert sorted(r.offset for r in results) == [300, 400]
+    assert sent_ids(client.transport.node_pool.get().calls) == [
+        str(i) for i in range(300, 500)
+    ]
+    assert checkpoints.get(KEY) is None
+
+
+@pytest.mark.parametrize(
+    ["client_class", "target"],
+    [
+        (AppSearch, {"engine_name": "parks"}),
+        (WorkplaceSearch, {"content_source_id": "src"}),
+    ],
+)
+@pytest.mark.parametrize(
+    ["op_type", "documents"],
+    [("index", "documents"), ("delete", "document_ids")],
+)
+def test_client_bulk_methods_resume(tmp_path, client_class, target, op_type, documents):
+    method, path = _bulk_target(
+        op_type, target.get("engine_name"), target.get("content_source_id")
+    )
+    checkpoints = FileCheckpointStore(tmp_path / "checkpoints.json")
+    checkpoints.set(f"{method} {path}", 100)
+    client = client_class(node_class=BulkDummyNode, meta_header=False)
+    bulk = getattr(client, f"bulk_{op_type}")
+
+    inputs = [{"id": str(i)} if op_type == "index" else str(i) for i in range(250)]
+    results = list(bulk(**target, **{documents: inputs}, checkpoint=checkpoints))
+
+    assert [r.offset for r in results] == [100, 200]
+    assert checkpoints.get(f"{method} {path}") is None
@@ -0,0 +1,248 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    EnterpriseSearch,
+    InternalServerError,
+    NotFoundError,
+    RequestCoalescer,
+)
+from tests.conftest import DummyNode, NodeResponse
+
+
+class GatedNode(DummyNode):
+    """Holds requests until 'gate' is set, responding with the request's number"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.lock = threading.Lock()
+
+    def perform_request(self, *args, **kwargs):
+        with self.lock:
+            meta, _ = super().perform_request(*args, **kwargs)
+            number = len(self.calls)
+        self.entered.set()
+        self.gate.wait(5)
+        meta.headers["content-type"] = "application/json"
+        return meta, b'{"request":%d}' % number
+
+
+class AsyncGatedNode(DummyNode):
+    delay = 0.01
+
+    async def perform_request(self, *args, **kwargs):
+        meta, _ = super().perform_request(*args, **kwargs)
+        number = len(self.calls)
+        await asyncio.sleep(self.delay)
+        meta.headers["content-type"] = "application/json"
+        return NodeResponse(meta, b'{"request":%d}' % number)
+
+    async def close(self):
+        pass
+
+
+def coalescing_client(client_class=AppSearch, node_class=GatedNode):
+    return client_class(
+        node_class=node_class,
+        meta_header=False,
+        max_retries=0,
+        request_coalescer=RequestCoalescer(),
+    )
+
+
+def concurrently(node, requests):
+    """Sends the first request, then the others while it's in flight"""
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        futures = [executor.submit(requests[0])]
+        node.entered.wait(5)
+        futures.extend(executor.submit(request) for request in requests[1:])
+        time.sleep(0.1)
+        node.gate.set()
+        return [future.result() for future in futures]
+
+
+def test_identical_requests_share_a_response():
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+
+    responses = concurrently(
+        node,
+        [
+            lambda: client.search(engine_name="parks", query="lake", page_size=10),
+            lambda: client.search(engine_name="parks", page_size=10, query="lake"),
+            lambda: client.search(engine_name="parks", query="lake", page_size=10),
+        ],
+    )
+
+    assert len(node.calls) == 1
+    assert [resp.body for resp in responses] == [{"request": 1}] * 3
+    assert client._request_coalescer.coalesced == 2
+    assert client._request_coalescer.in_flight == 0
+
+
+def test_get_requests_are_coalesced():
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+
+    concurrently(node, [lambda: client.get_engine(engine_name="parks")] * 4)
+
+    assert len(node.calls) == 1
+
+
+def test_different_requests_arent_coalesced():
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+
+    responses = concurrently(
+        node,
+        [
+            lambda: client.search(engine_name="parks", query="lake"),
+            lambda: client.search(engine_name="parks", query="river"),
+            lambda: client.options(bearer_auth="other-key").search(
+                engine_name="parks", query="lake"
+            ),
+            lambda: client.index_documents(
+                engine_name="parks", documents=[{"id": "1"}]
+            ),
+            lambda: client.index_documents(
+                engine_name="parks", documents=[{"id": "1"}]
+            ),
+        ],
+    )
+
+    assert len(node.calls) == 5
+    assert sorted(resp.body["request"] for resp in responses) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("ignoring_first", [True, False])
+def test_requests_ignoring_statuses_arent_coalesced(ignoring_first):
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+    node.resp_status = 404
+
+    def search():
+        with pytest.raises(NotFoundError):
+            client.search(engine_name="parks", query="lake")
+
+    def search_ignoring_404():
+        resp = client.options(ignore_status=404).search(
+            engine_name="parks", query="lake"
+        )
+        assert resp.meta.status == 404
+
+    requests = (
+        [search_ignoring_404, search]
+        if ignoring_first
+        else [search, search_ignoring_404]
+    )
+    concurrently(node, requests)
+
+    assert len(node.calls) == 2
+
+
+@pytest.mark.parametrize("options", [{"request_timeout": 1}, {"max_retries": 3}])
+def test_requests_with_different_options_arent_coalesced(options):
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+
+    responses = concurrently(
+        node,
+        [
+            lambda: client.search(engine_name="parks", query="lake"),
+            lambda: client.options(**options).search(engine_name="parks", query="lake"),
+        ],
+    )
+
+    assert len(node.calls) == 2
+    assert sorted(resp.body["request"] for resp in responses) == [1, 2]
+
+
+def test_errors_are_shared():
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+    node.resp_status = 500
+
+    def search():
+        with pytest.raises(InternalServerError):
+            client.search(engine_name="parks", query="lake")
+
+    concurrently(node, [search] * 3)
+
+    assert len(node.calls) == 1
+
+
+def test_completed_requests_arent_reused():
+    client = coalescing_client()
+    node = client.transport.node_pool.get()
+    node.gate.set()
+
+    for _ in range(2):
+        client.search(engine_name="parks", query="lake")
+
+    assert len(node.calls) == 2
+
+
+def test_options_share_coalescer():
+    coalescer = RequestCoalescer()
+    client = EnterpriseSearch(node_class=DummyNode, request_coalescer=coalescer)
+
+    assert client.app_search._request_coalescer is coalescer
+    assert client.workplace_search._request_coalescer is coalescer
+    assert client.options(request_timeout=1)._request_coalescer is coalescer
+    assert client.options(request_coalescer=None)._request_coalescer is None
+
+
+@pytest.mark.asyncio
+async def test_async_identical_requests_share_a_response():
+    client = coalescing_client(AsyncAppSearch, AsyncGatedNode)
+    node = client.transport.node_pool.get()
+
+    responses = await asyncio.gather(
+        *(client.search(engine_name="parks", query="lake") for _ in range(10)),
+        client.search(engine_name="parks", query="river"),
+    )
+
+    assert len(node.calls) == 2
+    assert [resp.body["request"] for resp in responses] == [1] * 10 + [2]
+    assert client._request_coalescer.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_async_cancelled_leader_leaves_request_to_followers():
+    client = coalescing_client(AsyncAppSearch, AsyncGatedNode)
+    node = client.transport.node_pool.get()
+
+    leader = asyncio.ensure_future(client.search(engine_name="parks", query="lake"))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(client.search(engine_name="parks", query="lake"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    resp = await follower
+    assert resp.body == {"request": 2}
+    assert len(node.calls) == 2
@@ -0,0 +1,219 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from elastic_enterprise_search import (
+    AdaptiveConcurrencyLimiter,
+    AppSearch,
+    AsyncAppSearch,
+    EnterpriseSearch,
+    ServiceUnavailableError,
+)
+from elastic_enterprise_search.helpers import parallel_bulk
+from tests.conftest import BulkDummyNode, DummyNode, NodeResponse
+
+
+def fill(limiter):
+    for _ in range(limiter.limit):
+        limiter.acquire()
+
+
+def test_limit_increases_additively():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=6)
+
+    # One more request is allowed per round of 'limit' fast responses.
+    for _ in range(2):
+        fill(limiter)
+        for _ in range(limiter.limit):
+            limiter.release(0.01)
+    assert limiter.limit == 5
+
+    for _ in range(10):
+        fill(limiter)
+        for _ in range(limiter.limit):
+            limiter.release(0.01)
+    assert limiter.limit == 6
+
+
+def test_limit_doesnt_increase_while_unused():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(0.01)
+
+    assert limiter.limit == 8
+    assert limiter.in_flight == 0
+
+
+def test_limit_decreases_multiplicatively_once_per_round_trip():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, min_limit=3)
+    fill(limiter)
+
+    limiter.release(1.0, overloaded=True)
+    assert limiter.limit == 8
+    # Responses of requests sent before the decrease don't decrease it again.
+    limiter.release(1.0, overloaded=True)
+    limiter.release(1.0)
+    assert limiter.limit == 8
+
+    limiter._last_decrease -= 1.0
+    limiter.release(1.0, overloaded=True)
+    assert limiter.limit == 4
+    limiter._last_decrease -= 1.0
+    limiter.release(1.0, overloaded=True)
+    assert limiter.limit == 3
+
+
+def test_slow_responses_decrease_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_tolerance=3.0)
+    fill(limiter)
+
+    limiter.release(0.1)
+    limiter.release(0.25)
+    assert limiter.limit == 10
+    limiter.release(0.5)
+    assert limiter.limit == 5
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"min_limit": 0}, "'min_limit' must be a positive integer"),
+        (
+            {"min_limit": 4, "max_limit": 2},
+            "'max_limit' must be an integer of at least 'min_limit'",
+        ),
+        (
+            {"initial_limit": 100},
+            "'initial_limit' must be an integer between 'min_limit' and 'max_limit'",
+        ),
+        ({"latency_tolerance": 1}, "'latency_tolerance' must be greater than 1"),
+        ({"backoff_ratio": 1.5}, "'backoff_ratio' must be between 0 and 1"),
+    ],
+)
+def test_invalid_parameters(kwargs, message):
+    with pytest.raises(ValueError) as e:
+        AdaptiveConcurrencyLimiter(**kwargs)
+    assert str(e.value) == message
+
+
+class ConcurrencyNode(BulkDummyNode):
+    """Records the highest number of requests in flight at once"""
+
+    delay = 0.01
+    lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = self.max_in_flight = 0
+
+    def perform_request(self, *args, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return super().perform_request(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_client_requests_wait_for_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+    client = AppSearch(
+        node_class=ConcurrencyNode, meta_header=False, concurrency_limiter=limiter
+    )
+
+    results = list(
+        parallel_bulk(
+            client,
+            [{"id": str(i)} for i in range(100)],
+            engine_name="parks",
+            chunk_size=10,
+            thread_count=8,
+        )
+    )
+
+    assert sum(len(result.items) for result in results) == 100
+    assert client.transport.node_pool.get().max_in_flight == 2
+    assert limiter.in_flight == 0
+
+
+def test_overloaded_responses_decrease_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    client = AppSearch(
+        node_class=DummyNode,
+        meta_header=False,
+        max_retries=0,
+        concurrency_limiter=limiter,
+    )
+    client.transport.node_pool.get().resp_status = 503
+
+    with pytest.raises(ServiceUnavailableError):
+        client.get_engine(engine_name="parks")
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_options_share_limiter():
+    limiter = AdaptiveConcurrencyLimiter()
+    client = EnterpriseSearch(node_class=DummyNode, concurrency_limiter=limiter)
+
+    assert client.app_search._concurrency_limiter is limiter
+    assert client.workplace_search._concurrency_limiter is limiter
+    assert client.options(request_timeout=1)._concurrency_limiter is limiter
+    assert client.options(concurrency_limiter=None)._concurrency_limiter is None
+
+
+@pytest.mark.asyncio
+async def test_async_client_requests_wait_for_limit():
+    class Node(DummyNode):
+        in_flight = max_in_flight = 0
+
+        async def perform_request(self, *args, **kwargs):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                return NodeResponse(*super().perform_request(*args, **kwargs))
+            finally:
+                self.in_flight -= 1
+
+        async def close(self):
+            pass
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=3)
+    client = AsyncAppSearch(
+        node_class=Node, meta_header=False, concurrency_limiter=limiter
+    )
+    node = client.transport.node_pool.get()
+
+    await asyncio.gather(
+        *(client.get_engine(engine_name=f"engine-{i}") for i in range(20))
+    )
+
+    assert len(node.calls) == 20
+    assert node.max_in_flight == 3
+    assert limiter.in_flight == 0
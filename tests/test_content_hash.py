@@ -0,0 +1,317 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    BadRequestError,
+    WorkplaceSearch,
+)
+from elastic_enterprise_search.helpers import (
+    FileCheckpointStore,
+    SQLiteContentHashStore,
+    async_bulk,
+    async_streaming_bulk,
+    bulk,
+    parallel_bulk,
+    streaming_bulk,
+)
+from tests.conftest import AsyncBulkDummyNode, BulkDummyNode, DummyNode
+
+
+class FlakyNode(BulkDummyNode):
+    """Fails indexing the documents with an ID in 'failing'"""
+
+    failing = ()
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        meta, data = super().perform_request(method, target, body=body, **kwargs)
+        items = json.loads(data)
+        for item in items:
+            if item["id"] in self.failing:
+                item["errors"] = ["Invalid field value"]
+        return meta, json.dumps(items).encode()
+
+
+def sent_ids(calls):
+    return [doc["id"] for call in calls for doc in json.loads(call[1]["body"])]
+
+
+@pytest.fixture
+def hash_store(tmp_path):
+    return SQLiteContentHashStore(tmp_path / "hashes.db")
+
+
+def documents(count=250, **fields):
+    return [dict({"id": str(i), "title": f"Park {i}"}, **fields) for i in range(count)]
+
+
+@pytest.mark.parametrize("helper", [streaming_bulk, parallel_bulk])
+def test_unchanged_documents_are_skipped(helper, hash_store):
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+
+    list(helper(client, documents(), engine_name="parks", hash_store=hash_store))
+    assert len(node.calls) == 3
+
+    node.calls.clear()
+    results = list(
+        helper(client, documents(), engine_name="parks", hash_store=hash_store)
+    )
+    assert node.calls == []
+    assert [(r.offset, r.items, r.skipped) for r in results] == [
+        (0, [], 100),
+        (100, [], 100),
+        (200, [], 50),
+    ]
+
+    # Hashes are kept per engine.
+    list(helper(client, documents(), engine_name="other", hash_store=hash_store))
+    assert len(node.calls) == 3
+
+
+def test_bulk_returns_skipped(hash_store):
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    bulk(client, documents(), engine_name="parks", hash_store=hash_store)
+
+    assert bulk(
+        client,
+        documents(),
+        engine_name="parks",
+        hash_store=hash_store,
+        return_skipped=True,
+    ) == (0, [], 250)
+    assert bulk(client, documents(), engine_name="parks", hash_store=hash_store) == (
+        0,
+        [],
+    )
+
+
+def test_changed_documents_are_sent(hash_store):
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    list(
+        streaming_bulk(client, documents(), engine_name="parks", hash_store=hash_store)
+    )
+
+    node.calls.clear()
+    changed = documents()
+    changed[10]["title"] = "Renamed"
+    changed[150]["visitors"] = 10
+    changed.append({"id": "new", "title": "New park"})
+    results = list(
+        streaming_bulk(client, changed, engine_name="parks", hash_store=hash_store)
+    )
+
+    assert sent_ids(node.calls) == ["10", "150", "new"]
+    # Chunks are filled with changed documents, covering the skipped ones.
+    assert [(r.offset, len(r.items), r.skipped) for r in results] == [(0, 3, 248)]
+
+
+def test_failed_documents_are_not_recorded(hash_store):
+    client = AppSearch(node_class=FlakyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    node.failing = {"3"}
+    results = list(
+        streaming_bulk(
+            client, documents(10), engine_name="parks", hash_store=hash_store
+        )
+    )
+    assert [e.position for e in results[0].errors] == [3]
+
+    node.failing = ()
+    node.calls.clear()
+    list(
+        streaming_bulk(
+            client, documents(10), engine_name="parks", hash_store=hash_store
+        )
+    )
+    assert sent_ids(node.calls) == ["3"]
+
+
+def test_delete_and_update_remove_hashes(hash_store):
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    list(
+        streaming_bulk(
+            client, documents(10), engine_name="parks", hash_store=hash_store
+        )
+    )
+
+    list(
+        streaming_bulk(
+            client,
+            ["1", "2"],
+            engine_name="parks",
+            op_type="delete",
+            hash_store=hash_store,
+        )
+    )
+    list(
+        streaming_bulk(
+            client,
+            [{"id": "5", "visitors": 10}],
+            engine_name="parks",
+            op_type="update",
+            hash_store=hash_store,
+        )
+    )
+
+    node.calls.clear()
+    list(
+        streaming_bulk(
+            client, documents(10), engine_name="parks", hash_store=hash_store
+        )
+    )
+    assert sent_ids(node.calls) == ["1", "2", "5"]
+
+
+@pytest.mark.parametrize(
+    ["client_class", "target"],
+    [
+        (AppSearch, {"engine_name": "parks"}),
+        (WorkplaceSearch, {"content_source_id": "source"}),
+    ],
+)
+def test_client_bulk_methods(hash_store, client_class, target):
+    client = client_class(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    list(client.bulk_index(**target, documents=documents(10), hash_store=hash_store))
+    list(client.bulk_delete(**target, document_ids=["1"], hash_store=hash_store))
+
+    node.calls.clear()
+    results = list(
+        client.bulk_index(**target, documents=documents(10), hash_store=hash_store)
+    )
+    assert sent_ids(node.calls) == ["1"]
+    assert results[0].skipped == 9
+
+
+def test_encoded_documents(hash_store):
+    client = WorkplaceSearch(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    lines = [json.dumps(doc).encode() for doc in documents(5)]
+    list(
+        streaming_bulk(client, lines, content_source_id="source", hash_store=hash_store)
+    )
+
+    node.calls.clear()
+    lines[4] = json.dumps({"id": "4", "title": "Renamed"}).encode()
+    results = list(
+        streaming_bulk(client, lines, content_source_id="source", hash_store=hash_store)
+    )
+    assert sent_ids(node.calls) == ["4"]
+    assert results[0].skipped == 4
+
+
+@pytest.mark.parametrize("use_hash_store", [True, False])
+def test_malformed_encoded_documents_are_sent(hash_store, use_hash_store):
+    client = AppSearch(node_class=DummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    node.resp_status = 400
+    node.resp_headers = {"content-type": "application/json"}
+    node.resp_data = b'{"errors":["Invalid JSON"]}'
+    lines = [b'{"id": "0"}', b'{"id": "1", "title": ']
+
+    with pytest.raises(BadRequestError):
+        list(
+            streaming_bulk(
+                client,
+                lines,
+                engine_name="parks",
+                hash_store=hash_store if use_hash_store else None,
+            )
+        )
+    body = node.calls[0][1]["body"]
+    assert body == b'[{"id": "0"},{"id": "1", "title": ]'
+
+
+def test_skipped_documents_are_acknowledged(tmp_path, hash_store):
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    checkpoints = FileCheckpointStore(tmp_path / "checkpoints.json")
+    list(
+        streaming_bulk(
+            client, documents(150), engine_name="parks", hash_store=hash_store
+        )
+    )
+
+    node.calls.clear()
+    checkpoints.set("POST /api/as/v1/engines/parks/documents", 50)
+    results = list(
+        streaming_bulk(
+            client,
+            documents(),
+            engine_name="parks",
+            checkpoint=checkpoints,
+            hash_store=hash_store,
+        )
+    )
+
+    assert [(r.offset, len(r.items), r.skipped) for r in results] == [
+        (50, 0, 100),
+        (150, 100, 0),
+    ]
+    assert sent_ids(node.calls) == [str(i) for i in range(150, 250)]
+    assert checkpoints.get("POST /api/as/v1/engines/parks/documents") is None
+
+
+@pytest.mark.asyncio
+async def test_async_unchanged_documents_are_skipped(hash_store):
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+    node = client.transport.node_pool.get()
+    hash_store.update("engine:parks", [("0", "outdated")])
+
+    results = [
+        result
+        async for result in async_streaming_bulk(
+            client, documents(), engine_name="parks", hash_store=hash_store
+        )
+    ]
+    assert sum(len(r.items) for r in results) == 250
+
+    node.calls.clear()
+    results = [
+        result
+        async for result in async_streaming_bulk(
+            client,
+            documents(),
+            engine_name="parks",
+            max_concurrency=2,
+            hash_store=hash_store,
+        )
+    ]
+    assert node.calls == []
+    assert sum(r.skipped for r in results) == 250
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_returns_skipped(hash_store):
+    client = AsyncAppSearch(node_class=AsyncBulkDummyNode, meta_header=False)
+    await async_bulk(client, documents(10), engine_name="parks", hash_store=hash_store)
+
+    assert await async_bulk(
+        client,
+        documents(10, title="Renamed")[:5] + documents(10)[5:],
+        engine_name="parks",
+        hash_store=hash_store,
+        return_skipped=True,
+    ) == (5, [], 5)
@@ -0,0 +1,92 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import threading
+import time
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, ConnectionError
+from elastic_enterprise_search.helpers import parallel_bulk
+from tests.conftest import BulkDummyNode
+
+
+class SlowFirstChunkNode(BulkDummyNode):
+    def perform_request(self, method, target, body=None, **kwargs):
+        if body.startswith(b'[{"id":"0"}'):
+            time.sleep(0.1)
+        return super().perform_request(method, target, body=body, **kwargs)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_bulk(ordered):
+    client = AppSearch(node_class=SlowFirstChunkNode, meta_header=False)
+    documents = ({"id": str(i)} for i in range(95))
+
+    results = list(
+        parallel_bulk(
+            client,
+            documents,
+            engine_name="test",
+            chunk_size=10,
+            thread_count=3,
+            ordered=ordered,
+        )
+    )
+
+    offsets = [r.offset for r in results]
+    assert sorted(offsets) == list(range(0, 95, 10))
+    if ordered:
+        assert offsets == list(range(0, 95, 10))
+    else:
+        # The slow first chunk doesn't hold back the chunks behind it.
+        assert offsets[0] != 0
+    assert sum(len(r.items) for r in results) == 95
+
+
+def test_parallel_bulk_uses_threads():
+    thread_ids = set()
+
+    class ThreadRecordingNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            thread_ids.add(threading.get_ident())
+            time.sleep(0.01)
+            return super().perform_request(*args, **kwargs)
+
+    client = AppSearch(node_class=ThreadRecordingNode, meta_header=False)
+    documents = ({"id": str(i)} for i in range(100))
+    list(parallel_bulk(client, documents, engine_name="test", chunk_size=5))
+
+    assert threading.get_ident() not in thread_ids
+    assert 1 < len(thread_ids) <= 4
+
+
+def test_parallel_bulk_error_stops_iteration():
+    client = AppSearch(node_class=BulkDummyNode, meta_header=False, max_retries=0)
+    client.transport.node_pool.get().exception = ConnectionError("oops")
+
+    with pytest.raises(ConnectionError):
+        list(parallel_bulk(client, [{"id": "1"}], engine_name="test"))
+
+
+@pytest.mark.parametrize("thread_count", [0, None])
+def test_parallel_bulk_invalid_thread_count(thread_count):
+    client = AppSearch(node_class=BulkDummyNode)
+
+    with pytest.raises(ValueError) as e:
+        list(parallel_bulk(client, [], engine_name="test", thread_count=thread_count))
+    assert str(e.value) == "'thread_count' must be a positive integer"
@@ -0,0 +1,212 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+
+from elastic_enterprise_search import AppSearch, WorkplaceSearch, ingest
+from elastic_enterprise_search.helpers import SQLiteCheckpointStore
+from tests.conftest import BulkDummyNode
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    clients = []
+
+    def client_class(cls):
+        def factory(*args, **kwargs):
+            client = cls(*args, node_class=BulkDummyNode, meta_header=False, **kwargs)
+            clients.append(client)
+            return client
+
+        return factory
+
+    monkeypatch.setattr(ingest, "AppSearch", client_class(AppSearch))
+    monkeypatch.setattr(ingest, "WorkplaceSearch", client_class(WorkplaceSearch))
+    return clients
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "documents.jsonl"
+    with path.open("w") as f:
+        for i in range(250):
+            f.write(json.dumps({"id": str(i), "title": f"Park {i}"}) + "\n")
+            if i % 100 == 0:
+                f.write("\n")
+    return path
+
+
+def test_reader_skips_empty_lines(jsonl):
+    reader = ingest._LineReader(str(jsonl))
+
+    lines = list(reader)
+
+    assert len(lines) == 250
+    assert json.loads(lines[0]) == {"id": "0", "title": "Park 0"}
+    assert reader.offset == reader.size
+
+
+def test_reader_empty_file(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_bytes(b"")
+
+    assert list(ingest._LineReader(str(path))) == []
+
+
+def test_ingest_app_search(jsonl, clients, capsys):
+    exit_code = ingest.main(
+        [str(jsonl), "--engine", "parks", "--bearer-auth", "private-key"]
+    )
+
+    assert exit_code == 0
+    client = clients[0]
+    assert client._headers["authorization"] == "Bearer private-key"
+    calls = client.transport.node_pool.get().calls
+    assert [call[0] for call in calls] == [
+        ("POST", "/api/as/v1/engines/parks/documents")
+    ] * 3
+    assert json.loads(calls[2][1]["body"])[-1] == {"id": "249", "title": "Park 249"}
+
+    out = capsys.readouterr().out
+    assert "250 documents indexed, 0 failed, 0 unchanged, 100.0% of" in out
+    assert "docs/s" in out
+
+
+def test_ingest_workplace_search(jsonl, clients):
+    exit_code = ingest.main(
+        [str(jsonl), "--content-source", "source", "--chunk-size", "50"]
+    )
+
+    assert exit_code == 0
+    calls = clients[0].transport.node_pool.get().calls
+    assert len(calls) == 5
+    assert calls[0][0] == ("POST", "/api/ws/v1/sources/source/documents/bulk_create")
+
+
+def test_ingest_reports_failed_documents(jsonl, clients, monkeypatch, capsys):
+    class ErrorNode(BulkDummyNode):
+        def perform_request(self, *args, **kwargs):
+            meta, data = super().perform_request(*args, **kwargs)
+            items = json.loads(data)
+            items[0]["errors"] = ["Invalid field"]
+            return meta, json.dumps(items).encode()
+
+    monkeypatch.setattr(
+        ingest,
+        "AppSearch",
+        lambda *args, **kwargs: AppSearch(
+            *args, node_class=ErrorNode, meta_header=False, **kwargs
+        ),
+    )
+
+    exit_code = ingest.main([str(jsonl), "--engine", "parks"])
+
+    assert exit_code == 1
+    captured = capsys.readouterr()
+    assert "Document #100 (id='100') failed: Invalid field" in captured.err
+    assert "247 documents indexed, 3 failed" in captured.out
+
+
+def test_ingest_reports_invalid_lines(tmp_path, clients, capsys):
+    path = tmp_path / "documents.jsonl"
+    lines = [json.dumps({"id": str(i)}) for i in range(150)]
+    lines[10] = '{"id": "10", "title": '
+    lines[120] = '["not", "an", "object"]'
+    path.write_text("\n".join(lines) + "\n")
+
+    exit_code = ingest.main([str(path), "--engine", "parks"])
+
+    assert exit_code == 1
+    calls = clients[0].transport.node_pool.get().calls
+    sent = [doc["id"] for call in calls for doc in json.loads(call[1]["body"])]
+    assert len(sent) == 148
+    assert "10" not in sent and "120" not in sent
+    captured = capsys.readouterr()
+    assert "Line 11 failed: invalid JSON" in captured.err
+    assert "Line 121 failed: not a JSON object" in captured.err
+    assert "148 documents indexed, 2 failed" in captured.out
+
+
+def test_ingest_requires_target(jsonl, capsys):
+    with pytest.raises(SystemExit) as e:
+        ingest.main([str(jsonl)])
+    assert e.value.code == 2
+    assert "one of the arguments --engine --content-source is required" in (
+        capsys.readouterr().err
+    )
+
+
+def test_ingest_rejects_negative_max_retries(jsonl, capsys):
+    with pytest.raises(SystemExit) as e:
+        ingest.main([str(jsonl), "--engine", "parks", "--max-retries", "-1"])
+    assert e.value.code == 2
+    assert "must be a non-negative integer, got -1" in capsys.readouterr().err
+
+
+def test_ingest_resumes_from_checkpoint(jsonl, tmp_path, clients, capsys):
+    checkpoint = tmp_path / "checkpoint.db"
+    SQLiteCheckpointStore(checkpoint).set(
+        "POST /api/as/v1/engines/parks/documents", 200
+    )
+
+    exit_code = ingest.main(
+        [str(jsonl), "--engine", "parks", "--checkpoint", str(checkpoint)]
+    )
+
+    assert exit_code == 0
+    calls = clients[0].transport.node_pool.get().calls
+    assert len(calls) == 1
+    assert json.loads(calls[0][1]["body"])[0]["id"] == "200"
+    captured = capsys.readouterr()
+    assert "Resuming after 200 acknowledged documents" in captured.err
+    assert "50 documents indexed" in captured.out
+    assert (
+        SQLiteCheckpointStore(checkpoint).get("POST /api/as/v1/engines/parks/documents")
+        is None
+    )
+
+
+def test_ingest_skips_unchanged_documents(jsonl, tmp_path, clients, capsys):
+    hash_store = str(tmp_path / "hashes.db")
+    argv = [str(jsonl), "--engine", "parks", "--hash-store", hash_store]
+
+    assert ingest.main(argv) == 0
+    assert ingest.main(argv) == 0
+
+    assert len(clients[0].transport.node_pool.get().calls) == 3
+    assert clients[1].transport.node_pool.get().calls == []
+    assert "0 documents indexed, 0 failed, 250 unchanged" in capsys.readouterr().out
+
+
+def test_ingest_adaptive_concurrency(jsonl, clients, capsys):
+    exit_code = ingest.main(
+        [
+            str(jsonl),
+            "--engine",
+            "parks",
+            "--concurrency",
+            "8",
+            "--adaptive-concurrency",
+        ]
+    )
+
+    assert exit_code == 0
+    limiter = clients[0]._concurrency_limiter
+    assert limiter.max_limit == 8
+    assert "docs/s" in capsys.readouterr().out
@@ -0,0 +1,167 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import time
+
+import pytest
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    EnterpriseSearch,
+    RateLimit,
+    RateLimiter,
+    _rate_limit,
+)
+from tests.conftest import DummyNode, NodeResponse
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(_rate_limit.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_requests_per_second():
+    limiter = RateLimiter(default=RateLimit(requests_per_second=2))
+
+    assert limiter.reserve("/api/as/v1/engines") == 0
+    assert limiter.reserve("/api/as/v1/engines") == 0
+    assert limiter.reserve("/api/as/v1/engines") == pytest.approx(0.5, abs=0.01)
+    assert limiter.reserve("/api/as/v1/engines") == pytest.approx(1.0, abs=0.01)
+
+
+def test_bytes_per_second():
+    limiter = RateLimiter(default=RateLimit(bytes_per_second=1000, burst=2))
+
+    assert limiter.reserve("/", 1500) == 0
+    assert limiter.reserve("/", 1500) == pytest.approx(1.0, abs=0.01)
+    # Requests without a body aren't limited by bytes.
+    assert limiter.reserve("/") == 0
+
+
+def test_limits_by_engine_and_path():
+    limiter = RateLimiter(
+        engines={"parks": RateLimit(requests_per_second=1)},
+        paths={"/api/ws/v1/sources/": RateLimit(bytes_per_second=10)},
+        default=RateLimit(requests_per_second=100),
+    )
+
+    for path in (
+        "/api/as/v1/engines/parks",
+        "/api/as/v1/engines/parks/documents",
+        "/api/as/v0/engines/parks/elasticsearch/_search",
+    ):
+        assert limiter._matching_rules(path) == [limiter._rules[0]]
+    assert limiter._matching_rules("/api/ws/v1/sources/1/documents/bulk_create") == [
+        limiter._rules[1]
+    ]
+    for path in ("/api/as/v1/engines/parks-2/documents", "/api/ws/v1/search"):
+        assert limiter._matching_rules(path) == [limiter._default]
+
+    assert limiter.limits_bytes("/api/ws/v1/sources/1/documents/bulk_create")
+    assert not limiter.limits_bytes("/api/as/v1/engines/parks/documents")
+
+
+def test_requests_fit_in_every_matching_limit():
+    limiter = RateLimiter(
+        engines={"parks": RateLimit(requests_per_second=10)},
+        paths={"/api/as/v1/engines/parks/documents": RateLimit(requests_per_second=1)},
+    )
+
+    assert limiter.reserve("/api/as/v1/engines/parks/documents") == 0
+    assert limiter.reserve("/api/as/v1/engines/parks/documents") == pytest.approx(
+        1.0, abs=0.01
+    )
+    # Search requests only use the engine's limit.
+    assert limiter.reserve("/api/as/v1/engines/parks/search") == 0
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        (
+            {"default": RateLimit()},
+            "Rate limits must set 'requests_per_second' or 'bytes_per_second'",
+        ),
+        (
+            {"engines": {"parks": RateLimit(requests_per_second=0)}},
+            "Rates and burst of rate limits must be positive",
+        ),
+        (
+            {"paths": {"api/as": RateLimit(requests_per_second=1)}},
+            "Path prefix 'api/as' must start with '/'",
+        ),
+    ],
+)
+def test_invalid_limits(kwargs, message):
+    with pytest.raises(ValueError) as e:
+        RateLimiter(**kwargs)
+    assert str(e.value) == message
+
+
+def test_client_requests_are_throttled(sleeps):
+    limiter = RateLimiter(
+        engines={"parks": RateLimit(requests_per_second=10, bytes_per_second=100)}
+    )
+    client = AppSearch(node_class=DummyNode, meta_header=False, rate_limiter=limiter)
+
+    for _ in range(2):
+        client.index_documents(
+            engine_name="parks", documents=[{"id": "1", "title": "x" * 57}]
+        )
+    client.get_engine(engine_name="national-parks")
+
+    # The body is serialized once to be measured and sent as-is.
+    calls = client.transport.node_pool.get().calls
+    assert calls[0][1]["body"] == b'[{"id":"1","title":"' + b"x" * 57 + b'"}]'
+    # The second request waits for the 60 bytes it's over the limit.
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.6, abs=0.01)
+
+
+def test_options_share_limiter(sleeps):
+    limiter = RateLimiter(default=RateLimit(requests_per_second=1))
+    client = EnterpriseSearch(node_class=DummyNode, rate_limiter=limiter)
+
+    assert client.app_search._rate_limiter is limiter
+    assert client.options(request_timeout=1)._rate_limiter is limiter
+
+    unlimited = client.options(rate_limiter=None)
+    for _ in range(3):
+        unlimited.get_version()
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_async_client_requests_are_throttled():
+    class Node(DummyNode):
+        async def perform_request(self, *args, **kwargs):
+            return NodeResponse(*super().perform_request(*args, **kwargs))
+
+        async def close(self):
+            pass
+
+    limiter = RateLimiter(default=RateLimit(requests_per_second=20, burst=0.05))
+    client = AsyncAppSearch(node_class=Node, meta_header=False, rate_limiter=limiter)
+
+    start = time.monotonic()
+    await asyncio.gather(*(client.list_engines() for _ in range(3)))
+
+    assert time.monotonic() - start >= 0.09
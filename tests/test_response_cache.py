@@ -0,0 +1,246 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import pytest
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    EnterpriseSearch,
+    NotFoundError,
+    ResponseCache,
+    _response_cache,
+)
+from tests.conftest import DummyNode, NodeResponse
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(_response_cache, "time", clock)
+    return clock
+
+
+class SearchNode(DummyNode):
+    """Responds with a body echoing the number of requests received"""
+
+    def perform_request(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        meta, _ = super().perform_request(*args, **kwargs)
+        self.calls.pop()
+        meta.headers["content-type"] = "application/json"
+        return meta, b'{"results":[],"request":%d}' % len(self.calls)
+
+
+def cached_client(client_class=AppSearch, node_class=SearchNode, **kwargs):
+    return client_class(
+        node_class=node_class,
+        meta_header=False,
+        bearer_auth="search-key",
+        response_cache=ResponseCache(**kwargs),
+    )
+
+
+def test_repeated_searches_are_cached(clock):
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    first = client.search(
+        engine_name="parks", query="lake", filters={"states": "Utah", "acres": 10}
+    )
+    # Reordered keys are the same request.
+    second = client.search(
+        engine_name="parks", filters={"acres": 10, "states": "Utah"}, query="lake"
+    )
+
+    assert second is first
+    assert len(node.calls) == 1
+    assert (client._response_cache.hits, client._response_cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "request_kwargs",
+    [
+        {"engine_name": "parks-2", "query": "lake"},
+        {"engine_name": "parks", "query": "river"},
+        {"engine_name": "parks", "query": "lake", "page_size": 20},
+    ],
+)
+def test_different_searches_arent_shared(request_kwargs):
+    client = cached_client()
+
+    client.search(engine_name="parks", query="lake")
+    resp = client.search(**request_kwargs)
+
+    assert resp.body["request"] == 2
+    assert client._response_cache.misses == 2
+
+
+def test_searches_of_different_keys_arent_shared():
+    client = cached_client()
+
+    client.search(engine_name="parks", query="lake")
+    resp = client.options(bearer_auth="other-key").search(
+        engine_name="parks", query="lake"
+    )
+
+    assert resp.body["request"] == 2
+
+
+def test_multi_search_and_workplace_search_are_cached():
+    client = cached_client(EnterpriseSearch)
+    node = client.transport.node_pool.get()
+
+    for _ in range(2):
+        client.app_search.multi_search(
+            engine_name="parks", queries=[{"query": "lake"}, {"query": "river"}]
+        )
+        client.workplace_search.search(query="handbook")
+
+    assert len(node.calls) == 2
+    assert client.app_search._response_cache.hits == 2
+
+
+def test_other_requests_arent_cached():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    for _ in range(2):
+        client.get_engine(engine_name="parks")
+        client.search_es_search(engine_name="parks", body={"query": {}})
+
+    assert len(node.calls) == 4
+    assert (client._response_cache.hits, client._response_cache.misses) == (0, 0)
+
+
+def test_errors_arent_cached():
+    client = cached_client()
+    client.transport.node_pool.get().resp_status = 404
+
+    for _ in range(2):
+        with pytest.raises(NotFoundError):
+            client.search(engine_name="parks", query="lake")
+
+    assert len(client._response_cache) == 0
+    assert client._response_cache.misses == 2
+
+
+def test_ignored_errors_arent_cached():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+    node.resp_status = 404
+
+    resp = client.options(ignore_status=404).search(engine_name="parks", query="lake")
+    assert resp.meta.status == 404
+    with pytest.raises(NotFoundError):
+        client.search(engine_name="parks", query="lake")
+
+    node.resp_status = 200
+    client.search(engine_name="parks", query="lake")
+    # Requests ignoring statuses don't use the cache either.
+    resp = client.options(ignore_status=404).search(engine_name="parks", query="lake")
+    assert resp.body["request"] == 4
+    assert len(node.calls) == 4
+
+
+def test_responses_expire(clock):
+    client = cached_client(ttl=10)
+
+    client.search(engine_name="parks", query="lake")
+    clock.now += 9
+    assert client.search(engine_name="parks", query="lake").body["request"] == 1
+    clock.now += 1
+    assert client.search(engine_name="parks", query="lake").body["request"] == 2
+
+
+def test_least_recently_used_responses_are_evicted():
+    client = cached_client(max_entries=2)
+
+    for query in ("lake", "river", "lake", "forest", "lake", "river"):
+        client.search(engine_name="parks", query=query)
+
+    # 'river' was evicted by 'forest' as 'lake' was used more recently.
+    assert (client._response_cache.hits, client._response_cache.misses) == (2, 4)
+    assert len(client._response_cache) == 2
+
+
+def test_responses_are_evicted_by_size():
+    # Each response is 26 bytes once serialized.
+    client = cached_client(max_bytes=60)
+    cache = client._response_cache
+
+    for query in ("lake", "river", "forest"):
+        client.search(engine_name="parks", query=query)
+
+    assert len(cache) == 2
+    assert cache.size == 52
+    client.search(engine_name="parks", query="lake")
+    assert cache.misses == 4
+
+    cache.clear()
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_options_share_cache():
+    cache = ResponseCache()
+    client = EnterpriseSearch(node_class=DummyNode, response_cache=cache)
+
+    assert client.app_search._response_cache is cache
+    assert client.workplace_search._response_cache is cache
+    assert client.options(request_timeout=1)._response_cache is cache
+    assert client.options(response_cache=None)._response_cache is None
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"max_entries": 0}, "'max_entries' must be a positive integer"),
+        ({"max_bytes": 0}, "'max_bytes' must be a positive integer"),
+        ({"ttl": 0}, "'ttl' must be positive"),
+    ],
+)
+def test_invalid_parameters(kwargs, message):
+    with pytest.raises(ValueError) as e:
+        ResponseCache(**kwargs)
+    assert str(e.value) == message
+
+
+@pytest.mark.asyncio
+async def test_async_searches_are_cached():
+    class Node(SearchNode):
+        async def perform_request(self, *args, **kwargs):
+            return NodeResponse(*super().perform_request(*args, **kwargs))
+
+        async def close(self):
+            pass
+
+    client = cached_client(AsyncAppSearch, Node)
+
+    responses = [
+        await client.search(engine_name="parks", query="lake") for _ in range(3)
+    ]
+
+    assert {resp.body["request"] for resp in responses} == {1}
+    assert client._response_cache.hits == 2
@@ -0,0 +1,226 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    BadRequestError,
+    EnterpriseSearch,
+    SearchBatcher,
+)
+from tests.conftest import DummyNode, NodeResponse
+
+
+class SearchNode(DummyNode):
+    """Responds to searches with their query, rejecting the query 'invalid'"""
+
+    lock = threading.Lock()
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        with self.lock:
+            self.calls.append(((method, target), dict(body=body, **kwargs)))
+        request = json.loads(body)
+        queries = request["queries"] if target.endswith("/multi_search") else [request]
+        status = 200
+        results = [
+            {"meta": {"query": query["query"]}, "results": []} for query in queries
+        ]
+        if any(query["query"] == "invalid" for query in queries):
+            status, results = 400, {"errors": ["Invalid query"]}
+        elif not target.endswith("/multi_search"):
+            results = results[0]
+        meta = ApiResponseMeta(
+            status=status,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, json.dumps(results).encode()
+
+
+class AsyncSearchNode(SearchNode):
+    async def perform_request(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return NodeResponse(*super().perform_request(*args, **kwargs))
+
+    async def close(self):
+        pass
+
+
+def batching_client(client_class=AsyncAppSearch, node_class=AsyncSearchNode, **kwargs):
+    return client_class(
+        node_class=node_class,
+        meta_header=False,
+        max_retries=0,
+        search_batcher=SearchBatcher(**kwargs),
+    )
+
+
+def sent(client):
+    return [
+        (target.rsplit("/", 1)[1], json.loads(kwargs["body"]))
+        for (_, target), kwargs in client.transport.node_pool.get().calls
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_are_batched():
+    client = batching_client()
+    queries = ["lake", "river", "forest", "canyon"]
+
+    responses = await asyncio.gather(
+        *(client.search(engine_name="parks", query=query) for query in queries)
+    )
+
+    assert [resp.body["meta"]["query"] for resp in responses] == queries
+    assert sent(client) == [
+        ("multi_search", {"queries": [{"query": query} for query in queries]})
+    ]
+    assert (client._search_batcher.batches, client._search_batcher.searches) == (1, 4)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_limited_in_size():
+    client = batching_client(max_batch_size=3)
+
+    await asyncio.gather(
+        *(client.search(engine_name="parks", query=str(i)) for i in range(7))
+    )
+
+    assert [
+        (endpoint, len(body.get("queries", [body]))) for endpoint, body in sent(client)
+    ] == [
+        ("multi_search", 3),
+        ("multi_search", 3),
+        ("search", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_searches_are_batched_per_engine_and_credentials():
+    client = batching_client()
+    other = client.options(bearer_auth="other-key")
+
+    await asyncio.gather(
+        client.search(engine_name="parks", query="lake"),
+        client.search(engine_name="parks", query="river"),
+        client.search(engine_name="trails", query="lake"),
+        other.search(engine_name="parks", query="lake"),
+    )
+
+    calls = client.transport.node_pool.get().calls
+    assert sorted(target for (_, target), _ in calls) == [
+        "/api/as/v1/engines/parks/multi_search",
+        "/api/as/v1/engines/parks/search",
+        "/api/as/v1/engines/trails/search",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [{"request_timeout": 1}, {"max_retries": 3}])
+async def test_searches_are_batched_per_options(options):
+    client = batching_client()
+    other = client.options(**options)
+
+    await asyncio.gather(
+        client.search(engine_name="parks", query="lake"),
+        client.search(engine_name="parks", query="river"),
+        other.search(engine_name="parks", query="lake"),
+        other.search(engine_name="parks", query="river"),
+    )
+
+    calls = client.transport.node_pool.get().calls
+    assert [target for (_, target), _ in calls] == [
+        "/api/as/v1/engines/parks/multi_search"
+    ] * 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_batches_are_sent_alone():
+    client = batching_client()
+
+    responses = await asyncio.gather(
+        client.search(engine_name="parks", query="lake"),
+        client.search(engine_name="parks", query="invalid"),
+        client.search(engine_name="parks", query="river"),
+        return_exceptions=True,
+    )
+
+    assert responses[0].body["meta"]["query"] == "lake"
+    assert isinstance(responses[1], BadRequestError)
+    assert responses[2].body["meta"]["query"] == "river"
+    assert [endpoint for endpoint, _ in sent(client)] == ["multi_search"] + [
+        "search"
+    ] * 3
+    assert client._search_batcher.batches == 0
+
+
+@pytest.mark.asyncio
+async def test_single_searches_are_sent_alone():
+    client = batching_client()
+
+    resp = await client.search(engine_name="parks", query="lake")
+
+    assert resp.body == {"meta": {"query": "lake"}, "results": []}
+    assert sent(client) == [("search", {"query": "lake"})]
+
+
+def test_threaded_searches_are_batched():
+    client = batching_client(AppSearch, SearchNode, max_batch_size=3, max_delay=5)
+    queries = ["lake", "river", "forest"]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # The batch is sent as soon as it's full rather than after 'max_delay'.
+        responses = list(
+            executor.map(
+                lambda query: client.search(engine_name="parks", query=query), queries
+            )
+        )
+
+    assert [resp.body["meta"]["query"] for resp in responses] == queries
+    assert [endpoint for endpoint, _ in sent(client)] == ["multi_search"]
+
+
+def test_options_share_batcher():
+    batcher = SearchBatcher()
+    client = EnterpriseSearch(node_class=DummyNode, search_batcher=batcher)
+
+    assert client.app_search._search_batcher is batcher
+    assert client.options(request_timeout=1)._search_batcher is batcher
+    assert client.options(search_batcher=None)._search_batcher is None
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"max_batch_size": 1}, "'max_batch_size' must be an integer of at least 2"),
+        ({"max_delay": 0}, "'max_delay' must be positive"),
+    ],
+)
+def test_invalid_parameters(kwargs, message):
+    with pytest.raises(ValueError) as e:
+        SearchBatcher(**kwargs)
+    assert str(e.value) == message
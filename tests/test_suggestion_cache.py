@@ -0,0 +1,266 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders
+
+from elastic_enterprise_search import (
+    AppSearch,
+    AsyncAppSearch,
+    EnterpriseSearch,
+    SuggestionCache,
+    _suggestion_cache,
+)
+from tests.conftest import DummyNode, NodeResponse
+
+SUGGESTIONS = [
+    "laptop",
+    "laptop bag",
+    "laptop stand",
+    "lapis lazuli",
+    "gaming laptop",
+    "lamp",
+    "lamp shade",
+    "large desk",
+]
+
+
+class SuggestionNode(DummyNode):
+    """Suggests the entries of 'SUGGESTIONS' with a word starting with the query"""
+
+    def perform_request(self, method, target, body=None, **kwargs):
+        self.calls.append(((method, target), dict(body=body, **kwargs)))
+        request = json.loads(body)
+        query = request["query"].lower()
+        matches = [
+            {"suggestion": suggestion}
+            for suggestion in SUGGESTIONS
+            if any(word.startswith(query) for word in suggestion.split())
+            or suggestion.startswith(query)
+        ]
+        data = {
+            "results": {"documents": matches[: request.get("size", 5)]},
+            "meta": {"request_id": str(len(self.calls))},
+        }
+        meta = ApiResponseMeta(
+            status=self.resp_status,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json"}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, json.dumps(data).encode()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(_suggestion_cache, "time", clock)
+    return clock
+
+
+def cached_client(client_class=AppSearch, node_class=SuggestionNode, **kwargs):
+    return client_class(
+        node_class=node_class,
+        meta_header=False,
+        suggestion_cache=SuggestionCache(**kwargs),
+    )
+
+
+def suggest(client, query, **kwargs):
+    resp = client.query_suggestion(engine_name="shop", query=query, **kwargs)
+    return [s["suggestion"] for s in resp.body["results"]["documents"]]
+
+
+def test_same_query_is_cached():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    first = client.query_suggestion(engine_name="shop", query="la", size=3)
+    assert client.query_suggestion(engine_name="shop", query="LA", size=3) is first
+    # Fewer suggestions than the cached ones are taken from the cached response.
+    assert suggest(client, "la", size=2) == ["laptop", "laptop bag"]
+
+    assert len(node.calls) == 1
+    assert (client._suggestion_cache.hits, client._suggestion_cache.misses) == (2, 1)
+
+
+def test_incomplete_responses_dont_answer_longer_queries():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    # 'la' has more than 5 suggestions so its response isn't complete.
+    suggest(client, "la")
+    suggest(client, "lap")
+    # Nor requests for more suggestions than it holds.
+    suggest(client, "la", size=10)
+
+    assert len(node.calls) == 3
+
+
+def test_complete_responses_answer_longer_queries():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    assert suggest(client, "la", size=10) == SUGGESTIONS
+    assert suggest(client, "lapt") == [
+        "laptop",
+        "laptop bag",
+        "laptop stand",
+        "gaming laptop",
+    ]
+    assert suggest(client, "lamp", size=1) == ["lamp"]
+    assert suggest(client, "lamp s") == ["lamp shade"]
+    assert suggest(client, "lax") == []
+
+    assert len(node.calls) == 1
+    assert client._suggestion_cache.prefix_hits == 4
+
+
+def test_deepest_complete_prefix_is_used():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    suggest(client, "l", size=20)
+    suggest(client, "lam", size=20)
+    node.calls.clear()
+
+    assert suggest(client, "lamp") == ["lamp", "lamp shade"]
+    assert node.calls == []
+    trie = client._suggestion_cache._tries
+    assert len(trie) == 1
+
+
+def test_requests_are_cached_per_engine_types_and_credentials():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+
+    suggest(client, "la", size=10)
+    client.query_suggestion(engine_name="other", query="la", size=10)
+    client.query_suggestion(
+        engine_name="shop",
+        query="la",
+        size=10,
+        types={"documents": {"fields": ["title"]}},
+    )
+    client.options(bearer_auth="other-key").query_suggestion(
+        engine_name="shop", query="lap", size=10
+    )
+
+    assert len(node.calls) == 4
+
+
+def test_ignored_errors_arent_cached():
+    client = cached_client()
+    node = client.transport.node_pool.get()
+    node.resp_status = 404
+
+    resp = client.options(ignore_status=404).query_suggestion(
+        engine_name="shop", query="la"
+    )
+    assert resp.meta.status == 404
+
+    node.resp_status = 200
+    suggest(client, "la")
+    # Requests ignoring statuses don't use the cache either.
+    resp = client.options(ignore_status=404).query_suggestion(
+        engine_name="shop", query="la"
+    )
+    assert resp.meta.status == 200
+    assert len(node.calls) == 3
+    assert len(client._suggestion_cache) == 1
+
+
+def test_responses_expire(clock):
+    client = cached_client(ttl=10)
+    node = client.transport.node_pool.get()
+
+    suggest(client, "la", size=10)
+    clock.now += 9
+    suggest(client, "lap")
+    clock.now += 1
+    suggest(client, "lap")
+    suggest(client, "la", size=10)
+
+    assert len(node.calls) == 3
+
+
+def test_least_recently_used_queries_are_evicted():
+    client = cached_client(max_entries=2)
+    node = client.transport.node_pool.get()
+    cache = client._suggestion_cache
+
+    for query in ("laptop", "lamp", "laptop", "large"):
+        suggest(client, query)
+
+    assert len(node.calls) == 3
+    assert len(cache) == 2
+    # The nodes of the evicted query are removed from the trie.
+    root = next(iter(cache._tries.values()))
+    assert set(root.children["l"].children["a"].children) == {"p", "r"}
+
+    cache.clear()
+    assert (len(cache), cache._tries) == (0, {})
+
+
+def test_options_share_cache():
+    cache = SuggestionCache()
+    client = EnterpriseSearch(node_class=DummyNode, suggestion_cache=cache)
+
+    assert client.app_search._suggestion_cache is cache
+    assert client.options(request_timeout=1)._suggestion_cache is cache
+    assert client.options(suggestion_cache=None)._suggestion_cache is None
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "message"],
+    [
+        ({"max_entries": 0}, "'max_entries' must be a positive integer"),
+        ({"ttl": 0}, "'ttl' must be positive"),
+    ],
+)
+def test_invalid_parameters(kwargs, message):
+    with pytest.raises(ValueError) as e:
+        SuggestionCache(**kwargs)
+    assert str(e.value) == message
+
+
+@pytest.mark.asyncio
+async def test_async_suggestions_are_cached():
+    class Node(SuggestionNode):
+        async def perform_request(self, *args, **kwargs):
+            return NodeResponse(*super().perform_request(*args, **kwargs))
+
+        async def close(self):
+            pass
+
+    client = cached_client(AsyncAppSearch, Node)
+
+    for query in ("l", "la", "lap", "lapt", "lapto"):
+        await client.query_suggestion(engine_name="shop", query=query, size=10)
+
+    assert len(client.transport.node_pool.get().calls) == 1
@@ -32,6 +32,14 @@ def main():
         "_AsyncAppSearch": "_AppSearch",
         "_AsyncEnterpriseSearch": "_EnterpriseSearch",
         "_AsyncWorkplaceSearch": "_WorkplaceSearch",
+        "async_streaming_bulk": "streaming_bulk",
+        "async_delete_by_filter": "delete_by_filter",
+        "async_export_engine": "export_engine",
+        "async_paginate": "paginate",
+        "async_reindex": "reindex",
+        "async_scan_documents": "scan_documents",
+        "async_search_many": "search_many",
+        "async_update_by_filter": "update_by_filter",
     }
     rules = [
         unasync.Rule(